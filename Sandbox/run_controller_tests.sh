@@ -26,16 +26,35 @@ expected_disabled_IS_05_03=0
 expected_disabled_BCP_007_03_02=0
 
 
-# Run nmos-js
-cd ${nmos_js_dir}
-yarn start > ${testing_dir}/${results_dir}/nmos_js_output 2>&1 &
-NMOS_JS_PID=$!
+# Run nmos-js, or have the Testing Facade serve the production build if there is one
+nmos_js_build=${nmos_js_dir}/build
+if [ -e ${nmos_js_build}/index.html ]; then
+  # Don't test a build made before the latest changes to nmos-js
+  if [ -n "$(find ${nmos_js_dir}/src ${nmos_js_dir}/public ${nmos_js_dir}/package.json -newer ${nmos_js_build}/index.html -print -quit)" ]; then
+    echo "nmos-js build in ${nmos_js_build} is older than its source, run yarn build or remove it"
+    exit 1
+  fi
+  testing_facade_args="--ncut-build ${nmos_js_build}"
+else
+  testing_facade_args=
+  cd ${nmos_js_dir}
+  yarn start > ${testing_dir}/${results_dir}/nmos_js_output 2>&1 &
+  NMOS_JS_PID=$!
+fi
 
 # Run Testing Facade
 cd ${testing_facade_dir}
-python TestingFacade.py > ${testing_dir}/${results_dir}/testing_facade_output 2>&1 &
+python TestingFacade.py ${testing_facade_args} > ${testing_dir}/${results_dir}/testing_facade_output 2>&1 &
 TESTING_FACADE_PID=$!
-sleep 10s
+
+# Wait until nmos-js can be loaded and the Testing Facade is ready to answer questions
+for attempt in $(seq 1 120); do
+  if curl -sf http://localhost:5001/ready > /dev/null; then
+    break
+  fi
+  sleep 1s
+done
+curl -s http://localhost:5001/ready || echo "Testing Facade not ready"
 
 function do_run_test() {
   suite=$1
@@ -83,4 +102,6 @@ do_run_test BCP-007-03-02 $expected_disabled_BCP_007_03_02 --host "${host}" null
 kill $TESTING_FACADE_PID || echo "Testing Facade not running"
 
 # Stop nmos-js
-kill $NMOS_JS_PID || echo "nmos-js not running"
+if [ -n "${NMOS_JS_PID}" ]; then
+  kill $NMOS_JS_PID || echo "nmos-js not running"
+fi
@@ -0,0 +1,119 @@
+# Copyright (C) 2021 Advanced Media Workflow Association
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import json
+import re
+import time
+import requests
+import Config as CONFIG
+
+# Parameters of a staged PATCH response which the active parameters must match once activated
+CONNECTION_PARAMS = ['master_enable', 'sender_id', 'receiver_id']
+
+# Connections to the Connection APIs, kept open for the trackers of later activations
+session = requests.Session()
+
+
+class ActivationError(Exception):
+    """
+    An IS-05 activation requested through nmos-js which failed or did not take effect
+    """
+
+
+def active_url(staged_url):
+    """
+    The /active endpoint of the sender or receiver whose /staged endpoint is given
+    """
+    return re.sub(r'/staged/?$', '/active', staged_url)
+
+
+def requested_activation(patch):
+    """
+    The parameters an immediate activation is expected to make active, from a PATCH to /staged
+    Returns dict, or None if the PATCH only staged parameters
+    """
+    try:
+        request = json.loads(patch['request'] or '{}')
+    except ValueError:
+        request = {}
+    if (request.get('activation') or {}).get('mode') != 'activate_immediate':
+        return None
+    try:
+        staged = json.loads(patch['response'])
+    except ValueError:
+        staged = None
+    # The response holds the staged parameters after the PATCH, including any it left unchanged
+    source = staged if isinstance(staged, dict) else request
+    return {param: source[param] for param in CONNECTION_PARAMS if param in source}
+
+
+class ActivationTracker:
+    """
+    Confirms the IS-05 activations nmos-js makes, by following its PATCHes to a Connection API's
+    /staged endpoint, seen by the page's network monitor, until /active shows the change
+    """
+
+    def __init__(self, read_patches, wait, timeout=None):
+        """
+        read_patches() returns the PATCHes made since it was last called; wait(seconds) waits
+        up to that long for the page's network activity
+        """
+        self.read_patches = read_patches
+        self.wait = wait
+        self.timeout = CONFIG.ACTIVATION_TIMEOUT if timeout is None else timeout
+
+    def start(self):
+        """
+        Forget PATCHes made before the action whose activation is to be confirmed
+        """
+        self.read_patches()
+
+    def confirm(self):
+        """
+        Wait for the PATCH made by the action, then for its activation to show on /active
+        Raises ActivationError if there was no PATCH, it failed, or the active parameters did not
+        change within the timeout
+        """
+        deadline = time.monotonic() + self.timeout
+        patch = self._wait_for_patch(deadline)
+        if not 200 <= patch['status'] < 300:
+            raise ActivationError('PATCH {} failed: {} {}'.format(
+                patch['url'], patch['status'] or 'no response', (patch['response'] or '').strip()))
+        expected = requested_activation(patch)
+        if expected is None:
+            return
+        url = active_url(patch['url'])
+        active = None
+        while True:
+            try:
+                response = session.get(url, timeout=CONFIG.WAIT_TIME)
+                if response.ok:
+                    active = response.json()
+                    if all(active.get(param) == value for param, value in expected.items()):
+                        return
+            except (requests.RequestException, ValueError) as error:
+                active = str(error)
+            if time.monotonic() >= deadline:
+                raise ActivationError('{} did not become active within {}s: expected {}, found {}'.format(
+                    url, self.timeout, json.dumps(expected), json.dumps(active)))
+            time.sleep(CONFIG.READY_POLL_INTERVAL)
+
+    def _wait_for_patch(self, deadline):
+        while True:
+            patches = self.read_patches()
+            if patches:
+                return patches[-1]
+            if time.monotonic() >= deadline:
+                raise ActivationError('nmos-js did not request an activation within {}s'.format(self.timeout))
+            self.wait(CONFIG.READY_POLL_INTERVAL)
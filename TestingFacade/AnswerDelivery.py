@@ -0,0 +1,136 @@
+# Copyright (C) 2021 Advanced Media Workflow Association
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import queue
+import random
+import threading
+import time
+from collections import deque
+import requests
+from requests.adapters import HTTPAdapter
+from FacadeSession import run_key
+from Metrics import metrics
+
+
+class AnswerDelivery:
+    """
+    Send answers back to NMOS Testing from background threads, over a keep-alive HTTP session
+    Failed posts are retried with jittered backoff, and the outcome of each is recorded
+    and passed to on_delivered(question, succeeded) if given
+    """
+
+    def __init__(self, pool_size, connect_timeout, read_timeout, retries, retry_delay, history=100,
+                 on_delivered=None):
+        self.pool_size = pool_size
+        self.on_delivered = on_delivered
+        self.timeout = (connect_timeout, read_timeout)
+        self.retries = retries
+        self.retry_delay = retry_delay
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size)
+        self.session.mount('http://', adapter)
+        self.session.mount('https://', adapter)
+        self.outbound = queue.Queue()
+        self.threads = []
+        self.lock = threading.Lock()
+        self.deliveries = deque(maxlen=history)
+        self.delivered = 0
+        self.failed = 0
+
+    def start(self):
+        """
+        Start the delivery threads
+        """
+        for index in range(self.pool_size):
+            thread = threading.Thread(target=self._work, name='answer-delivery-{}'.format(index), daemon=True)
+            thread.start()
+            self.threads.append(thread)
+
+    def deliver(self, question, answer):
+        """
+        Queue the answer to a question to be sent to its answer_uri
+        """
+        self.outbound.put((question, answer, time.monotonic()))
+
+    def _work(self):
+        while True:
+            question, answer, queued_at = self.outbound.get()
+            try:
+                self._send(question, answer, queued_at)
+            finally:
+                self.outbound.task_done()
+
+    def _send(self, question, answer, queued_at):
+        status_code = None
+        error = None
+        attempts = 0
+        while attempts <= self.retries:
+            if attempts:
+                # Exponential backoff with jitter so retries from several runs do not align
+                time.sleep(self.retry_delay * 2 ** (attempts - 1) * random.uniform(0.5, 1.5))
+            attempts += 1
+            try:
+                response = self.session.post(question.answer_uri, json=question.answer_json(answer),
+                                             timeout=self.timeout)
+                status_code = response.status_code
+                error = None
+                # Only server errors are worth retrying
+                if status_code < 500:
+                    break
+                error = 'HTTP {}'.format(status_code)
+            except requests.RequestException as exception:
+                error = str(exception)
+
+        succeeded = error is None and status_code < 400
+        latency = time.monotonic() - queued_at
+        tests = question.test_class
+        metrics.record('answer_post', latency, 'ok' if succeeded else 'error', run=run_key(question.answer_uri),
+                       suite=type(tests).__name__ if tests else '', question=question.question_id)
+        if not succeeded:
+            print(' * ERROR: Could not send answer to {} for {}: {}'.format(
+                question.answer_uri, question.question_id, error or 'HTTP {}'.format(status_code)))
+        with self.lock:
+            if succeeded:
+                self.delivered += 1
+            else:
+                self.failed += 1
+            self.deliveries.append({
+                'question_id': question.question_id,
+                'answer_uri': question.answer_uri,
+                'attempts': attempts,
+                'status_code': status_code,
+                'latency': round(latency, 3),
+                'error': error
+            })
+        if self.on_delivered:
+            self.on_delivered(question, succeeded)
+        return succeeded
+
+    def join(self):
+        """
+        Wait until every queued answer has been sent or has failed
+        """
+        self.outbound.join()
+
+    def status(self):
+        """
+        Answers waiting to be sent, counts of answers sent and failed, and the most recent deliveries
+        """
+        with self.lock:
+            return {
+                'queued': self.outbound.qsize(),
+                'delivered': self.delivered,
+                'failed': self.failed,
+                'recent': list(self.deliveries)
+            }
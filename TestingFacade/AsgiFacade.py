@@ -0,0 +1,130 @@
+# Copyright (C) 2021 Advanced Media Workflow Association
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import asyncio
+import json
+import re
+from urllib.parse import parse_qs
+
+try:
+    from asgiref.wsgi import WsgiToAsgi
+except ImportError:
+    WsgiToAsgi = None
+
+QUESTION_PATH = re.compile(r'^/x-nmos/testquestion/[^/]+/?$')
+QUESTION_STATUS_PATH = re.compile(r'^/x-nmos/testquestion/[^/]+/questions/([^/]+)$')
+
+
+class AsgiFacade:
+    """
+    ASGI front end for the Testing Facade
+    Questions are accepted, and question status long-polled, on the event loop without tying up
+    a thread per request; other requests are passed to the Flask app on worker threads by asgiref.
+    Lifespan startup starts the facade's services and shutdown, on SIGTERM, drains them
+    """
+
+    def __init__(self, wsgi_app, submit_question, tracker, wait_arguments, start, drain):
+        self.wsgi_app = WsgiToAsgi(wsgi_app) if WsgiToAsgi else None
+        self.submit_question = submit_question
+        self.tracker = tracker
+        self.wait_arguments = wait_arguments
+        self.start = start
+        self.drain = drain
+
+    async def __call__(self, scope, receive, send):
+        if scope['type'] == 'lifespan':
+            await self.lifespan(receive, send)
+        elif scope['type'] == 'http':
+            path = scope['path']
+            status_match = QUESTION_STATUS_PATH.match(path)
+            if scope['method'] == 'POST' and QUESTION_PATH.match(path):
+                await self.question_post(scope, await self.read_body(receive), send)
+            elif scope['method'] == 'GET' and status_match:
+                await self.question_status_get(scope, status_match.group(1), send)
+            else:
+                await self.wsgi_app(scope, receive, send)
+
+    async def lifespan(self, receive, send):
+        loop = asyncio.get_running_loop()
+        while True:
+            message = await receive()
+            if message['type'] == 'lifespan.startup':
+                self.start()
+                await send({'type': 'lifespan.startup.complete'})
+            elif message['type'] == 'lifespan.shutdown':
+                await loop.run_in_executor(None, self.drain)
+                await send({'type': 'lifespan.shutdown.complete'})
+                return
+
+    @staticmethod
+    async def read_body(receive):
+        body = b''
+        while True:
+            message = await receive()
+            body += message.get('body', b'')
+            if not message.get('more_body'):
+                return body
+
+    @staticmethod
+    async def respond(send, status, body, content_type='text/plain; charset=utf-8', headers=()):
+        if isinstance(body, str):
+            body = body.encode('utf-8')
+        await send({'type': 'http.response.start', 'status': status,
+                    'headers': [(b'content-type', content_type.encode('latin-1')),
+                                (b'content-length', str(len(body)).encode('latin-1'))] + list(headers)})
+        await send({'type': 'http.response.body', 'body': body})
+
+    async def question_post(self, scope, body, send):
+        try:
+            question_json = json.loads(body)
+        except ValueError:
+            question_json = None
+        client = scope.get('client') or ('', 0)
+        # A clear request resets the run's test class, which may wait for the scrape cache
+        loop = asyncio.get_running_loop()
+        response_body, status = await loop.run_in_executor(None, self.submit_question, question_json, client[0])
+        await self.respond(send, status, response_body)
+
+    async def question_status_get(self, scope, question_id, send):
+        """
+        Long-poll a question's status, woken by the tracker's updates
+        """
+        query = {name: values[0] for name, values in parse_qs(scope['query_string'].decode('latin-1')).items()}
+        run, known_state, timeout = self.wait_arguments(query)
+        loop = asyncio.get_running_loop()
+        changed = asyncio.Event()
+
+        def listener():
+            loop.call_soon_threadsafe(changed.set)
+
+        self.tracker.subscribe(listener)
+        try:
+            deadline = loop.time() + timeout
+            while True:
+                changed.clear()
+                status = self.tracker.status(question_id, run)
+                remaining = deadline - loop.time()
+                if (status is not None and status['state'] != known_state) or remaining <= 0:
+                    break
+                try:
+                    await asyncio.wait_for(changed.wait(), remaining)
+                except asyncio.TimeoutError:
+                    pass
+        finally:
+            self.tracker.unsubscribe(listener)
+
+        if status is None:
+            await self.respond(send, 404, json.dumps({'error': 'Unknown question'}), 'application/json')
+        else:
+            await self.respond(send, 200, json.dumps(status), 'application/json')
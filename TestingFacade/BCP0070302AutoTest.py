@@ -8,6 +8,9 @@ class BCP0070302AutoTest(GenericAutoTest):
 
     MXL_TRANSPORT_LABEL = 'MXL'
 
+    # BCP-004-01 receiver capabilities filtering requires RQL
+    SETTINGS_OVERRIDES = {'RQL': True}
+
     def _transport_matches_label(self, transport_text, transport_label):
         if not transport_text:
             return False
@@ -17,79 +20,67 @@ class BCP0070302AutoTest(GenericAutoTest):
         normalized_label = transport_label.lower()
         return normalized_label in transport_text.lower()
 
-    def set_up_test(self):
-        super().set_up_test()
-        # BCP-004-01 receiver capabilities filtering requires RQL
-        self.set_rql_enabled(True)
-
-    def test_01(self, answers, metadata):
+    def _mxl_answer_ids(self, resource, question):
         """
-        Ensure NCuT can discover MXL Senders via the IS-04 Query API
+        Check the transport shown on each answer's show page, across several browser sessions
+        Returns answer ids of the MXL resources
         """
-        self.navigate_to_page('Senders')
-
-        mxl_sender_labels = []
-        for answer in answers:
+        def probe(tests, answer):
             label = answer['resource']['label']
-            self.navigate_to_page(label)
-            if self._transport_matches_label(
-                    self.get_summary_transport(), self.MXL_TRANSPORT_LABEL):
-                mxl_sender_labels.append(label)
-            self.navigate_to_page('Senders')
+            resource_id = answer['resource'].get('id')
 
-        return [
-            answer['answer_id'] for answer in answers
-            if answer['resource']['label'] in mxl_sender_labels]
+            def scrape():
+                tests.navigate_to_resource(resource, label, resource_id)
+                return tests.get_summary_transport()
+            transport = tests.scraped((resource, resource_id or label, 'transport'), scrape)
+            return tests._transport_matches_label(transport, self.MXL_TRANSPORT_LABEL)
 
-    def test_02(self, answers, metadata):
+        answers = question.resource_answers
+        is_mxl = self.fan_out(answers, probe)
+        return [answer['answer_id'] for answer, mxl in zip(answers, is_mxl) if mxl]
+
+    def test_01(self, question):
         """
-        Ensure NCuT can discover MXL Receivers via the IS-04 Query API
+        Ensure NCuT can discover MXL Senders via the IS-04 Query API
         """
-        self.navigate_to_page('Receivers')
-
-        mxl_receiver_labels = []
-        for answer in answers:
-            label = answer['resource']['label']
-            self.navigate_to_page(label)
-            if self._transport_matches_label(
-                    self.get_summary_transport(), self.MXL_TRANSPORT_LABEL):
-                mxl_receiver_labels.append(label)
-            self.navigate_to_page('Receivers')
+        return self._mxl_answer_ids('senders', question)
 
-        return [
-            answer['answer_id'] for answer in answers
-            if answer['resource']['label'] in mxl_receiver_labels]
+    def test_02(self, question):
+        """
+        Ensure NCuT can discover MXL Receivers via the IS-04 Query API
+        """
+        return self._mxl_answer_ids('receivers', question)
 
-    def test_03(self, answers, metadata):
+    def test_03(self, question):
         """
         Connect an MXL Receiver to an MXL Sender via the IS-05 Connection API
         """
-        sender = metadata['sender']
-        receiver = metadata['receiver']
+        sender = question.sender
+        receiver = question.receiver
 
-        self.navigate_to_page('Receivers')
-        self.navigate_to_page(receiver['label'])
-        self.make_connection(sender['label'])
+        self.navigate_to_resource('receivers', receiver.label, receiver.id)
+        self.make_connection(sender.label)
 
     def __getattr__(self, name):
         if name == 'test_04' or name.startswith('test_04_'):
-            return lambda answers, metadata: self._test_04(answers, metadata)
+            return lambda question: self._test_04(question)
         raise AttributeError(f'{type(self).__name__!r} object has no attribute {name!r}')
 
-    def _test_04(self, answers, metadata):
+    def _test_04(self, question):
         """
         Ensure NCuT can evaluate MXL Flow compatibility using BCP-004-01 Receiver Capabilities
         """
-        sender_label = metadata['sender']['label']
+        sender_label = question.sender.label
 
-        compatible_answer_ids = []
-        for answer in answers:
-            receiver_label = answer['resource']['label']
-            connect_tab_senders = self.list_connect_tab_senders(receiver_label)
-            if sender_label in connect_tab_senders:
-                compatible_answer_ids.append(answer['answer_id'])
-
-        return compatible_answer_ids
-
-
-BCP0070302tests = BCP0070302AutoTest()
+        def probe(tests, answer):
+            label = answer['resource']['label']
+            resource_id = answer['resource'].get('id')
+            # Each question of test_04 asks about the same receivers, so their connect tabs are
+            # usually served from the scrape cache after the first
+            senders = tests.scraped(('receivers', resource_id or label, 'connect'),
+                                    lambda: tests.list_connect_tab_senders(label, resource_id))
+            return sender_label in senders
+
+        answers = question.resource_answers
+        compatible = self.fan_out(answers, probe)
+        return [answer['answer_id'] for answer, result in zip(answers, compatible) if result]
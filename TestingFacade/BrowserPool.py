@@ -0,0 +1,256 @@
+# Copyright (C) 2021 Advanced Media Workflow Association
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import os
+import tempfile
+import threading
+from selenium import webdriver
+from selenium.common.exceptions import WebDriverException
+from selenium.webdriver.chromium.options import ChromiumOptions
+from DriverBackend import create_backend
+from ProcessSupervisor import supervisor
+import Config as CONFIG
+import PageScripts
+
+
+# Chromium flags of the performance browser profile: keep timers and rendering running at full
+# speed in headless and background windows, and do not load images or run unneeded services
+PERFORMANCE_ARGUMENTS = ['--disable-background-timer-throttling',
+                         '--disable-backgrounding-occluded-windows',
+                         '--disable-renderer-backgrounding',
+                         '--blink-settings=imagesEnabled=false',
+                         '--disable-extensions',
+                         '--disable-component-update',
+                         '--no-default-browser-check',
+                         '--no-first-run']
+
+
+class BrowserSession:
+    """
+    A long-lived WebDriver session leased from the browser pool
+    """
+
+    def __init__(self, driver, slot):
+        self.driver = driver
+        self.backend = create_backend(driver)
+        self.slot = slot
+        self.questions = 0
+
+
+class BrowserPool:
+    """
+    Pool of pre-warmed browser sessions shared by the automated tests, so that
+    each question does not pay for browser startup and the first nmos-js load
+    """
+
+    def __init__(self, size, max_questions):
+        self.size = size
+        self.max_questions = max_questions
+        self.condition = threading.Condition()
+        self.idle = []
+        self.slots = set()
+        # Set once the pool has been warmed, whether or not browsers could be started
+        self.warmed = threading.Event()
+
+    def create_driver(self, slot=0):
+        """
+        Launch a new browser with the configured options
+        The slot identifies the pool session, which has its own profile directory
+        """
+        performance = CONFIG.BROWSER_PROFILE == 'performance'
+        browser = getattr(webdriver, CONFIG.BROWSER)
+        get_options = getattr(webdriver, CONFIG.BROWSER + 'Options', False)
+        if get_options:
+            options = get_options()
+            if CONFIG.HEADLESS:
+                options.add_argument("--headless=new")
+                options.add_argument("--window-size=1920,1080")
+                options.add_argument("--start-maximized")
+            if performance and isinstance(options, ChromiumOptions):
+                for argument in PERFORMANCE_ARGUMENTS:
+                    options.add_argument(argument)
+                options.add_argument('--user-data-dir=' + self.profile_dir(slot))
+            driver = browser(options=options)
+        else:
+            driver = browser()
+        driver.implicitly_wait(CONFIG.WAIT_TIME)
+        if hasattr(driver, 'execute_cdp_cmd'):
+            # Monitor nmos-js network activity from the moment each page loads
+            driver.execute_cdp_cmd('Page.addScriptToEvaluateOnNewDocument',
+                                   {'source': PageScripts.NETWORK_MONITOR})
+            if performance:
+                driver.execute_cdp_cmd('Network.enable', {})
+                driver.execute_cdp_cmd('Network.setBlockedURLs', {'urls': PageScripts.BLOCKED_URLS})
+                driver.execute_cdp_cmd('Page.addScriptToEvaluateOnNewDocument',
+                                       {'source': PageScripts.DISABLE_ANIMATIONS})
+        return driver
+
+    @staticmethod
+    def profile_root():
+        """
+        Directory of this facade's browser profiles, by default one per facade port so that
+        facades running side by side do not share them
+        """
+        return CONFIG.BROWSER_PROFILE_DIR or os.path.join(
+            tempfile.gettempdir(), 'nmos-js-testing-facade-{}'.format(CONFIG.TESTING_FACADE_PORT))
+
+    def profile_dir(self, slot):
+        """
+        Profile directory kept for the pool session in a slot, so that its cache of nmos-js is reused
+        """
+        return os.path.join(self.profile_root(), 'session-{}'.format(slot))
+
+    def reap_orphans(self):
+        """
+        Kill browsers and drivers left running by an earlier run of this facade, which would
+        otherwise keep their memory and lock the session profiles
+        The processes are recorded in a pidfile in the facade's own profile directory
+        """
+        supervisor.reap_orphans(os.path.join(self.profile_root(), 'processes.json'))
+
+    def _free_slot(self):
+        slot = 0
+        while slot in self.slots:
+            slot += 1
+        return slot
+
+    def _start_session(self, slot):
+        """
+        Launch a browser for the given slot and load nmos-js so the bundle is cached
+        Releases the slot if the browser cannot be started
+        """
+        try:
+            driver = self.create_driver(slot)
+        except Exception:
+            with self.condition:
+                self.slots.discard(slot)
+                self.condition.notify()
+            raise
+        session = BrowserSession(driver, slot)
+        supervisor.register(session)
+        try:
+            driver.get(CONFIG.NCUT_URL + "Settings")
+        except WebDriverException as error:
+            # nmos-js may not be up yet; the session is still usable and will
+            # navigate again when it is reset for a question
+            print(' * WARNING: Could not preload nmos-js in browser session {}: {}'.format(
+                slot, str(error).strip()))
+        return session
+
+    def is_healthy(self, session):
+        """
+        Check that the browser behind a session still responds
+        """
+        try:
+            session.driver.execute_script('return document.readyState')
+            return True
+        except WebDriverException:
+            return False
+
+    def acquire(self, timeout=None):
+        """
+        Lease a healthy browser session, starting a new one if the pool is not full
+        Blocks until a session is free; returns None if timeout expires first
+        """
+        while True:
+            with self.condition:
+                if not self.idle and len(self.slots) >= self.size:
+                    if not self.condition.wait_for(
+                            lambda: self.idle or len(self.slots) < self.size, timeout):
+                        return None
+                if self.idle:
+                    session = self.idle.pop()
+                    slot = None
+                else:
+                    session = None
+                    slot = self._free_slot()
+                    self.slots.add(slot)
+
+            if session is None:
+                return self._start_session(slot)
+            over_limit = supervisor.over_limit(session)
+            if over_limit is None and self.is_healthy(session):
+                return session
+            print(' * Browser session {} is {}, restarting'.format(session.slot, over_limit or 'not responding'))
+            self._retire(session)
+
+    def release(self, session, failed=False):
+        """
+        Return a leased session to the pool
+        Sessions are recycled when they have crashed or have run too many questions
+        """
+        session.questions += 1
+        crashed = failed and not self.is_healthy(session)
+        over_limit = supervisor.over_limit(session)
+        if over_limit:
+            print(' * Browser session {} is {}, restarting'.format(session.slot, over_limit))
+        if crashed or over_limit or session.questions >= self.max_questions:
+            self._retire(session)
+            return
+        with self.condition:
+            self.idle.append(session)
+            self.condition.notify()
+
+    def _retire(self, session):
+        session.backend.close()
+        try:
+            session.driver.quit()
+        except Exception:
+            # The browser may have crashed
+            pass
+        supervisor.retired(session)
+        with self.condition:
+            self.slots.discard(session.slot)
+            self.condition.notify()
+
+    def warm(self, count=None):
+        """
+        Start browser sessions ahead of the first question
+        """
+        count = self.size if count is None else min(count, self.size)
+        sessions = []
+        try:
+            for _ in range(count):
+                session = self.acquire(timeout=0)
+                if session is None:
+                    break
+                sessions.append(session)
+        except WebDriverException as error:
+            print(' * ERROR: Could not start browser: ' + str(error).strip())
+        for session in sessions:
+            with self.condition:
+                self.idle.append(session)
+                self.condition.notify()
+        print(' * Browser pool warmed with {} session(s)'.format(len(sessions)))
+        self.warmed.set()
+
+    def status(self):
+        """
+        Numbers of browser sessions, and their processes and memory use
+        """
+        with self.condition:
+            counts = {'size': self.size, 'sessions': len(self.slots), 'idle': len(self.idle)}
+        return dict(counts, processes=supervisor.status())
+
+    def shutdown(self):
+        """
+        Quit all idle browser sessions
+        """
+        with self.condition:
+            sessions, self.idle = self.idle, []
+        for session in sessions:
+            self._retire(session)
+
+
+browser_pool = BrowserPool(CONFIG.BROWSER_POOL_SIZE, CONFIG.BROWSER_SESSION_MAX_QUESTIONS)
@@ -1,12 +1,94 @@
 # Port for Testing Facade to run on
 TESTING_FACADE_PORT = 5001
+# Serve with uvicorn (pip install uvicorn asgiref) rather than the Flask server. Can also be given with --asgi
+ASGI = False
+# Time in seconds to wait for questions in progress to be answered when the facade is stopped with SIGTERM
+DRAIN_TIMEOUT = 300
+# Maximum time in seconds a request for the status of a question can wait for it to change
+LONG_POLL_TIMEOUT = 60
 # URL of nmos-js instance for testing
 NCUT_URL = "http://localhost:3000/#/"
+# Directory of a production build of nmos-js (yarn build in the Development directory) for the
+# facade to serve itself, in place of NCUT_URL, or None. Can also be given with --ncut-build
+NCUT_BUILD_DIR = None
 # URL of NMOS Testing Tool's mock registry
 MOCK_REGISTRY_URL = "http://127.0.0.1:5102/"
 # Browser to use for testing. Matching webdriver must be installed
 BROWSER = 'Chrome'
 # Use browser in headless mode. Set to False to have each test run in a visible window
 HEADLESS = True
+# 'performance' to block images, fonts and source maps, disable animations and background throttling
+# and keep each browser session's profile, and so its cache of nmos-js, between runs (Chrome and Edge);
+# 'standard' to load nmos-js as a user's browser would
+BROWSER_PROFILE = 'standard'
+# 'cdp' to run page scripts over a DevTools Protocol websocket to each browser (Chrome and Edge),
+# which is faster than 'webdriver' and is notified as network requests finish; falls back to 'webdriver'
+DRIVER_BACKEND = 'cdp'
+# Directory for the browser profiles kept by the performance profile, one per pool session, or None for
+# a directory named after TESTING_FACADE_PORT in the system's temporary directory. Profiles cannot be
+# shared by two facades
+BROWSER_PROFILE_DIR = None
 # Time in seconds to wait for elements to load
 WAIT_TIME = 5
+# Number of long-lived browser sessions kept warm for running tests
+BROWSER_POOL_SIZE = 4
+# Restart a browser session after it has run this many questions
+BROWSER_SESSION_MAX_QUESTIONS = 50
+# Restart a browser session whose driver and browser processes together use more than this much
+# memory in MB, or more than this percentage of CPU (100 per core), or None for no limit. Needs psutil
+MAX_SESSION_RSS_MB = 1500
+MAX_SESSION_CPU_PERCENT = None
+# Time in seconds between checks of the browser sessions' processes, memory and CPU use
+SUPERVISOR_INTERVAL = 5
+# Additional nmos-js settings seeded into localStorage before each test, keyed by
+# nmos-js setting name, e.g. {'Paging Limit': 10}
+NMOS_JS_SETTINGS = {}
+# Time in seconds to wait for nmos-js to finish loading data
+READY_TIMEOUT = 20
+# Time in seconds without network activity after which nmos-js is considered settled
+NETWORK_QUIET_TIME = 0.25
+# Time in seconds between checks of nmos-js network activity
+READY_POLL_INTERVAL = 0.05
+# Time in seconds to wait for the registry to change before giving up
+CHANGE_TIMEOUT = 80
+# Maximum time in seconds for an IS-05 activation made through nmos-js to show on the Connection API's /active endpoint
+ACTIVATION_TIMEOUT = 10
+# Time in seconds of a question's timeout kept back from its test method for tearing down and sending the answer
+DEADLINE_MARGIN = 1
+# Time in seconds between refreshes of a page being watched for the registry to change
+WATCH_REFRESH_INTERVAL = 0.25
+# Maximum number of browser sessions used to probe resources in parallel within a test
+FAN_OUT_SHARDS = 4
+# Number of questions that can be answered at the same time
+QUESTION_WORKERS = 4
+# Maximum number of questions waiting to be answered before new questions are refused
+QUESTION_QUEUE_SIZE = 16
+# Number of connections, and threads, used to send answers back to NMOS Testing
+ANSWER_POOL_SIZE = 4
+# Time in seconds to wait to connect to NMOS Testing, and for its response, when sending an answer
+ANSWER_CONNECT_TIMEOUT = 3
+ANSWER_READ_TIMEOUT = 10
+# Number of times to retry sending an answer, and initial delay in seconds between retries
+ANSWER_RETRIES = 3
+ANSWER_RETRY_DELAY = 0.5
+# Serve nmos-js views scraped for earlier questions, such as list pages and receivers' connect
+# tabs, from memory while the registry is unchanged. Off by default, as changes are only seen if the
+# Query API gives the time of its latest change, including removals, in X-Paging-Until
+SCRAPE_CACHE = False
+# Maximum number of scraped views to keep for each suite
+SCRAPE_CACHE_SIZE = 256
+# Directory to write a JSON lines trace of step timings for each run to, or None for no trace
+TRACE_DIR = None
+# Directory to record each question, the browser calls made to answer it and the answer to,
+# for replaying with Replay.py, or None to not record
+RECORD_DIR = None
+# Questions to profile, by question id, test class name or both, e.g. 'IS0503AutoTest.test_01'.
+# A question is also profiled if its metadata has "profile": true
+PROFILE_QUESTIONS = []
+# Directory to write profiles to: a cProfile of the facade answering each profiled question, and
+# a Chrome performance trace of nmos-js while its test method runs (needs DRIVER_BACKEND 'cdp')
+PROFILE_DIR = 'profiles'
+# Chrome trace categories to record in the performance trace
+PROFILE_TRACE_CATEGORIES = ['devtools.timeline', 'disabled-by-default-devtools.timeline',
+                            'disabled-by-default-devtools.timeline.frame', 'v8.execute', 'blink.user_timing',
+                            'loading', 'latencyInfo']
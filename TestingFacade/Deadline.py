@@ -0,0 +1,69 @@
+# Copyright (C) 2021 Advanced Media Workflow Association
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import time
+
+
+class DeadlineExceeded(Exception):
+    """
+    A question could not be answered before its timeout
+    """
+
+
+class Deadline:
+    """
+    Time left to answer a question before NMOS Testing stops waiting for the answer, from the
+    question's timeout, to which the waits and loops of a test method are shortened
+    A deadline without a timeout never expires
+    """
+
+    def __init__(self, timeout=None, start=None, margin=0):
+        """
+        timeout is in seconds from start, a time.monotonic() time; margin is kept back from
+        the time left for tearing down and sending the answer
+        """
+        start = time.monotonic() if start is None else start
+        self.timeout = timeout
+        self.margin = margin
+        # time.monotonic() time of the question's timeout, or None
+        self.expires = start + timeout if timeout is not None else None
+
+    def remaining(self):
+        """
+        Seconds left for the test method, or None if there is no timeout
+        """
+        if self.expires is None:
+            return None
+        return max(self.expires - self.margin - time.monotonic(), 0)
+
+    def expired(self):
+        """
+        True once there is no time left for the test method
+        """
+        return self.remaining() == 0
+
+    def clamp(self, timeout):
+        """
+        A wait of up to timeout seconds, shortened to the time left
+        """
+        remaining = self.remaining()
+        return timeout if remaining is None else min(timeout, remaining)
+
+    def overrun(self):
+        """
+        Seconds past the question's timeout, or 0
+        """
+        if self.expires is None:
+            return 0
+        return max(time.monotonic() - self.expires, 0)
@@ -0,0 +1,242 @@
+# Copyright (C) 2021 Advanced Media Workflow Association
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import itertools
+import json
+import threading
+import time
+import requests
+from selenium.common.exceptions import JavascriptException, WebDriverException
+import Config as CONFIG
+
+try:
+    import websocket
+except ImportError:
+    websocket = None
+
+
+class WebDriverBackend:
+    """
+    Runs page scripts through WebDriver, one HTTP round trip to the driver per script
+    """
+    name = 'webdriver'
+
+    def __init__(self, driver):
+        self.driver = driver
+
+    def execute_script(self, script, *args):
+        return self.driver.execute_script(script, *args)
+
+    def wait_for_network_event(self, timeout):
+        """
+        Wait up to timeout for a request made by the page to finish
+        WebDriver has no network events, so this just waits
+        """
+        time.sleep(timeout)
+
+    def start_trace(self, categories):
+        """
+        Start recording a Chrome performance trace of the page
+        Returns False as WebDriver cannot receive the trace events
+        """
+        return False
+
+    def stop_trace(self):
+        """
+        Stop recording the performance trace
+        Returns list of trace events
+        """
+        return []
+
+    def close(self):
+        pass
+
+
+class CDPBackend(WebDriverBackend):
+    """
+    Runs page scripts over a persistent DevTools Protocol websocket to the browser's page,
+    bypassing the driver, with network events delivered as they happen
+    Falls back to WebDriver if the websocket closes
+    """
+    name = 'cdp'
+
+    def __init__(self, driver):
+        super().__init__(driver)
+        self.ids = itertools.count(1)
+        self.condition = threading.Condition()
+        # Ids of the commands waiting for a result, and the results received for them
+        self.pending = set()
+        self.results = {}
+        self.closed = False
+        self.network_events = 0
+        self.trace_events = []
+        self.tracing_complete = False
+        self.socket = websocket.create_connection(self._page_websocket_url(driver), timeout=None,
+                                                  suppress_origin=True)
+        threading.Thread(target=self._read, name='cdp-reader', daemon=True).start()
+        self.send('Network.enable', {})
+
+    @staticmethod
+    def _page_websocket_url(driver):
+        """
+        Find the DevTools websocket of the page the driver controls
+        """
+        capabilities = driver.capabilities
+        options = capabilities.get('goog:chromeOptions') or capabilities.get('ms:edgeOptions') or {}
+        debugger_address = options.get('debuggerAddress')
+        if not debugger_address:
+            raise WebDriverException('Browser does not expose a DevTools debugger address')
+        targets = requests.get('http://{}/json'.format(debugger_address), timeout=CONFIG.WAIT_TIME).json()
+        pages = [target for target in targets if target.get('type') == 'page']
+        # chromedriver uses DevTools target ids as window handles
+        handle = driver.current_window_handle
+        page = next((target for target in pages if target['id'] == handle), pages[0] if pages else None)
+        if page is None:
+            raise WebDriverException('No DevTools page target found')
+        return page['webSocketDebuggerUrl']
+
+    def _read(self):
+        while True:
+            try:
+                message = json.loads(self.socket.recv())
+            except Exception:
+                with self.condition:
+                    self.closed = True
+                    self.condition.notify_all()
+                return
+            with self.condition:
+                if 'id' in message:
+                    if message['id'] not in self.pending:
+                        # The command's wait has timed out
+                        continue
+                    self.results[message['id']] = message
+                elif message.get('method') in ('Network.loadingFinished', 'Network.loadingFailed'):
+                    self.network_events += 1
+                elif message.get('method') == 'Tracing.dataCollected':
+                    self.trace_events.extend(message['params']['value'])
+                    continue
+                elif message.get('method') == 'Tracing.tracingComplete':
+                    self.tracing_complete = True
+                else:
+                    continue
+                self.condition.notify_all()
+
+    def send(self, method, params):
+        """
+        Send a DevTools command and wait for its result
+        Returns the result; raises WebDriverException if the command failed
+        """
+        command_id = next(self.ids)
+        with self.condition:
+            self.pending.add(command_id)
+        try:
+            try:
+                self.socket.send(json.dumps({'id': command_id, 'method': method, 'params': params}))
+            except Exception as error:
+                with self.condition:
+                    self.closed = True
+                raise WebDriverException('DevTools connection lost: {}'.format(error))
+
+            deadline = time.monotonic() + CONFIG.READY_TIMEOUT
+            with self.condition:
+                while command_id not in self.results:
+                    remaining = deadline - time.monotonic()
+                    if self.closed or remaining <= 0:
+                        raise WebDriverException('No DevTools response')
+                    self.condition.wait(remaining)
+                response = self.results.pop(command_id)
+        finally:
+            with self.condition:
+                self.pending.discard(command_id)
+                # A reply may have arrived as the wait timed out
+                self.results.pop(command_id, None)
+        if 'error' in response:
+            raise WebDriverException(response['error'].get('message'))
+        return response.get('result', {})
+
+    @staticmethod
+    def _evaluate_command(script, args):
+        # Run the script as the body of a function, as WebDriver does, with its arguments
+        # passed as JSON; returned values must also be JSON
+        expression = '(function () {\n' + script + '\n}).apply(null, ' + json.dumps(list(args)) + ')'
+        return 'Runtime.evaluate', {'expression': expression, 'returnByValue': True}
+
+    @staticmethod
+    def _value(result):
+        if 'exceptionDetails' in result:
+            details = result['exceptionDetails']
+            raise JavascriptException(details.get('exception', {}).get('description') or details.get('text'))
+        return result['result'].get('value')
+
+    def execute_script(self, script, *args):
+        if self.closed:
+            return super().execute_script(script, *args)
+        return self._value(self.send(*self._evaluate_command(script, args)))
+
+    def wait_for_network_event(self, timeout):
+        """
+        Wait up to timeout for a request made by the page to finish, returning as soon as one does
+        Once the websocket has closed there are no network events, so this just waits
+        """
+        if self.closed:
+            return super().wait_for_network_event(timeout)
+        with self.condition:
+            seen = self.network_events
+            self.condition.wait_for(lambda: self.network_events != seen or self.closed, timeout)
+
+    def start_trace(self, categories):
+        """
+        Start recording a Chrome performance trace of the page, with events reported over the websocket
+        Returns True if tracing started
+        """
+        if self.closed:
+            return False
+        with self.condition:
+            self.trace_events = []
+            self.tracing_complete = False
+        self.send('Tracing.start', {'transferMode': 'ReportEvents',
+                                    'traceConfig': {'includedCategories': categories}})
+        return True
+
+    def stop_trace(self):
+        """
+        Stop recording the performance trace, waiting for the browser to report the remaining events
+        Returns list of trace events
+        """
+        self.send('Tracing.end', {})
+        with self.condition:
+            self.condition.wait_for(lambda: self.tracing_complete or self.closed, CONFIG.READY_TIMEOUT)
+            events, self.trace_events = self.trace_events, []
+        return events
+
+    def close(self):
+        try:
+            self.socket.close()
+        except Exception:
+            pass
+
+
+def create_backend(driver):
+    """
+    Driver backend for a browser session, as configured by DRIVER_BACKEND, falling back to WebDriver
+    """
+    if CONFIG.DRIVER_BACKEND == 'cdp':
+        if websocket is None:
+            print(' * WARNING: websocket-client is not installed, using WebDriver for page scripts')
+        elif hasattr(driver, 'execute_cdp_cmd'):
+            try:
+                return CDPBackend(driver)
+            except (WebDriverException, requests.RequestException, OSError, websocket.WebSocketException) as error:
+                print(' * WARNING: Could not connect to DevTools, using WebDriver for page scripts: ' + str(error))
+    return WebDriverBackend(driver)
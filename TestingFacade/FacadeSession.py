@@ -0,0 +1,130 @@
+# Copyright (C) 2021 Advanced Media Workflow Association
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import threading
+import time
+from urllib.parse import urlparse
+
+
+def run_key(answer_uri):
+    """
+    Identify the NMOS Testing run a question belongs to by the host and port of its answer_uri
+    """
+    return urlparse(answer_uri).netloc
+
+
+class FacadeSession:
+    """
+    Facade state for one NMOS Testing run: the selected automated test class instance,
+    which holds the run's multipart question storage and leases its own browser sessions
+    """
+
+    def __init__(self, key):
+        self.key = key
+        self.test_class_name = None
+        self.tests = None
+        # time.monotonic() time the run's post_tests_message was accepted, if it has been
+        self.finished_at = None
+
+    @property
+    def finished(self):
+        return self.finished_at is not None
+
+    def finish(self):
+        """
+        Note that the run's suite has ended, so that its clear request can be matched to it
+        """
+        self.finished_at = time.monotonic()
+
+    @property
+    def host(self):
+        return self.key.rsplit(':', 1)[0].strip('[]')
+
+    def select_test_class(self, test_class_name, tests):
+        """
+        Start a new suite with a fresh instance of the given automated test class
+        """
+        self.test_class_name = test_class_name
+        self.tests = tests
+        self.finished_at = None
+
+    def end(self):
+        """
+        Drop the automated test class instance and its per-suite state
+        """
+        if self.tests is not None:
+            self.tests.reset_for_new_suite()
+        self.tests = None
+        self.test_class_name = None
+
+    def status(self):
+        return {
+            'run': self.key,
+            'test_class': self.test_class_name,
+            'mock_registry_url': self.tests.mock_registry_url if self.tests else None,
+            'finished': self.finished
+        }
+
+
+class FacadeSessions:
+    """
+    Facade sessions for the NMOS Testing runs currently using the facade
+    """
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.sessions = {}
+
+    def session_for(self, answer_uri):
+        """
+        Find the session for the run a question belongs to, starting one if necessary
+        """
+        key = run_key(answer_uri)
+        with self.lock:
+            if key not in self.sessions:
+                self.sessions[key] = FacadeSession(key)
+            return self.sessions[key]
+
+    def end_sessions_for(self, client_host, answer_uri=None):
+        """
+        End the session of the run which sent a clear request
+        The run is identified by answer_uri if given. NMOS Testing does not send one, so otherwise
+        it is the client's only session or, when several runs share its host, the one whose
+        post_tests_message was accepted most recently, as NMOS Testing clears straight after it;
+        runs from that host which are still going are never ended
+        Returns list of ended sessions
+        """
+        with self.lock:
+            if answer_uri:
+                candidates = [self.sessions[run_key(answer_uri)]] if run_key(answer_uri) in self.sessions else []
+            else:
+                candidates = [session for session in self.sessions.values() if session.host == client_host]
+                if not candidates and len(self.sessions) == 1:
+                    candidates = list(self.sessions.values())
+                if len(candidates) > 1:
+                    finished = [session for session in candidates if session.finished]
+                    candidates = [max(finished, key=lambda session: session.finished_at)] if finished else []
+                    if not finished:
+                        print(' * WARNING: Clear request from {} did not match a finished run, '
+                              'not clearing any'.format(client_host))
+            for session in candidates:
+                del self.sessions[session.key]
+
+        for session in candidates:
+            session.end()
+        return candidates
+
+    def status(self):
+        with self.lock:
+            return [session.status() for session in self.sessions.values()]
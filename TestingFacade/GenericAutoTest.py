@@ -1,86 +1,430 @@
+import copy
+import json
+import queue
 import time
-from selenium import webdriver
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+from urllib.parse import quote
 from selenium.webdriver.common.keys import Keys
-from selenium.common.exceptions import NoSuchElementException
+from selenium.common.exceptions import NoSuchElementException, WebDriverException
 from selenium.webdriver.common.by import By
 from selenium.webdriver.support import expected_conditions as EC
 from selenium.webdriver.support.ui import WebDriverWait
+from ActivationTracker import ActivationTracker
+from BrowserPool import browser_pool
+from Deadline import Deadline, DeadlineExceeded
+from Metrics import metrics, timed
+from PageSnapshot import PageChange, PageSnapshot
+from Recording import recorded
+from ScrapeCache import ScrapeCache
 import Config as CONFIG
+import PageScripts
+
+# Paging Limit nmos-js uses when it is not set
+DEFAULT_PAGING_LIMIT = 10
+
+# nmos-js settings that are stored in localStorage as JSON rather than as plain strings
+JSON_SETTINGS = ['RQL', 'Paging Limit', 'Friendly Parameters', 'Auth Enabled', 'NMOS Bridge Mode', 'Connect Filter']
+
 
 class GenericAutoTest:
     """
     Base test class for automated version of NMOS Controller test suite without Testing Façade
     """
+
+    # nmos-js settings for this suite which override those from Config.py
+    SETTINGS_OVERRIDES = {}
+
     def __init__(self):
         self.NCuT_url = CONFIG.NCUT_URL
         self.mock_registry_url = CONFIG.MOCK_REGISTRY_URL
         self.multipart_question_storage = {}
+        self.session = None
+        self.driver = None
+        self.backend = None
+        # Time left to answer the current question, to which waits are shortened
+        self.deadline = Deadline()
+        # Tape recording or replaying the calls made by the current test method, if any
+        self.tape = None
+        self.recording_depth = 0
+        # Name of this suite's recordings, and number of questions recorded, when recording
+        self.recording_name = '{}_{}'.format(type(self).__name__, time.strftime('%Y%m%d-%H%M%S'))
+        self.recorded_questions = 0
+        # Views scraped for earlier questions of the suite, shared with the copies made by lease_workers
+        self.scrape_cache = ScrapeCache(CONFIG.SCRAPE_CACHE_SIZE)
+        # Cleared by test methods which must see the registry change, to always read nmos-js
+        self.use_scrape_cache = True
 
     def reset_for_new_suite(self):
         """
         Clear per-suite state on the shared automation instance
         """
         self.multipart_question_storage = {}
+        self.scrape_cache.clear()
 
+    @timed('set_up_test')
     def set_up_test(self):
-        # Set up webdriver
-        browser = getattr(webdriver, CONFIG.BROWSER)
-        get_options = getattr(webdriver, CONFIG.BROWSER + 'Options', False)
-        if get_options:
-            options = get_options()
-            if CONFIG.HEADLESS:
-                options.add_argument("--headless=new")
-                options.add_argument("--window-size=1920,1080");
-                options.add_argument("--start-maximized");
-            self.driver = browser(options=options)
-        else:
-            self.driver = browser()
-        self.driver.implicitly_wait(CONFIG.WAIT_TIME)
-        # Launch browser, navigate to nmos-js and update query api url to mock registry
-        self.driver.get(self.NCuT_url + "Settings")
+        self.scrape_cache.begin_question()
+        self.use_scrape_cache = True
+        # Lease a warm browser session and reset it rather than launching a new browser
+        self.session = browser_pool.acquire(timeout=self.deadline.remaining())
+        if self.session is None:
+            raise DeadlineExceeded('No browser session was free before the question\'s timeout')
+        self.driver = self.session.driver
+        self.backend = self.session.backend
+        self.prepare_session()
+
+    def prepare_session(self):
+        """
+        Reset the leased browser session and open the nmos-js menu
+        """
+        self.reset_session()
+
+        # Open menu to show link names if not already open
+        open_menu = self.driver.find_elements(By.XPATH, '//*[@title="Open menu"]')
+        if open_menu:
+            open_menu[0].click()
+
+    def lease_workers(self, count):
+        """
+        Lease up to count - 1 more browser sessions from the pool without waiting
+        Returns list of copies of this test instance, starting with this instance, each driving
+        its own session
+        """
+        workers = [self]
+        while len(workers) < count:
+            try:
+                session = browser_pool.acquire(timeout=0)
+            except WebDriverException as error:
+                print(' * WARNING: Could not start browser session for probing: ' + str(error).strip())
+                break
+            if session is None:
+                break
+            worker = copy.copy(self)
+            worker.session = session
+            worker.driver = session.driver
+            worker.backend = session.backend
+            # fan_out is recorded as a whole, so the workers' calls are not
+            worker.tape = None
+            try:
+                worker.prepare_session()
+            except WebDriverException as error:
+                print(' * WARNING: Could not prepare browser session for probing: ' + str(error).strip())
+                browser_pool.release(session, True)
+                break
+            workers.append(worker)
+        return workers
+
+    @recorded
+    def fan_out(self, items, probe, shards=None):
+        """
+        Run probe(tests, item) for each item, sharing the items between this browser session and
+        extra sessions leased from the pool, each probed by its own copy of this test instance
+        Returns list of probe results in item order, with None where a probe failed, or where
+        the question's timeout was reached before the item was probed
+        """
+        items = list(items)
+        shards = CONFIG.FAN_OUT_SHARDS if shards is None else shards
+        workers = self.lease_workers(max(1, min(shards, len(items))))
+
+        results = [None] * len(items)
+        pending = queue.Queue()
+        for index in range(len(items)):
+            pending.put(index)
+        failed = set()
+
+        tags = metrics.current_tags()
+
+        def run_shard(worker):
+            with metrics.tagged(**tags):
+                probe_shard(worker)
+
+        def probe_shard(worker):
+            # Stop at the question's timeout, leaving the remaining items unprobed
+            while not self.deadline.expired():
+                try:
+                    index = pending.get_nowait()
+                except queue.Empty:
+                    return
+                try:
+                    results[index] = probe(worker, items[index])
+                except WebDriverException as error:
+                    # Keep the other results; this item is reported as not found
+                    print(' * WARNING: Probe failed for item {}: {}'.format(index, str(error).strip()))
+                    failed.add(id(worker))
+
+        try:
+            if len(workers) == 1:
+                run_shard(self)
+            else:
+                with ThreadPoolExecutor(len(workers)) as executor:
+                    list(executor.map(run_shard, workers))
+        finally:
+            for worker in workers[1:]:
+                browser_pool.release(worker.session, id(worker) in failed)
+        if not pending.empty():
+            print(' * WARNING: Question timeout reached with {} of {} items not probed'.format(
+                pending.qsize(), len(items)))
+        return results
+
+    def settings_profile(self):
+        """
+        nmos-js settings for the test, from Config.py and the suite's overrides
+        Returns dict of setting name to value
+        """
+        profile = {
+            'Query API': self.mock_registry_url + "x-nmos/query/v1.3",
+            'RQL': False
+        }
+        profile.update(CONFIG.NMOS_JS_SETTINGS)
+        profile.update(self.SETTINGS_OVERRIDES)
+        return profile
+
+    def reset_session(self):
+        """
+        Clear state left in the browser by a previous question and seed the settings profile
+        Replaces localStorage from the nmos-js page the session is already showing, then loads
+        nmos-js once, on the Settings page, so that it mounts with the new settings, falling back
+        to the Settings form if they do not apply
+        """
+        profile = self.settings_profile()
+        stored = {name: json.dumps(value) if name in JSON_SETTINGS else value
+                  for name, value in profile.items()}
+        recording = self.tape is not None and not self.tape.replaying
+        settings_url = self.NCuT_url + "Settings"
+        if not self.execute_script(PageScripts.SEED_SETTINGS, stored, recording, settings_url):
+            # localStorage can only be reached from the nmos-js origin, e.g. if nmos-js could not
+            # be loaded when the session started
+            self.driver.get(settings_url)
+            self.execute_script(PageScripts.SEED_SETTINGS, stored, recording, settings_url)
+        self.driver.refresh()
+
+        if not self.verify_settings(profile):
+            print(' * WARNING: nmos-js did not apply seeded settings, using Settings form')
+            self.enter_settings(profile)
+
+    def verify_settings(self, profile):
+        """
+        Check the Settings form shows the Query API and RQL values from the profile
+        """
+        self.driver.find_element(By.NAME, "queryapi")
+        shown = self.execute_script(
+            'const queryApi = document.getElementsByName("queryapi")[0];'
+            'const useRql = document.getElementsByName("userql")[0];'
+            'return [queryApi ? queryApi.value : null, useRql ? useRql.checked : null];')
+        return shown == [profile['Query API'], profile['RQL']]
+
+    def enter_settings(self, profile):
+        """
+        Enter the Query API and RQL values from the profile in the Settings form
+        """
         query_api = self.driver.find_element(By.NAME, "queryapi")
         query_api.clear()
         if query_api.get_attribute('value') != '':
             time.sleep(1)
             query_api.send_keys(Keys.CONTROL + "a")
             query_api.send_keys(Keys.DELETE)
-        query_api.send_keys(self.mock_registry_url + "x-nmos/query/v1.3")
+        query_api.send_keys(profile['Query API'])
 
-        # Ensure that RQL is switched off
-        use_rql = self.driver.find_element(By.NAME, "userql")
-        if use_rql.get_attribute('checked') == "true":
-            use_rql.click()
+        self.set_rql_enabled(profile['RQL'])
 
-        # Open menu to show link names if not already open
-        open_menu = self.driver.find_elements(By.XPATH, '//*[@title="Open menu"]')
-        if open_menu:
-            open_menu[0].click()
+    def tear_down_test(self, failed=False):
+        """
+        Return the browser session to the pool, which restarts it if it has crashed
+        """
+        browser_pool.release(self.session, failed)
+        self.session = None
+        self.driver = None
+        self.backend = None
+
+    def wait_for(self, condition):
+        """
+        Wait up to READY_TIMEOUT, or until the question's timeout, for an expected condition to hold
+        Returns the condition's result, or raises TimeoutException
+        """
+        return WebDriverWait(self.driver, self.deadline.clamp(CONFIG.READY_TIMEOUT)).until(condition)
+
+    def execute_script(self, script, *args):
+        """
+        Run a script in the nmos-js page through the session's driver backend
+        """
+        return self.backend.execute_script(script, *args)
+
+    def recorded_responses(self):
+        """
+        Responses nmos-js has received since this was last called, when recording
+        Returns list of dict with method, url, status and body
+        """
+        if self.driver is None:
+            return []
+        try:
+            return self.execute_script(PageScripts.RECORDED_RESPONSES)
+        except WebDriverException:
+            return []
 
-    def tear_down_test(self):
-        self.driver.close()
+    def network_state(self):
+        """
+        Read nmos-js network activity from the page
+        Returns dict with pending and completed fetch counts, idle time and loading flag
+        """
+        return self.execute_script(PageScripts.NETWORK_STATE)
+
+    def wait_until_ready(self, since=None, timeout=None):
+        """
+        Wait until nmos-js has no fetches outstanding and is not showing a loading indicator
+        If since is given, also wait for a fetch to complete after that completed count
+        Returns True if ready, False if the wait timed out
+        """
+        timeout = self.deadline.clamp(CONFIG.READY_TIMEOUT if timeout is None else timeout)
+        quiet_time = CONFIG.NETWORK_QUIET_TIME * 1000
+
+        def ready():
+            state = self.network_state()
+            if since is not None and state['completed'] <= since:
+                return False
+            return state['pending'] == 0 and state['idle'] >= quiet_time and not state['loading']
 
+        # Check again as soon as a request finishes, or every READY_POLL_INTERVAL
+        deadline = time.monotonic() + timeout
+        while not ready():
+            if time.monotonic() >= deadline:
+                print(' * WARNING: nmos-js still loading after {}s'.format(timeout))
+                return False
+            self.backend.wait_for_network_event(CONFIG.READY_POLL_INTERVAL)
+        return True
+
+    def click_and_wait(self, element):
+        """
+        Click an element and wait for the network activity it causes to finish
+        """
+        completed = self.network_state()['completed']
+        element.click()
+        self.wait_until_ready(since=completed)
+
+    @recorded
+    @timed('refresh_page')
     def refresh_page(self):
         """
-        Click refresh button and sleep to allow loading time
+        Click refresh button and wait for the reloaded data
         """
-        refresh = WebDriverWait(self.driver, 20).until(EC.element_to_be_clickable((By.CSS_SELECTOR, "[aria-label='Refresh']")))
-        refresh.click()
-        time.sleep(1)
+        refresh = self.wait_for(EC.element_to_be_clickable((By.CSS_SELECTOR, "[aria-label='Refresh']")))
+        self.click_and_wait(refresh)
 
+    @recorded
+    @timed('navigate_to_page')
     def navigate_to_page(self, page):
         """
-        Navigate to page by link text, refresh page and sleep to allow loading time
+        Navigate to page by link text, then refresh page
         """
         self.driver.find_element(By.LINK_TEXT, page).click()
+        self.wait_until_ready()
         self.refresh_page()
 
+    def navigate_to_route(self, route):
+        """
+        Navigate straight to an nmos-js route, e.g. 'receivers/<id>/show', and wait for it to load
+        The page is refreshed if it is already showing
+        """
+        url = self.NCuT_url + route
+        if self.driver.current_url == url:
+            self.refresh_page()
+        else:
+            self.driver.get(url)
+            self.wait_until_ready()
+
+    @recorded
+    @timed('navigate_to_resource')
+    def navigate_to_resource(self, resource, label, resource_id=None, tab=None):
+        """
+        Navigate to the show page, or a tab such as 'connect', of a resource of the given type
+        Routes directly when the resource id is known, otherwise finds the resource by label
+        from the list page
+        """
+        if resource_id is not None:
+            route = '{}/{}/show'.format(resource, quote(resource_id, safe=''))
+            self.navigate_to_route(route + '/' + tab if tab else route)
+            return
+
+        self.navigate_to_page(resource.capitalize())
+        self.navigate_to_page(label)
+        if tab:
+            tab_link = self.wait_for(EC.element_to_be_clickable((By.NAME, tab)))
+            tab_link.click()
+            self.wait_until_ready()
+
+    @recorded
+    @timed('snapshot')
+    def snapshot(self):
+        """
+        Read the resources and controls on the current page in a single script
+        Returns PageSnapshot
+        """
+        return PageSnapshot.from_json(self.execute_script(PageScripts.PAGE_SNAPSHOT))
+
+    @recorded
+    @timed('find_resource_labels')
     def find_resource_labels(self):
         """
         Find all resources on a page by label
         Returns list of labels
         """
-        resources = self.driver.find_elements(By.NAME, "label")
-        return [entry.text for entry in resources]
+        return self.snapshot().labels
+
+    @recorded
+    @timed('watch_for_change')
+    def watch_for_change(self, predicate, timeout=None):
+        """
+        Watch the current list page, refreshing it every WATCH_REFRESH_INTERVAL, until
+        predicate(PageSnapshot) holds
+        The page is read in the browser whenever it changes, so a change is seen as soon as nmos-js shows it
+        Returns PageChange, or None if the predicate did not hold within the timeout
+        """
+        timeout = self.deadline.clamp(CONFIG.CHANGE_TIMEOUT if timeout is None else timeout)
+        refresh_interval = int(CONFIG.WATCH_REFRESH_INTERVAL * 1000)
+        initial = PageSnapshot.from_json(self.execute_script(PageScripts.CHANGE_WATCHER, refresh_interval))
+        if predicate(initial):
+            self.execute_script(PageScripts.STOP_WATCH)
+            return PageChange(initial, time.time(), [])
+
+        deadline = time.monotonic() + timeout
+        version = 0
+        try:
+            while time.monotonic() < deadline:
+                state = self.execute_script(PageScripts.WATCH_STATE)
+                if state is None:
+                    # The page was reloaded, so start watching it again
+                    state = {'version': None, 'changed_at': time.time() * 1000,
+                             'page': self.execute_script(PageScripts.CHANGE_WATCHER, refresh_interval)}
+                if state['version'] != version:
+                    version = state['version']
+                    page = PageSnapshot.from_json(state['page'])
+                    if predicate(page):
+                        return PageChange(page, state['changed_at'] / 1000, page.changed_rows(initial))
+                # The page changes when a refresh completes
+                self.backend.wait_for_network_event(CONFIG.READY_POLL_INTERVAL)
+        finally:
+            self.execute_script(PageScripts.STOP_WATCH)
+
+        print(' * WARNING: No change seen after {}s'.format(timeout))
+        return None
+
+    @recorded
+    def find_row(self, label):
+        """
+        Find the row on the current page for the resource with the given label
+        Returns ResourceRow
+        """
+        row = self.snapshot().row_for_label(label)
+        if row is None:
+            raise NoSuchElementException('No resource labelled ' + label)
+        return row
+
+    def find_row_element(self, row, name):
+        """
+        Find the element with the given name in a row of the current page
+        """
+        return self.driver.find_element(
+            By.XPATH, '(//*[@name="label"])[{}]/ancestor::tr//*[@name="{}"]'.format(row.index + 1, name))
 
     def set_rql_enabled(self, enabled):
         """
@@ -91,6 +435,7 @@ class GenericAutoTest:
         if enabled != is_checked:
             use_rql.click()
 
+    @recorded
     def get_summary_transport(self):
         """
         Read the transport value from a resource summary show page
@@ -103,78 +448,202 @@ class GenericAutoTest:
         except NoSuchElementException:
             return ''
 
-    def list_connect_tab_senders(self, receiver_label):
+    @recorded
+    def list_connect_tab_senders(self, receiver_label, receiver_id=None):
         """
         Return sender labels shown on a receiver's Connect tab
         """
-        self.navigate_to_page('Receivers')
-        self.navigate_to_page(receiver_label)
+        self.navigate_to_resource('receivers', receiver_label, receiver_id)
         if not self.check_connectable():
             return []
 
-        connect = WebDriverWait(self.driver, 20).until(
-            EC.element_to_be_clickable((By.NAME, "connect")))
+        connect = self.wait_for(EC.element_to_be_clickable((By.NAME, "connect")))
         connect.click()
-        time.sleep(1)
+        self.wait_until_ready()
         return self.find_resource_labels()
 
+    @recorded
+    @timed('next_page')
     def next_page(self):
         """
-        Navigate to next page via next button and sleep to allow loading time
+        Navigate to next page via next button and wait for it to load
+        """
+        self.click_and_wait(self.driver.find_element(By.NAME, "next"))
+
+    @recorded
+    @timed('previous_page')
+    def previous_page(self):
+        """
+        Navigate to previous page via prev button and wait for it to load
+        """
+        self.click_and_wait(self.driver.find_element(By.NAME, "prev"))
+
+    def crawl_pages(self):
+        """
+        Walk the pages of the current list from the first shown, visiting each once
+        Follows the next button, or the prev button if the list was shown newest first, and stops
+        where it is disabled, or if a page repeats one already seen
+        Yields PageSnapshot of each page
+        """
+        seen = set()
+        direction = None
+        while True:
+            page = self.snapshot()
+            ids = frozenset(zip(page.labels, page.ids))
+            if ids in seen:
+                return
+            seen.add(ids)
+            yield page
+            direction = direction or page.crawl_direction()
+            if not page.has_more(direction):
+                return
+            if self.deadline.expired():
+                print(' * WARNING: Question timeout reached before the last page')
+                return
+            if direction == 'next':
+                self.next_page()
+            else:
+                self.previous_page()
+
+    @recorded
+    def registry_version(self):
+        """
+        Version of the registry's contents for this question, read from its Query API
+        Returns str, or None if it could not be read or SCRAPE_CACHE is off for this question
+        """
+        if not CONFIG.SCRAPE_CACHE or not self.use_scrape_cache:
+            return None
+        timeout = max(self.deadline.clamp(CONFIG.WAIT_TIME), CONFIG.READY_POLL_INTERVAL)
+        profile = self.settings_profile()
+        return self.scrape_cache.registry_version(profile['Query API'],
+                                                  profile.get('Paging Limit', DEFAULT_PAGING_LIMIT), timeout)
+
+    def scraped(self, key, scrape):
+        """
+        Result of scrape() for the view identified by key, from the scrape cache if the registry
+        is unchanged since it was last scraped
         """
-        self.driver.find_element(By.NAME, "next").click()
-        time.sleep(1)
+        version = self.registry_version()
+        if version is None:
+            return scrape()
+        found, value = self.scrape_cache.get(key, version)
+        if not found:
+            value = scrape()
+            self.scrape_cache.put(key, version, value)
+        return value
 
+    def crawl_list(self, page):
+        """
+        Walk the pages of a list, such as 'Senders', from the first, serving pages from the scrape
+        cache while the registry is unchanged and navigating to the list only when one is not cached
+        Yields PageSnapshot of each page
+        """
+        version = self.registry_version()
+        cached = 0
+        direction = None
+        if version is not None:
+            while True:
+                found, snapshot = self.scrape_cache.get((page, cached), version)
+                if not found:
+                    break
+                cached += 1
+                yield snapshot
+                direction = direction or snapshot.crawl_direction()
+                if not snapshot.has_more(direction):
+                    return
+
+        self.navigate_to_page(page)
+        for index, snapshot in enumerate(self.crawl_pages()):
+            if version is not None:
+                self.scrape_cache.put((page, index), version, snapshot)
+            if index >= cached:
+                yield snapshot
+
+    def list_page(self, page):
+        """
+        First page of a list, such as 'Senders'
+        Returns PageSnapshot
+        """
+        pages = self.crawl_list(page)
+        try:
+            return next(pages)
+        finally:
+            pages.close()
+
+    def crawl_labels(self, page):
+        """
+        Labels of the resources on every page of a list, as each page is visited
+        """
+        for snapshot in self.crawl_list(page):
+            yield from snapshot.labels
+
+    @recorded
     def check_connectable(self):
         """
         Check if connect tab is active
         returns True if available, False if disabled
         """
-        connect_button = WebDriverWait(self.driver, 10).until(EC.visibility_of_element_located((By.NAME,
-                                                                                                "connect")))
-        disabled = connect_button.get_attribute("aria-disabled")
-        return True if disabled == 'false' else False
+        self.wait_for(EC.visibility_of_element_located((By.NAME, "connect")))
+        return bool(self.snapshot().connectable)
+
+    @contextmanager
+    def confirmed_activation(self):
+        """
+        Wait until the IS-05 activation requested by the clicks made in the block is active
+        Raises ActivationError if it is not requested, fails, or does not take effect within ACTIVATION_TIMEOUT
+        or before the question's timeout
+        """
+        tracker = ActivationTracker(lambda: self.execute_script(PageScripts.STAGED_PATCHES),
+                                    self.backend.wait_for_network_event,
+                                    self.deadline.clamp(CONFIG.ACTIVATION_TIMEOUT))
+        tracker.start()
+        yield
+        tracker.confirm()
 
+    @recorded
+    @timed('make_connection')
     def make_connection(self, sender):
         """
-        Navigate to connect tab, activate connection to given sender
+        Navigate to connect tab, activate connection to given sender and wait until it is active
+        Raises ActivationError if the activation fails
         """
-        connect = WebDriverWait(self.driver, 20).until(EC.element_to_be_clickable((By.NAME, "connect")))
+        connect = self.wait_for(EC.element_to_be_clickable((By.NAME, "connect")))
         connect.click()
+        self.wait_until_ready()
 
         # Find the row containing the correct sender and activate connection
-        senders = self.find_resource_labels()
-        row = [i for i, s in enumerate(senders) if s == sender][0]
-        activate_button = self.driver.find_elements(By.NAME, "activate")[row]
-        activate_button.click()
-        time.sleep(2)
+        row = self.find_row(sender)
+        with self.confirmed_activation():
+            self.click_and_wait(self.find_row_element(row, "activate"))
 
+    @recorded
+    @timed('remove_connection')
     def remove_connection(self, receiver):
         """
-        Deactivate a connection on a given receiver
+        Deactivate a connection on a given receiver and wait until it is inactive
+        Raises ActivationError if the deactivation fails
         """
-        receivers = self.find_resource_labels()
-        row = [i for i, r in enumerate(receivers) if r == receiver][0]
-        deactivate_button = self.driver.find_elements(By.NAME, "active")[row]
-        if deactivate_button.get_attribute('value') == "true":
-            deactivate_button.click()
-        time.sleep(2)
+        row = self.find_row(receiver)
+        if row.active:
+            with self.confirmed_activation():
+                self.click_and_wait(self.find_row_element(row, "active"))
 
+    @recorded
     def get_active_receiver(self):
         """
         Identify an active receiver
         Returns string of receiver label or None
         """
-        active_buttons = self.driver.find_elements(By.NAME, 'active')
-        active_row = [i for i, b in enumerate(active_buttons) if b.get_attribute('value') == "true"]
-        return None if not active_row else self.driver.find_elements(By.NAME, 'label')[active_row[0]].text
+        active_rows = self.snapshot().active_rows()
+        return active_rows[0].label if active_rows else None
 
+    @recorded
     def get_connected_sender(self):
         """
         Identify the sender a receiver is connected to
         Returns string of sender label
         """
-        active = WebDriverWait(self.driver, 20).until(EC.element_to_be_clickable((By.NAME, "active")))
-        active.click()
+        active = self.wait_for(EC.element_to_be_clickable((By.NAME, "active")))
+        self.click_and_wait(active)
 
         return self.driver.find_element(By.NAME, "sender").text
@@ -1,4 +1,3 @@
-import time
 from GenericAutoTest import GenericAutoTest
 
 
@@ -7,13 +6,26 @@ class IS0404AutoTest(GenericAutoTest):
     Automated version of NMOS Controller test suite IS0404
     """
 
-    def test_01(self, answers, metadata):
+    def _answers_for_listed(self, question, page):
+        """
+        Walk the pages of a list once, until every answer has been seen
+        Returns answer ids of the resources listed
+        """
+        answer_ids = dict(question.answer_ids_by_label)
+        actual_answers = []
+        for label in self.crawl_labels(page):
+            actual_answers += answer_ids.pop(label, [])
+            if not answer_ids:
+                break
+        return actual_answers
+
+    def test_01(self, question):
         """
         Ensure NCuT uses DNS-SD to find registry
         """
         return "NMOS-js does not use DNS-SD to find registry"
 
-    def test_02(self, answers, metadata):
+    def test_02(self, question):
         """
         Ensure NCuT can access the IS-04 Query API
         """
@@ -26,7 +38,7 @@ class IS0404AutoTest(GenericAutoTest):
         self.navigate_to_page('Senders')
         self.navigate_to_page('Receivers')
 
-    def test_03(self, answers, metadata):
+    def test_03(self, question):
         """
         Query API should be able to discover all the senders that are
         registered in the Registry
@@ -39,22 +51,9 @@ class IS0404AutoTest(GenericAutoTest):
         # If your NCuT implements pagination, you must ensure you view
         # every available page to complete this test.
 
-        self.navigate_to_page('Senders')
-        
-        # Loop through pages gathering all senders        
-        actual_answers = []
-
-        for i in range(len(answers)):
-            senders = self.find_resource_labels()
-            if not senders:
-                break
-            actual_answers += [answer['answer_id'] for answer in answers if answer['resource']['label']
-                               in senders]
-            self.next_page()
-
-        return actual_answers
+        return self._answers_for_listed(question, 'Senders')
 
-    def test_04(self, answers, metadata):
+    def test_04(self, question):
         """
         Query API should be able to discover all the receivers that are
         registered in the Registry
@@ -67,22 +66,9 @@ class IS0404AutoTest(GenericAutoTest):
         # If your NCuT implements pagination, you must ensure you view
         # every available page to complete this test.
 
-        self.navigate_to_page('Receivers')
-        
-        # Loop through pages gathering all receivers        
-        actual_answers = []
-
-        for i in range(len(answers)):
-            receivers = self.find_resource_labels()
-            if not receivers:
-                break
-            actual_answers += [answer['answer_id'] for answer in answers if answer['resource']['label']
-                               in receivers]
-            self.next_page()
-
-        return actual_answers
+        return self._answers_for_listed(question, 'Receivers')
 
-    def test_05(self, answers, metadata):
+    def test_05(self, question):
         """
         Reference Sender is put offline then back online
         First question
@@ -94,11 +80,11 @@ class IS0404AutoTest(GenericAutoTest):
         # After the 'Next' button has been clicked one of those senders
         # will be put 'offline'.
 
-        # Save current list of senders
-        self.navigate_to_page('Senders')
-        self.multipart_question_storage['test_05'] = self.find_resource_labels()
+        # Save current list of senders, as nmos-js shows it rather than as cached
+        self.use_scrape_cache = False
+        self.multipart_question_storage['test_05'] = self.list_page('Senders').labels
 
-    def test_05_1(self, answers, metadata):
+    def test_05_1(self, question):
         """
         Reference Sender is put offline then back online
         Second question
@@ -107,18 +93,19 @@ class IS0404AutoTest(GenericAutoTest):
         # 'offline'
 
         # Get current list of senders and compare against previously saved list
-        self.navigate_to_page('Senders')
-        sender_list = self.find_resource_labels()
+        self.use_scrape_cache = False
+        sender_list = self.list_page('Senders').labels
         offline_sender = list(set(self.multipart_question_storage['test_05']) - set(sender_list))
+        if not offline_sender:
+            return None
         # Save offline sender
         self.multipart_question_storage['test_05_1'] = offline_sender[0]
 
-        actual_answer = [answer['answer_id'] for answer in answers
-                         if answer['resource']['label'] == offline_sender[0]][0]
+        actual_answer = question.answer_id_for_label(offline_sender[0])
 
         return actual_answer
 
-    def test_05_2(self, answers, metadata):
+    def test_05_2(self, question):
         """
         Reference Sender is put offline then back online
         Third question
@@ -133,21 +120,16 @@ class IS0404AutoTest(GenericAutoTest):
         # and the NCuT updating.
 
         self.navigate_to_page('Senders')
-        sender_list = set()
-
-        # Find all senders, keep checking until same as number of senders at start of test
-        while len(sender_list) < len(self.multipart_question_storage['test_05']):
-            time.sleep(4)
-            self.refresh_page()
-            senders = self.find_resource_labels()
-            sender_list.update(senders)
-            last_sender = senders[-1]
-
-        # Check same sender came back
-        if last_sender == self.multipart_question_storage['test_05_1']:
+        sender_count = len(self.multipart_question_storage['test_05'])
+
+        # Watch senders until there are as many as at the start of the test
+        change = self.watch_for_change(lambda page: len(page.rows) >= sender_count)
+        if change is None:
+            return None
+
+        # Check same sender came back; it may already have been listed when the watch started,
+        # so look for it among all the senders shown rather than only those which changed
+        if self.multipart_question_storage['test_05_1'] in change.snapshot.labels:
             return "Next"
         else:
             return "Unrecognised Sender"
-
-
-IS0404tests = IS0404AutoTest()
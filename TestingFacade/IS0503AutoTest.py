@@ -1,4 +1,3 @@
-import time
 from GenericAutoTest import GenericAutoTest
 
 
@@ -6,7 +5,7 @@ class IS0503AutoTest(GenericAutoTest):
     """
     Automated version of NMOS Controller test suite IS0503
     """
-    def test_01(self, answers, metadata):
+    def test_01(self, question):
         """
         Identify which Receiver devices are controllable via IS-05
         """
@@ -17,26 +16,24 @@ class IS0503AutoTest(GenericAutoTest):
         # Be aware that if your NCuT only displays Receivers which have a Connection API,
         # some of the Receivers in the following list may not be visible.
 
-        self.navigate_to_page('Receivers')
-        receivers = self.find_resource_labels()
-        
-        # Loop through receivers and check if connection tab is disabled
-        connectable_receivers = []
-        
-        for receiver in receivers:
-            self.navigate_to_page(receiver)
-            connectable = self.check_connectable()
-            if connectable:
-                connectable_receivers.append(receiver)
-            self.navigate_to_page('Receivers')
+        receivers = self.list_page('Receivers').rows
+
+        # Check whether each receiver's connection tab is disabled, across several browser sessions
+        def probe(tests, receiver):
+            def scrape():
+                tests.navigate_to_resource('receivers', receiver.label, receiver.id)
+                return tests.check_connectable()
+            return tests.scraped(('receivers', receiver.id or receiver.label, 'connectable'), scrape)
+
+        connectable = self.fan_out(receivers, probe)
+        connectable_receivers = [receiver.label for receiver, result in zip(receivers, connectable) if result]
 
         # Get answer ids for connectable receivers to send to test suite
-        actual_answers = [answer['answer_id'] for answer in answers if answer['resource']['label']
-                          in connectable_receivers]
+        actual_answers = question.answer_ids_for_labels(connectable_receivers)
 
         return actual_answers
 
-    def test_02(self, answers, metadata):
+    def test_02(self, question):
         """
         Instruct Receiver to subscribe to a Sender’s Flow via IS-05
         """
@@ -47,14 +44,13 @@ class IS0503AutoTest(GenericAutoTest):
         # Click the 'Next' button once the connection is active.
 
         # Get sender and receiver details from metadata sent with question
-        sender = metadata['sender']
-        receiver = metadata['receiver']
+        sender = question.sender
+        receiver = question.receiver
 
-        self.navigate_to_page('Receivers')
-        self.navigate_to_page(receiver['label'])
-        self.make_connection(sender['label'])
+        self.navigate_to_resource('receivers', receiver.label, receiver.id)
+        self.make_connection(sender.label)
 
-    def test_03(self, answers, metadata):
+    def test_03(self, question):
         """
         Disconnecting a Receiver from a connected Flow via IS-05
         """
@@ -64,11 +60,11 @@ class IS0503AutoTest(GenericAutoTest):
         # receiver: y
         # Click the 'Next' button once the connection has been removed.'
 
-        receiver = metadata['receiver']
+        receiver = question.receiver
         self.navigate_to_page('Receivers')
-        self.remove_connection(receiver['label'])
+        self.remove_connection(receiver.label)
 
-    def test_04(self, answers, metadata):
+    def test_04(self, question):
         """
         Indicating the state of connections via updates received from the
         IS-04 Query API
@@ -81,27 +77,26 @@ class IS0503AutoTest(GenericAutoTest):
         self.navigate_to_page('Receivers')
         receiver = self.get_active_receiver()
 
-        actual_answer = [answer['answer_id'] for answer in answers if answer['resource']['label'] == receiver][0]
+        actual_answer = question.answer_id_for_label(receiver)
 
         return actual_answer
 
-    def test_04_1(self, answers, metadata):
+    def test_04_1(self, question):
         """
         Indicating the state of connections via updates received from the
         IS-04 Query API
         Second question
         """
         # Use the NCuT to identify the sender currently connected to receiver x
-        receiver = metadata['receiver']
-        self.navigate_to_page('Receivers')
-        self.navigate_to_page(receiver['label'])
+        receiver = question.receiver
+        self.navigate_to_resource('receivers', receiver.label, receiver.id)
         sender = self.get_connected_sender()
 
-        actual_answer = [answer['answer_id'] for answer in answers if answer['resource']['label'] == sender][0]
+        actual_answer = question.answer_id_for_label(sender)
 
         return actual_answer
 
-    def test_04_2(self, answers, metadata):
+    def test_04_2(self, question):
         """
         Indicating the state of connections via updates received from the
         IS-04 Query API
@@ -117,16 +112,7 @@ class IS0503AutoTest(GenericAutoTest):
         # This includes any latency between the connection being removed
         # and the NCuT updating.
 
-        receiver = metadata['receiver']
         self.navigate_to_page('Receivers')
 
-        # Periodically refresh until no receiver is active
-        for i in range(1, 20):
-            time.sleep(4)
-            self.refresh_page()
-            receiver = self.get_active_receiver()
-            if not receiver:
-                break
-
-
-IS0503tests = IS0503AutoTest()
+        # Watch receivers until none is active
+        self.watch_for_change(lambda page: not page.active_rows())
@@ -0,0 +1,123 @@
+# Copyright (C) 2021 Advanced Media Workflow Association
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import functools
+import json
+import os
+import re
+import threading
+import time
+from contextlib import contextmanager
+import Config as CONFIG
+
+# Upper bounds in seconds of the span duration histogram buckets
+BUCKETS = [0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60, 120]
+
+
+class Metrics:
+    """
+    Timing spans for the steps taken to answer each question, tagged with the run, suite,
+    question id and outcome, kept as histograms and optionally written to a JSON trace per run
+    """
+
+    def __init__(self, trace_dir=None):
+        self.trace_dir = trace_dir
+        self.lock = threading.Lock()
+        self.histograms = {}
+        self.tags = threading.local()
+
+    def current_tags(self):
+        """
+        Tags of the question being answered on this thread
+        """
+        return getattr(self.tags, 'value', {'run': '', 'suite': '', 'question': ''})
+
+    @contextmanager
+    def tagged(self, **tags):
+        """
+        Tag the spans recorded on this thread, e.g. with the question being answered
+        """
+        previous = self.current_tags()
+        self.tags.value = dict(previous, **tags)
+        try:
+            yield
+        finally:
+            self.tags.value = previous
+
+    @contextmanager
+    def span(self, name):
+        """
+        Time a step, recording outcome 'error' if it raises
+        """
+        start = time.monotonic()
+        outcome = 'ok'
+        try:
+            yield
+        except BaseException:
+            outcome = 'error'
+            raise
+        finally:
+            self.record(name, time.monotonic() - start, outcome)
+
+    def record(self, name, duration, outcome, **tags):
+        tags = dict(self.current_tags(), **tags)
+        key = (name, tags['suite'], tags['question'], outcome)
+        with self.lock:
+            histogram = self.histograms.setdefault(key, {'buckets': [0] * len(BUCKETS), 'count': 0, 'sum': 0.0})
+            for index, bound in enumerate(BUCKETS):
+                if duration <= bound:
+                    histogram['buckets'][index] += 1
+            histogram['count'] += 1
+            histogram['sum'] += duration
+            if self.trace_dir:
+                self._write_trace(name, duration, outcome, tags)
+
+    def _write_trace(self, name, duration, outcome, tags):
+        run = re.sub(r'[^A-Za-z0-9_.-]', '_', tags['run'] or 'facade')
+        os.makedirs(self.trace_dir, exist_ok=True)
+        with open(os.path.join(self.trace_dir, run + '.jsonl'), 'a') as trace:
+            trace.write(json.dumps(dict(tags, span=name, outcome=outcome, duration=round(duration, 6),
+                                        end=time.time())) + '\n')
+
+    def prometheus(self):
+        """
+        Histograms in the Prometheus text exposition format
+        """
+        lines = ['# HELP facade_span_seconds Time taken by Testing Facade steps',
+                 '# TYPE facade_span_seconds histogram']
+        with self.lock:
+            for (name, suite, question, outcome), histogram in sorted(self.histograms.items()):
+                labels = 'span="{}",suite="{}",question="{}",outcome="{}"'.format(name, suite, question, outcome)
+                for bound, count in zip(BUCKETS, histogram['buckets']):
+                    lines.append('facade_span_seconds_bucket{{{},le="{}"}} {}'.format(labels, bound, count))
+                lines.append('facade_span_seconds_bucket{{{},le="+Inf"}} {}'.format(labels, histogram['count']))
+                lines.append('facade_span_seconds_sum{{{}}} {}'.format(labels, histogram['sum']))
+                lines.append('facade_span_seconds_count{{{}}} {}'.format(labels, histogram['count']))
+        return '\n'.join(lines) + '\n'
+
+
+def timed(name):
+    """
+    Decorator recording a span around each call of a method
+    """
+    def decorator(method):
+        @functools.wraps(method)
+        def wrapper(*args, **kwargs):
+            with metrics.span(name):
+                return method(*args, **kwargs)
+        return wrapper
+    return decorator
+
+
+metrics = Metrics(CONFIG.TRACE_DIR)
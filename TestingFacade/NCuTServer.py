@@ -0,0 +1,104 @@
+# Copyright (C) 2021 Advanced Media Workflow Association
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import gzip
+import hashlib
+import mimetypes
+import os
+import threading
+from flask import Blueprint, Response, abort, request
+from werkzeug.security import safe_join
+
+# Path under which the facade serves nmos-js
+NCUT_PATH = '/ncut/'
+
+# Types worth compressing; images and fonts are already compressed
+COMPRESSIBLE_TYPES = ('text/', 'application/javascript', 'application/json', 'image/svg+xml')
+
+
+class StaticBundle:
+    """
+    A production build of nmos-js (yarn build in the Development directory), served from memory
+    Files are read, and compressed, once; files under static/ have content hashes in their
+    names so can be cached by browsers indefinitely
+    """
+
+    def __init__(self, build_dir):
+        self.build_dir = os.path.abspath(build_dir)
+        self.lock = threading.Lock()
+        self.files = {}
+
+    def is_built(self):
+        return os.path.isfile(os.path.join(self.build_dir, 'index.html'))
+
+    def _load(self, path):
+        """
+        Read a file of the build, with its gzipped form if worth compressing
+        Returns dict or None if there is no such file
+        """
+        with self.lock:
+            if path in self.files:
+                return self.files[path]
+        full_path = safe_join(self.build_dir, path)
+        if full_path is None or not os.path.isfile(full_path):
+            return None
+        with open(full_path, 'rb') as static_file:
+            data = static_file.read()
+        mimetype = mimetypes.guess_type(full_path)[0] or 'application/octet-stream'
+        loaded = {
+            'data': data,
+            'gzip': gzip.compress(data, 6) if mimetype.startswith(COMPRESSIBLE_TYPES) else None,
+            'mimetype': mimetype,
+            'etag': hashlib.sha1(data).hexdigest()
+        }
+        with self.lock:
+            self.files[path] = loaded
+        return loaded
+
+    def response(self, path):
+        """
+        Response for a file of the build, compressed if the browser accepts it
+        """
+        loaded = self._load(path)
+        if loaded is None:
+            abort(404)
+        compressed = loaded['gzip'] is not None and 'gzip' in request.headers.get('Accept-Encoding', '')
+        response = Response(loaded['gzip'] if compressed else loaded['data'], mimetype=loaded['mimetype'])
+        if compressed:
+            response.headers['Content-Encoding'] = 'gzip'
+        response.headers['Vary'] = 'Accept-Encoding'
+        if path.startswith('static/'):
+            response.headers['Cache-Control'] = 'public, max-age=31536000, immutable'
+        else:
+            # index.html names the current bundle, so must be checked on each load
+            response.headers['Cache-Control'] = 'no-cache'
+        response.set_etag(loaded['etag'] + ('-gzip' if compressed else ''))
+        return response.make_conditional(request)
+
+
+def create_blueprint(bundle):
+    """
+    Flask blueprint serving nmos-js at NCUT_PATH
+    """
+    blueprint = Blueprint('ncut', __name__)
+
+    @blueprint.route(NCUT_PATH, methods=['GET'])
+    def ncut_index():
+        return bundle.response('index.html')
+
+    @blueprint.route(NCUT_PATH + '<path:path>', methods=['GET'])
+    def ncut_file(path):
+        return bundle.response(path)
+
+    return blueprint
@@ -0,0 +1,198 @@
+# Copyright (C) 2021 Advanced Media Workflow Association
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+# JavaScript run inside the nmos-js page by the automated tests
+
+# Count the fetches made by the nmos-js dataProvider so tests can wait for them to finish,
+# and keep the responses while the question is being recorded.
+# Safe to run more than once; installed before nmos-js loads where the browser allows it
+NETWORK_MONITOR = '''
+(function () {
+    if (window.__facade) return;
+    const state = { pending: 0, completed: 0, lastActivity: Date.now(), patches: [],
+                    responses: window.sessionStorage.getItem('__facadeRecord') ? [] : null };
+    window.__facade = state;
+    const fetch = window.fetch;
+    const staged = /\\/staged\\/?$/;
+    window.fetch = function (resource, options) {
+        const method = (options && options.method) || 'GET';
+        const url = typeof resource === 'string' ? resource : resource.url;
+        const body = options && typeof options.body === 'string' ? options.body : null;
+        state.pending += 1;
+        state.lastActivity = Date.now();
+        const settle = () => {
+            state.pending -= 1;
+            state.completed += 1;
+            state.lastActivity = Date.now();
+        };
+        return fetch.apply(this, arguments).then(
+            response => {
+                settle();
+                if (state.responses) {
+                    response.clone().text().then(text => state.responses.push(
+                        { method: method, url: response.url, status: response.status, body: text }));
+                }
+                // IS-05 requests to stage and activate connections, which the facade confirms
+                if (method === 'PATCH' && staged.test(response.url)) {
+                    response.clone().text().then(text => state.patches.push(
+                        { url: response.url, status: response.status, request: body, response: text }));
+                }
+                return response;
+            },
+            error => {
+                settle();
+                if (method === 'PATCH' && staged.test(url)) {
+                    state.patches.push({ url: url, status: 0, request: body, response: String(error) });
+                }
+                throw error;
+            });
+    };
+})();
+'''
+
+# Returns the responses kept since the last call, when recording
+RECORDED_RESPONSES = '''
+const state = window.__facade;
+return state && state.responses ? state.responses.splice(0) : [];
+'''
+
+# Returns the PATCHes to IS-05 /staged endpoints made since the last call, with their request
+# and response bodies
+STAGED_PATCHES = NETWORK_MONITOR + '''
+return window.__facade.patches.splice(0);
+'''
+
+# Stop Material-UI transitions, animations and ripples, so nmos-js settles as soon as it renders
+DISABLE_ANIMATIONS = '''
+(function () {
+    const style = document.createElement('style');
+    style.textContent = '*, *::before, *::after {' +
+        ' transition: none !important; animation: none !important; }' +
+        ' .MuiTouchRipple-root { display: none !important; }';
+    document.documentElement.appendChild(style);
+})();
+'''
+
+# Requests not needed by the tests, blocked by the performance browser profile
+BLOCKED_URLS = ['*.png', '*.jpg', '*.jpeg', '*.gif', '*.ico', '*.webp',
+                '*.woff', '*.woff2', '*.ttf', '*.otf', '*.eot',
+                '*fonts.googleapis.com*', '*fonts.gstatic.com*', '*.map']
+
+# react-admin shows a progress spinner in place of the refresh button, and the Loading
+# component in place of a page, while data is loading
+LOADING_SELECTOR = '.MuiCircularProgress-root, .MuiLinearProgress-root'
+
+# Returns outstanding and completed fetch counts, milliseconds since the last fetch
+# started or finished, and whether a loading indicator is shown
+NETWORK_STATE = NETWORK_MONITOR + '''
+const state = window.__facade;
+return {
+    pending: state.pending,
+    completed: state.completed,
+    idle: Date.now() - state.lastActivity,
+    loading: document.querySelector('%s') !== null
+};
+''' % LOADING_SELECTOR
+
+# Read the resources listed on the current page, with their ids from the show links, the
+# state of any active switch in their row, and the state of the connect tab and next and prev buttons
+PAGE_SNAPSHOT = '''
+const rows = [];
+document.getElementsByName('label').forEach((label, index) => {
+    const href = decodeURIComponent(label.getAttribute('href') || '');
+    const link = href.match(/#\\/([^/]+)\\/(.+)\\/show/);
+    const row = label.closest('tr');
+    const active = row ? row.querySelector('[name="active"]') : null;
+    rows.push({
+        index: index,
+        label: label.innerText.trim(),
+        resource: link ? link[1] : null,
+        id: link ? link[2] : null,
+        active: active ? active.value === 'true' : null
+    });
+});
+const connect = document.querySelector('[name="connect"]');
+const next = document.querySelector('button[name="next"]');
+const prev = document.querySelector('button[name="prev"]');
+return {
+    route: window.location.hash.replace(/^#\\/?/, ''),
+    rows: rows,
+    connectable: connect ? connect.getAttribute('aria-disabled') === 'false' : null,
+    next_enabled: next ? !next.disabled : null,
+    prev_enabled: prev ? !prev.disabled : null
+};
+'''
+
+# Watch the rows of the current list page for changes, with a DOM observer on the page content,
+# and click the refresh button every interval (in milliseconds, the script's argument) when
+# no fetch is outstanding. Returns the page as PAGE_SNAPSHOT does, when the watch started
+CHANGE_WATCHER = NETWORK_MONITOR + '''
+const readPage = function () {
+%s
+};
+if (window.__facadeWatch) window.__facadeWatch.stop();
+const watch = { version: 0, changedAt: Date.now(), page: readPage() };
+const update = () => {
+    const page = readPage();
+    if (JSON.stringify(page.rows) !== JSON.stringify(watch.page.rows)) {
+        watch.page = page;
+        watch.version += 1;
+        watch.changedAt = Date.now();
+    }
+};
+const observer = new MutationObserver(update);
+observer.observe(document.querySelector('main') || document.body,
+    { childList: true, subtree: true, attributes: true, characterData: true });
+const timer = setInterval(() => {
+    // The switches' state may change without a mutation, so also read the page on each tick
+    update();
+    const refresh = document.querySelector("[aria-label='Refresh']");
+    if (refresh && window.__facade.pending === 0) refresh.click();
+}, arguments[0]);
+watch.stop = () => {
+    observer.disconnect();
+    clearInterval(timer);
+    window.__facadeWatch = null;
+};
+window.__facadeWatch = watch;
+return watch.page;
+''' % PAGE_SNAPSHOT
+
+# Returns the number of changes seen by the change watcher, the time of the latest in
+# milliseconds since the epoch, and the page at that time
+WATCH_STATE = '''
+const watch = window.__facadeWatch;
+return watch ? { version: watch.version, changed_at: watch.changedAt, page: watch.page } : null;
+'''
+
+STOP_WATCH = '''
+if (window.__facadeWatch) window.__facadeWatch.stop();
+'''
+
+# Replace localStorage with the settings given (name to stored value), flag sessionStorage if the
+# question is being recorded, and point the page at the url given without nmos-js routing to it,
+# so that reloading is the only load of nmos-js with the new settings
+# Returns false, changing nothing, if the page is not showing the nmos-js document at that url
+SEED_SETTINGS = '''
+const url = new URL(arguments[2], window.location.href);
+if (window.location.origin !== url.origin || window.location.pathname !== url.pathname) return false;
+window.localStorage.clear();
+window.sessionStorage.clear();
+for (const [name, value] of Object.entries(arguments[0])) {
+    window.localStorage.setItem(name, value);
+}
+if (arguments[1]) window.sessionStorage.setItem("__facadeRecord", "true");
+window.history.replaceState(null, "", url.href);
+return true;
+'''
@@ -0,0 +1,100 @@
+# Copyright (C) 2021 Advanced Media Workflow Association
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+from collections import namedtuple
+
+# A resource listed on an nmos-js page
+# index is the row position on the page, active is None where the row has no active switch
+ResourceRow = namedtuple('ResourceRow', ['index', 'label', 'resource', 'id', 'active'])
+
+# A change seen while watching a page
+# detected_at is the time.time() at which the page changed, changed the rows added, removed
+# or switched on or off since the watch started
+PageChange = namedtuple('PageChange', ['snapshot', 'detected_at', 'changed'])
+
+
+class PageSnapshot:
+    """
+    Resources and controls shown on the current nmos-js page, read in a single script
+    """
+
+    def __init__(self, route, rows, connectable=None, next_enabled=None, prev_enabled=None):
+        self.route = route
+        self.rows = rows
+        self.connectable = connectable
+        self.next_enabled = next_enabled
+        self.prev_enabled = prev_enabled
+
+    @classmethod
+    def from_json(cls, json):
+        return cls(json['route'],
+                   [ResourceRow(**row) for row in json['rows']],
+                   json['connectable'],
+                   json['next_enabled'],
+                   # Not in recordings made before the prev button was read
+                   json.get('prev_enabled'))
+
+    def to_json(self):
+        return {
+            'route': self.route,
+            'rows': [row._asdict() for row in self.rows],
+            'connectable': self.connectable,
+            'next_enabled': self.next_enabled,
+            'prev_enabled': self.prev_enabled
+        }
+
+    @property
+    def labels(self):
+        return [row.label for row in self.rows]
+
+    @property
+    def ids(self):
+        return [row.id for row in self.rows]
+
+    def crawl_direction(self):
+        """
+        Pagination button leading from the first page of a list shown to the rest of the list:
+        'next' if the Query API listed the oldest resources first, or 'prev' if it listed the newest,
+        as IS-04 registries do when no paging bounds are given
+        """
+        return 'next' if self.next_enabled or not self.prev_enabled else 'prev'
+
+    def has_more(self, direction):
+        """
+        Check whether the list continues beyond this page in the direction given, 'next' or 'prev'
+        """
+        return bool(self.next_enabled if direction == 'next' else self.prev_enabled)
+
+    def row_for_label(self, label):
+        """
+        Find the first row with the given label
+        Returns ResourceRow or None
+        """
+        return next((row for row in self.rows if row.label == label), None)
+
+    def active_rows(self):
+        """
+        Rows whose active switch is on
+        """
+        return [row for row in self.rows if row.active]
+
+    def changed_rows(self, previous):
+        """
+        Rows added or switched on or off since a previous snapshot of the page, followed by rows removed
+        """
+        previous_rows = {(row.label, row.id): row for row in previous.rows}
+        current_keys = {(row.label, row.id) for row in self.rows}
+        changed = [row for row in self.rows if (row.label, row.id) not in previous_rows
+                   or previous_rows[(row.label, row.id)].active != row.active]
+        return changed + [row for key, row in previous_rows.items() if key not in current_keys]
@@ -0,0 +1,265 @@
+# Copyright (C) 2021 Advanced Media Workflow Association
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import json
+import os
+import threading
+import time
+import Config as CONFIG
+
+try:
+    import psutil
+except ImportError:
+    psutil = None
+
+# Errors from a process which has exited
+PROCESS_ERRORS = (OSError, psutil.Error) if psutil else (OSError,)
+
+# Seconds by which a process's start time may differ from that recorded in the pidfile, for it to be
+# taken as the same process rather than a new one which has been given the same process id
+START_TIME_TOLERANCE = 1
+
+
+def driver_process(driver):
+    """
+    The subprocess.Popen of the WebDriver process selenium started for a driver, if it started one
+    """
+    return getattr(getattr(driver, 'service', None), 'process', None)
+
+
+def is_running(process):
+    """
+    Check a tracked process, a psutil.Process or the driver's Popen, has not exited
+    psutil checks the process id has not been reused
+    """
+    try:
+        return process.poll() is None if hasattr(process, 'poll') else process.is_running()
+    except PROCESS_ERRORS:
+        return False
+
+
+class ProcessSupervisor:
+    """
+    Tracks the WebDriver and browser processes of each browser session, so that processes left
+    behind when a session is retired, or by an earlier run of this facade, are killed, and sessions
+    using more memory or CPU than the caps are recycled when they are next returned to the pool
+    Sessions are only killed once the pool has retired them; a question's timeout is kept by the
+    thread answering it
+    Browser processes and their usage are only seen with psutil installed; without it only the
+    WebDriver process of each session is tracked
+    """
+
+    def __init__(self, max_rss_mb, max_cpu_percent, interval):
+        self.max_rss_mb = max_rss_mb
+        self.max_cpu_percent = max_cpu_percent
+        self.interval = interval
+        self.lock = threading.Lock()
+        # Tracked processes, usage and any limit exceeded of each session, by session
+        self.sessions = {}
+        self.thread = None
+        # File recording the tracked processes, so that a later run of the facade can kill them
+        self.pidfile = None
+        self.reaped = 0
+        self.over_limit_count = 0
+
+    def register(self, session):
+        """
+        Start tracking the processes of a new session
+        """
+        with self.lock:
+            self.sessions[session] = {'pids': {}, 'over_limit': None, 'rss_mb': 0.0,
+                                      'cpu_percent': 0.0, 'root': driver_process(session.driver)}
+        self._refresh(session)
+
+    def _refresh(self, session):
+        """
+        Add the session's current processes to those tracked
+        Returns list of psutil.Process, empty without psutil
+        """
+        with self.lock:
+            entry = self.sessions.get(session)
+            if entry is None or entry['root'] is None:
+                return []
+            if psutil is None:
+                entry['pids'].setdefault(entry['root'].pid, entry['root'])
+                return []
+            root_pid = entry['root'].pid
+        try:
+            root = psutil.Process(root_pid)
+            found = [root] + root.children(recursive=True)
+        except psutil.Error:
+            return []
+        # Keep the process objects already tracked, which hold the CPU times of the last check
+        with self.lock:
+            pids = dict(entry['pids'])
+            for process in found:
+                pids.setdefault(process.pid, process)
+            added = len(pids) > len(entry['pids'])
+            entry['pids'] = pids
+            processes = [pids[process.pid] for process in found]
+        if added:
+            self._save_pids()
+        return processes
+
+    def over_limit(self, session):
+        """
+        Returns the limit the session has exceeded, as a message, or None
+        """
+        with self.lock:
+            entry = self.sessions.get(session)
+            return entry['over_limit'] if entry else None
+
+    def retired(self, session):
+        """
+        Kill any processes of a session which are still running after its driver has quit
+        """
+        with self.lock:
+            entry = self.sessions.pop(session, None)
+        if entry is None:
+            return
+        for process in entry['pids'].values():
+            if self._kill(process):
+                self.reaped += 1
+        self._save_pids()
+
+    @staticmethod
+    def _kill(process):
+        """
+        Kill a tracked process if it is still running
+        Returns True if it was killed
+        """
+        if not is_running(process):
+            return False
+        try:
+            process.kill()
+            return True
+        except PROCESS_ERRORS:
+            return False
+
+    def reap_orphans(self, pidfile):
+        """
+        Kill the WebDriver and browser processes recorded in pidfile by an earlier run of this
+        facade which are still running, then record this facade's processes in it
+        Processes started by other facades, or by anything else, are left alone
+        Returns the number of processes killed
+        """
+        self.pidfile = pidfile
+        if psutil is None:
+            print(' * WARNING: psutil is not installed, not reaping orphaned browser processes')
+            return 0
+        try:
+            with open(pidfile) as file:
+                recorded = json.load(file)
+        except (OSError, ValueError):
+            recorded = {}
+        reaped = 0
+        for pid, start_time in recorded.items():
+            try:
+                process = psutil.Process(int(pid))
+                if abs(process.create_time() - start_time) > START_TIME_TOLERANCE:
+                    # The process id has been reused
+                    continue
+                process.kill()
+                reaped += 1
+            except (psutil.Error, ValueError, TypeError):
+                pass
+        self._save_pids()
+        if reaped:
+            print(' * Killed {} browser process(es) left by an earlier run of this Testing Facade'.format(reaped))
+        self.reaped += reaped
+        return reaped
+
+    def _save_pids(self):
+        """
+        Record the process ids and start times of the tracked processes in the pidfile
+        """
+        if self.pidfile is None or psutil is None:
+            return
+        with self.lock:
+            pids = {pid: process.create_time() for entry in self.sessions.values()
+                    for pid, process in entry['pids'].items() if isinstance(process, psutil.Process)}
+            try:
+                os.makedirs(os.path.dirname(self.pidfile), exist_ok=True)
+                with open(self.pidfile + '.tmp', 'w') as file:
+                    json.dump(pids, file)
+                os.replace(self.pidfile + '.tmp', self.pidfile)
+            except OSError as error:
+                print(' * WARNING: Could not record browser processes in {}: {}'.format(self.pidfile, error))
+
+    def check(self):
+        """
+        Note the sessions exceeding the memory or CPU caps, for the pool to recycle
+        """
+        with self.lock:
+            sessions = list(self.sessions.items())
+        for session, entry in sessions:
+            processes = self._refresh(session)
+            if not processes:
+                continue
+            rss = 0
+            cpu = 0.0
+            for process in processes:
+                try:
+                    rss += process.memory_info().rss
+                    # Percentage since the last check, as the process objects are kept
+                    cpu += process.cpu_percent(None)
+                except psutil.Error:
+                    pass
+            with self.lock:
+                entry['rss_mb'] = rss / 1048576
+                entry['cpu_percent'] = cpu
+                if entry['over_limit'] is None:
+                    if self.max_rss_mb and entry['rss_mb'] > self.max_rss_mb:
+                        entry['over_limit'] = 'using {:.0f}MB of memory'.format(entry['rss_mb'])
+                    elif self.max_cpu_percent and cpu > self.max_cpu_percent:
+                        entry['over_limit'] = 'using {:.0f}% CPU'.format(cpu)
+                    if entry['over_limit']:
+                        self.over_limit_count += 1
+
+    def start(self):
+        """
+        Check the sessions every SUPERVISOR_INTERVAL seconds in the background
+        """
+        if self.thread is not None:
+            return
+        if psutil is None:
+            print(' * WARNING: psutil is not installed, browser memory and CPU use are not limited')
+
+        def run():
+            while True:
+                time.sleep(self.interval)
+                self.check()
+
+        self.thread = threading.Thread(target=run, name='process-supervisor', daemon=True)
+        self.thread.start()
+
+    def status(self):
+        """
+        Live process counts and memory use of the sessions, and count of processes reaped
+        """
+        with self.lock:
+            entries = list(self.sessions.values())
+            return {
+                'psutil': psutil is not None,
+                'sessions': len(entries),
+                'processes': sum(1 for entry in entries for process in entry['pids'].values()
+                                 if is_running(process)),
+                'rss_mb': round(sum(entry['rss_mb'] for entry in entries), 1),
+                'cpu_percent': round(sum(entry['cpu_percent'] for entry in entries), 1),
+                'over_limit': self.over_limit_count,
+                'reaped': self.reaped
+            }
+
+
+supervisor = ProcessSupervisor(CONFIG.MAX_SESSION_RSS_MB, CONFIG.MAX_SESSION_CPU_PERCENT, CONFIG.SUPERVISOR_INTERVAL)
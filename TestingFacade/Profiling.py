@@ -0,0 +1,111 @@
+# Copyright (C) 2021 Advanced Media Workflow Association
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import cProfile
+import json
+import os
+import re
+import time
+from contextlib import contextmanager
+from selenium.common.exceptions import WebDriverException
+import Config as CONFIG
+
+
+def should_profile(question):
+    """
+    Check whether a question is to be profiled, by PROFILE_QUESTIONS or its metadata
+    """
+    metadata = question.metadata or {}
+    if metadata.get('profile') is True:
+        return True
+    suite = type(question.test_class).__name__ if question.test_class else ''
+    return any(name in CONFIG.PROFILE_QUESTIONS
+               for name in [question.question_id, suite, suite + '.' + question.question_id])
+
+
+def profile_path(profile_dir, run, suite, question_id, extension):
+    """
+    File to write a profile of a question to, named by suite, question and time so that
+    profiles of repeated runs are kept
+    """
+    run = re.sub(r'[^A-Za-z0-9_.-]', '_', run or 'facade')
+    name = '{}.{}_{}{}'.format(suite or 'NoSuite', question_id, time.strftime('%Y%m%dT%H%M%S'), extension)
+    return os.path.join(profile_dir, run, name)
+
+
+class QuestionProfile:
+    """
+    cProfile capture of the facade answering a question, as a context manager, and a
+    Chrome performance trace of nmos-js while its test method runs
+    The .prof file can be viewed with e.g. snakeviz, and the .trace.json file in the
+    Performance panel of Chrome DevTools
+    """
+
+    def __init__(self, question, run):
+        suite = type(question.test_class).__name__ if question.test_class else ''
+        self.path = profile_path(CONFIG.PROFILE_DIR, run, suite, question.question_id, '')
+        self.profiler = None
+
+    def __enter__(self):
+        profiler = cProfile.Profile()
+        try:
+            profiler.enable()
+            self.profiler = profiler
+        except ValueError as error:
+            # Only one profiler can be active at a time from Python 3.12
+            print(' * WARNING: Could not profile {}: {}'.format(os.path.basename(self.path), error))
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        if self.profiler:
+            self.profiler.disable()
+            self._write(self.path + '.prof', self.profiler.dump_stats)
+        return False
+
+    @contextmanager
+    def browser_trace(self, backend):
+        """
+        Record a Chrome performance trace of the page for the duration of the block
+        """
+        started = False
+        try:
+            started = backend.start_trace(CONFIG.PROFILE_TRACE_CATEGORIES)
+        except WebDriverException as error:
+            print(' * WARNING: Could not start performance trace: ' + str(error))
+        if not started:
+            print(' * WARNING: No performance trace of nmos-js, which needs DRIVER_BACKEND \'cdp\'')
+        try:
+            yield
+        finally:
+            if started:
+                try:
+                    events = backend.stop_trace()
+                except WebDriverException as error:
+                    print(' * WARNING: Could not stop performance trace: ' + str(error))
+                else:
+                    self._write(self.path + '.trace.json', lambda path: self._dump_trace(path, events))
+
+    @staticmethod
+    def _dump_trace(path, events):
+        with open(path, 'w') as trace:
+            json.dump({'traceEvents': events}, trace)
+
+    @staticmethod
+    def _write(path, dump):
+        try:
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            dump(path)
+            print(' * Profile written to ' + path)
+        except OSError as error:
+            print(' * ERROR: Could not write profile {}: {}'.format(path, error))
@@ -0,0 +1,180 @@
+# Copyright (C) 2021 Advanced Media Workflow Association
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import time
+from collections import namedtuple
+
+# Entries which every question from NMOS Testing must have
+EXPECTED_ENTRIES = ['test_type', 'question_id', 'name', 'description', 'question', 'answers', 'answer_uri']
+
+QUESTION_FIELDS = ['test_type', 'question_id', 'name', 'description', 'question', 'answers',
+                   'timeout', 'answer_uri', 'metadata', 'test_class', 'answer_ids_by_label', 'answers_by_resource_id',
+                   'received']
+
+# A sender or receiver given in the metadata of a question
+Resource = namedtuple('Resource', ['id', 'label', 'description'])
+
+
+class InvalidQuestion(ValueError):
+    """
+    Question JSON which is missing entries, or has entries of the wrong type
+    """
+
+
+def _check_resource(resource, name):
+    if not isinstance(resource, dict):
+        raise InvalidQuestion('{} must be an object'.format(name))
+    if not isinstance(resource.get('label'), str):
+        raise InvalidQuestion('{} must have a string label'.format(name))
+
+
+class Question(namedtuple('Question', QUESTION_FIELDS)):
+    """
+    Immutable details of a question from the NMOS Controller test suite, captured when it
+    is received, together with the automated test class selected to answer it and indexes
+    from the labels and ids of the answers' resources to the answers, and the time.monotonic()
+    time it was received
+    """
+    __slots__ = ()
+
+    @staticmethod
+    def validate(json):
+        """
+        Check question JSON has the entries the facade relies on
+        Raises InvalidQuestion saying which entry is wrong
+        """
+        if not isinstance(json, dict):
+            raise InvalidQuestion('Question must be a JSON object')
+        missing = [entry for entry in EXPECTED_ENTRIES if entry not in json]
+        if missing:
+            raise InvalidQuestion('Question is missing ' + ', '.join(missing))
+        for entry in ['question_id', 'answer_uri']:
+            if not isinstance(json[entry], str):
+                raise InvalidQuestion('{} must be a string'.format(entry))
+        if not isinstance(json['answers'], list):
+            raise InvalidQuestion('answers must be an array')
+        for index, answer in enumerate(json['answers']):
+            if not isinstance(answer, dict) or 'answer_id' not in answer:
+                raise InvalidQuestion('answers[{}] must be an object with an answer_id'.format(index))
+            if answer.get('resource') is not None:
+                _check_resource(answer['resource'], 'answers[{}].resource'.format(index))
+        timeout = json.get('timeout')
+        if timeout is not None and (isinstance(timeout, bool) or not isinstance(timeout, (int, float))):
+            raise InvalidQuestion('timeout must be a number')
+        metadata = json.get('metadata')
+        if metadata is not None:
+            if not isinstance(metadata, dict):
+                raise InvalidQuestion('metadata must be an object')
+            for entry in ['sender', 'receiver']:
+                if metadata.get(entry) is not None:
+                    _check_resource(metadata[entry], 'metadata.' + entry)
+
+    @classmethod
+    def from_json(cls, json, test_class=None):
+        """
+        Build a question from JSON which has been validated
+        """
+        answers = tuple(json['answers'])
+        answer_ids_by_label = {}
+        answers_by_resource_id = {}
+        for answer in answers:
+            resource = answer.get('resource')
+            if resource:
+                answer_ids_by_label.setdefault(resource['label'], []).append(answer['answer_id'])
+                if resource.get('id'):
+                    answers_by_resource_id.setdefault(resource['id'], answer)
+
+        return cls(json['test_type'],
+                   json['question_id'],
+                   json['name'],
+                   json['description'],
+                   json['question'],
+                   answers,
+                   json.get('timeout'),
+                   json['answer_uri'],
+                   json.get('metadata'),
+                   test_class,
+                   answer_ids_by_label,
+                   answers_by_resource_id,
+                   time.monotonic())
+
+    def to_json(self):
+        """
+        The question as it was received
+        """
+        return {
+            'test_type': self.test_type,
+            'question_id': self.question_id,
+            'name': self.name,
+            'description': self.description,
+            'question': self.question,
+            'answers': list(self.answers),
+            'timeout': self.timeout,
+            'answer_uri': self.answer_uri,
+            'metadata': self.metadata
+        }
+
+    @property
+    def resource_answers(self):
+        """
+        Answers which are resources
+        """
+        return [answer for answer in self.answers if answer.get('resource')]
+
+    @property
+    def sender(self):
+        return self._metadata_resource('sender')
+
+    @property
+    def receiver(self):
+        return self._metadata_resource('receiver')
+
+    def _metadata_resource(self, name):
+        resource = (self.metadata or {}).get(name)
+        if not resource:
+            return None
+        return Resource(resource.get('id'), resource['label'], resource.get('description'))
+
+    def answer_id_for_label(self, label):
+        """
+        Find the answer whose resource has the given label
+        Returns answer id or None
+        """
+        answer_ids = self.answer_ids_by_label.get(label)
+        return answer_ids[0] if answer_ids else None
+
+    def answer_ids_for_labels(self, labels):
+        """
+        Answer ids of the answers whose resources have any of the given labels, in the order of the labels
+        """
+        answer_ids = []
+        seen = set()
+        for label in labels:
+            if label not in seen:
+                seen.add(label)
+                answer_ids += self.answer_ids_by_label.get(label, [])
+        return answer_ids
+
+    def answer_for_resource_id(self, resource_id):
+        """
+        Find the answer whose resource has the given id
+        Returns answer or None
+        """
+        return self.answers_by_resource_id.get(resource_id)
+
+    def answer_json(self, answer):
+        return {
+            'question_id': self.question_id,
+            'answer_response': answer
+        }
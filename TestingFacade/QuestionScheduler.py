@@ -0,0 +1,109 @@
+# Copyright (C) 2021 Advanced Media Workflow Association
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import threading
+import traceback
+
+
+class QuestionScheduler:
+    """
+    Bounded queue of questions served by a pool of worker threads
+    Questions submitted with the same ordering key run one at a time, in the order received
+    """
+
+    def __init__(self, execute, workers, max_queued):
+        self.execute = execute
+        self.workers = workers
+        self.max_queued = max_queued
+        self.condition = threading.Condition()
+        self.queued = []
+        self.running = {}
+        self.threads = []
+        self.closed = False
+
+    def start(self):
+        """
+        Start the worker threads
+        """
+        for index in range(self.workers):
+            thread = threading.Thread(target=self._work, name='question-worker-{}'.format(index), daemon=True)
+            thread.start()
+            self.threads.append(thread)
+
+    def submit(self, question, key):
+        """
+        Queue a question to run after any earlier questions with the same key
+        Returns False if the queue is full or the scheduler has been closed
+        """
+        with self.condition:
+            if self.closed or len(self.queued) >= self.max_queued:
+                return False
+            self.queued.append((key, question))
+            self.condition.notify_all()
+            return True
+
+    def _take_next(self):
+        # The first queued question whose key is free is the earliest for that key
+        for index, (key, question) in enumerate(self.queued):
+            if key not in self.running:
+                del self.queued[index]
+                self.running[key] = question
+                return key, question
+        return None
+
+    def _work(self):
+        while True:
+            with self.condition:
+                next_question = self._take_next()
+                while next_question is None:
+                    self.condition.wait()
+                    next_question = self._take_next()
+            key, question = next_question
+            try:
+                self.execute(question)
+            except Exception:
+                print(' * ERROR: Unhandled error answering ' + question.question_id)
+                traceback.print_exc()
+            finally:
+                with self.condition:
+                    del self.running[key]
+                    self.condition.notify_all()
+
+    def close(self):
+        """
+        Stop accepting questions; those already queued are still answered
+        """
+        with self.condition:
+            self.closed = True
+
+    def join(self, timeout=None):
+        """
+        Wait until every queued and running question has been answered
+        Returns False if timeout expires first
+        """
+        with self.condition:
+            return self.condition.wait_for(lambda: not self.queued and not self.running, timeout)
+
+    def status(self):
+        """
+        Queue depth and the questions currently running
+        """
+        with self.condition:
+            return {
+                'workers': self.workers,
+                'accepting': not self.closed,
+                'max_queued': self.max_queued,
+                'queued': [question.question_id for _, question in self.queued],
+                'in_flight': [question.question_id for question in self.running.values()]
+            }
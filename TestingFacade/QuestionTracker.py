@@ -0,0 +1,87 @@
+# Copyright (C) 2021 Advanced Media Workflow Association
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import threading
+import time
+from collections import OrderedDict
+from FacadeSession import run_key
+
+
+class QuestionTracker:
+    """
+    Progress of recent questions, by run and question id, which clients can wait on
+    """
+
+    def __init__(self, history=1000):
+        self.history = history
+        self.condition = threading.Condition()
+        self.questions = OrderedDict()
+        self.listeners = set()
+
+    def update(self, question, state, **details):
+        """
+        Record a question reaching a state, with details such as its answer
+        """
+        key = (run_key(question.answer_uri), question.question_id)
+        with self.condition:
+            status = self.questions.pop(key, None) or {'run': key[0], 'question_id': key[1]}
+            status.update(details, state=state, updated=time.time())
+            self.questions[key] = status
+            while len(self.questions) > self.history:
+                self.questions.popitem(last=False)
+            self.condition.notify_all()
+            listeners = list(self.listeners)
+        for listener in listeners:
+            listener()
+
+    def status(self, question_id, run=None):
+        """
+        Latest status of a question, from the given run or the most recent run to send it
+        Returns dict or None
+        """
+        with self.condition:
+            return self._status(question_id, run)
+
+    def _status(self, question_id, run):
+        if run is not None:
+            status = self.questions.get((run, question_id))
+            return dict(status) if status else None
+        for (status_run, status_question_id), status in reversed(self.questions.items()):
+            if status_question_id == question_id:
+                return dict(status)
+        return None
+
+    def wait(self, question_id, run=None, known_state=None, timeout=30):
+        """
+        Wait until a question's state differs from known_state, or timeout
+        Returns latest status, or None if the question is not known
+        """
+        def changed():
+            status = self._status(question_id, run)
+            return status is not None and status['state'] != known_state
+
+        with self.condition:
+            self.condition.wait_for(changed, timeout)
+            return self._status(question_id, run)
+
+    def subscribe(self, listener):
+        """
+        Have listener() called after every update, e.g. to wake asynchronous waiters
+        """
+        with self.condition:
+            self.listeners.add(listener)
+
+    def unsubscribe(self, listener):
+        with self.condition:
+            self.listeners.discard(listener)
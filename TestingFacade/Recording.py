@@ -0,0 +1,174 @@
+# Copyright (C) 2021 Advanced Media Workflow Association
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import functools
+import json
+import os
+import re
+import threading
+from selenium.common.exceptions import NoSuchElementException, TimeoutException, WebDriverException
+from PageSnapshot import PageChange, PageSnapshot, ResourceRow
+
+# Exceptions which a recorded call may raise, recreated when it is replayed
+EXCEPTIONS = {exception.__name__: exception
+              for exception in [NoSuchElementException, TimeoutException, WebDriverException]}
+
+
+class ReplayMismatch(Exception):
+    """
+    A test method made a different call to the one recorded
+    """
+
+
+def encode(value):
+    """
+    Convert a result or arguments of a recorded call to JSON
+    """
+    if isinstance(value, PageSnapshot):
+        return {'__snapshot__': value.to_json()}
+    if isinstance(value, PageChange):
+        return {'__change__': {'snapshot': value.snapshot.to_json(),
+                               'detected_at': value.detected_at,
+                               'changed': [row._asdict() for row in value.changed]}}
+    if isinstance(value, dict):
+        return {str(key): encode(item) for key, item in value.items()}
+    if isinstance(value, (list, tuple)):
+        return [encode(item) for item in value]
+    if value is None or isinstance(value, (bool, int, float, str)):
+        return value
+    if callable(value):
+        # Probes passed to fan_out are replayed by their recorded results
+        return '<callable>'
+    return repr(value)
+
+
+def decode(value):
+    """
+    Convert a recorded result back from JSON
+    """
+    if isinstance(value, dict):
+        if '__snapshot__' in value:
+            return PageSnapshot.from_json(value['__snapshot__'])
+        if '__change__' in value:
+            change = value['__change__']
+            return PageChange(PageSnapshot.from_json(change['snapshot']), change['detected_at'],
+                              [ResourceRow(**row) for row in change['changed']])
+        return {key: decode(item) for key, item in value.items()}
+    if isinstance(value, list):
+        return [decode(item) for item in value]
+    return value
+
+
+class Tape:
+    """
+    Calls made by a test method to the browser primitives of GenericAutoTest, with their results
+    and the responses nmos-js received meanwhile, either being recorded or being replayed
+    """
+
+    def __init__(self, calls=None):
+        self.replaying = calls is not None
+        self.calls = list(calls or [])
+        self.position = 0
+        self.lock = threading.Lock()
+
+    def record(self, name, args, result=None, error=None, responses=None):
+        call = {'method': name, 'args': encode(args)}
+        if error is not None:
+            call['error'] = {'type': type(error).__name__ if type(error).__name__ in EXCEPTIONS
+                             else WebDriverException.__name__, 'message': getattr(error, 'msg', None) or str(error)}
+        else:
+            call['result'] = encode(result)
+        if responses:
+            call['responses'] = responses
+        with self.lock:
+            self.calls.append(call)
+
+    def play(self, name, args):
+        """
+        Returns the recorded result of the next call, or raises its recorded exception
+        """
+        with self.lock:
+            if self.position >= len(self.calls):
+                raise ReplayMismatch('{} called after the end of the recording'.format(name))
+            call = self.calls[self.position]
+            if call['method'] != name or call['args'] != encode(args):
+                raise ReplayMismatch('{}{} called where {}{} was recorded'.format(
+                    name, json.dumps(encode(args)), call['method'], json.dumps(call['args'])))
+            self.position += 1
+        if 'error' in call:
+            raise EXCEPTIONS[call['error']['type']](call['error']['message'])
+        return decode(call['result'])
+
+    @property
+    def finished(self):
+        return self.position == len(self.calls)
+
+
+def recorded(method):
+    """
+    Decorator for the browser primitives used by test methods, which records each call and its
+    result on the test instance's tape, or returns the recorded result when replaying
+    Calls made within another recorded call are not recorded, as they are replayed with it
+    """
+    @functools.wraps(method)
+    def wrapper(self, *args, **kwargs):
+        tape = self.tape
+        if tape is None or self.recording_depth:
+            return method(self, *args, **kwargs)
+        if tape.replaying:
+            return tape.play(method.__name__, [args, kwargs])
+
+        self.recording_depth += 1
+        try:
+            result = method(self, *args, **kwargs)
+        except WebDriverException as error:
+            tape.record(method.__name__, [args, kwargs], error=error, responses=self.recorded_responses())
+            raise
+        finally:
+            self.recording_depth -= 1
+        tape.record(method.__name__, [args, kwargs], result, responses=self.recorded_responses())
+        return result
+    return wrapper
+
+
+def cassette_path(record_dir, run, suite, sequence, question_id):
+    """
+    File to record a question to, numbered in the order questions were answered for the suite
+    """
+    run = re.sub(r'[^A-Za-z0-9_.-]', '_', run or 'facade')
+    return os.path.join(record_dir, run, suite, '{:04d}_{}.json'.format(sequence, question_id))
+
+
+def write_cassette(path, question, test_class_name, tape, answer):
+    """
+    Record a question, the calls made to answer it and the answer
+    """
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(path, 'w') as cassette:
+        json.dump({
+            'test_class': test_class_name,
+            'question': question.to_json(),
+            'calls': tape.calls if tape else [],
+            'answer': encode(answer)
+        }, cassette, indent=1)
+
+
+def read_cassettes(run_dir):
+    """
+    Recorded questions of a run, in the order they were answered
+    """
+    for name in sorted(os.listdir(run_dir)):
+        if name.endswith('.json'):
+            with open(os.path.join(run_dir, name)) as cassette:
+                yield name, json.load(cassette)
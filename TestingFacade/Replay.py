@@ -0,0 +1,113 @@
+# Copyright (C) 2021 Advanced Media Workflow Association
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""
+Replay questions recorded by the Testing Facade with RECORD_DIR set, re-running the test
+methods against the recorded browser results without launching a browser
+
+    python3 Replay.py <RECORD_DIR>[/<run>[/<suite>]] ...
+
+Exits with an error if any question is answered differently to when it was recorded, or
+makes different browser calls
+"""
+
+import argparse
+import os
+import sys
+import time
+from selenium.common.exceptions import WebDriverException
+from Question import Question
+from Recording import ReplayMismatch, Tape, encode, read_cassettes
+from IS0404AutoTest import IS0404AutoTest
+from IS0503AutoTest import IS0503AutoTest
+from BCP0070302AutoTest import BCP0070302AutoTest
+
+TEST_CLASSES = {test_class.__name__: test_class
+                for test_class in [IS0404AutoTest, IS0503AutoTest, BCP0070302AutoTest]}
+
+
+def suite_dirs(path):
+    """
+    Directories of recorded suites at or below path
+    """
+    for directory, _, files in sorted(os.walk(path)):
+        if any(name.endswith('.json') for name in files):
+            yield directory
+
+
+def replay_question(tests, cassette):
+    """
+    Re-run the test method for a recorded question
+    Returns the answer
+    """
+    question = Question.from_json(cassette['question'], tests)
+    tests.tape = Tape(cassette['calls'])
+    try:
+        answer = getattr(tests, question.question_id)(question)
+    except WebDriverException:
+        # As when answered by the facade, a browser error gives no answer
+        answer = None
+    finally:
+        tape, tests.tape = tests.tape, None
+    if not tape.finished:
+        raise ReplayMismatch('{} of {} recorded calls were made'.format(tape.position, len(tape.calls)))
+    return answer
+
+
+def replay_suite(directory):
+    """
+    Replay the questions of a suite in order, with one test class instance as when recorded
+    Returns number of questions which did not replay as recorded
+    """
+    print(directory)
+    tests = None
+    failures = 0
+    for name, cassette in read_cassettes(directory):
+        question_id = cassette['question']['question_id']
+        if tests is None:
+            tests = TEST_CLASSES[cassette['test_class']]()
+        if not question_id.startswith('test_'):
+            continue
+
+        start = time.perf_counter()
+        try:
+            answer = replay_question(tests, cassette)
+            error = None if encode(answer) == cassette['answer'] else \
+                'answered {!r}, recorded {!r}'.format(encode(answer), cassette['answer'])
+        except ReplayMismatch as mismatch:
+            error = str(mismatch)
+        elapsed = (time.perf_counter() - start) * 1000
+
+        if error:
+            failures += 1
+            print('  FAIL {} ({:.1f} ms): {}'.format(name, elapsed, error))
+        else:
+            print('  ok   {} ({:.1f} ms)'.format(name, elapsed))
+    return failures
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Replay questions recorded by the Testing Facade')
+    parser.add_argument('paths', nargs='+', help='recording directories of runs or suites')
+    options = parser.parse_args()
+
+    failures = 0
+    for path in options.paths:
+        for directory in suite_dirs(path):
+            failures += replay_suite(directory)
+    return 1 if failures else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,119 @@
+# Copyright (C) 2021 Advanced Media Workflow Association
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import hashlib
+import threading
+from collections import OrderedDict
+import requests
+
+# IS-04 resource types whose changes can change what nmos-js shows
+RESOURCE_TYPES = ['nodes', 'devices', 'sources', 'flows', 'senders', 'receivers']
+
+
+class ScrapeCache:
+    """
+    Values scraped from nmos-js views, such as list pages and receivers' connect tabs, kept for
+    consecutive questions and discarded once the registry has changed, least recently used
+    first when full
+    Shared by a test instance and the copies it probes with, so it is thread-safe
+    """
+
+    def __init__(self, max_entries):
+        self.max_entries = max_entries
+        self.lock = threading.Lock()
+        self.entries = OrderedDict()
+        self.version = None
+        # Incremented whenever the version is forgotten, so a read begun before is not kept
+        self.generation = 0
+        self.hits = 0
+        self.misses = 0
+        self.session = requests.Session()
+
+    def get(self, key, version):
+        """
+        Returns (True, value) if the view was scraped at this registry version, otherwise (False, None)
+        """
+        with self.lock:
+            entry = self.entries.get(key)
+            if entry is None or entry[0] != version:
+                self.misses += 1
+                return False, None
+            self.entries.move_to_end(key)
+            self.hits += 1
+            return True, entry[1]
+
+    def put(self, key, version, value):
+        with self.lock:
+            self.entries[key] = (version, value)
+            self.entries.move_to_end(key)
+            while len(self.entries) > self.max_entries:
+                self.entries.popitem(last=False)
+
+    def begin_question(self):
+        """
+        Forget the registry version, so it is read again for the next question
+        """
+        with self.lock:
+            self.version = None
+            self.generation += 1
+
+    def registry_version(self, query_api, paging_limit, timeout):
+        """
+        Registry version for the current question, read from the Query API the first time
+        Returns str, or None if the Query API could not be read
+        """
+        with self.lock:
+            if self.version is not None:
+                return self.version
+            generation = self.generation
+        # Read without the lock, so that the cache, and clearing it, is not held up by the Query API
+        version = read_registry_version(self.session, query_api, paging_limit, timeout)
+        with self.lock:
+            if generation == self.generation and self.version is None:
+                self.version = version
+        return version
+
+    def clear(self):
+        with self.lock:
+            self.entries.clear()
+            self.version = None
+            self.generation += 1
+
+
+def read_registry_version(session, query_api, paging_limit, timeout):
+    """
+    Digest of one page of each resource type, as nmos-js would request it, which changes whenever
+    a resource is added, removed or updated, or the pages nmos-js shows change size
+    The Query API's X-Paging-Until header for a page without paging.until gives the time of the
+    registry's latest change, and X-Paging-Limit the page size nmos-js gets, so reading the whole
+    registry is not needed
+    Returns str, or None if the Query API could not be read or does not support paging
+    """
+    digest = hashlib.sha1()
+    try:
+        for resource_type in RESOURCE_TYPES:
+            response = session.get('{}/{}'.format(query_api.rstrip('/'), resource_type),
+                                   params={'paging.limit': paging_limit}, timeout=timeout)
+            response.raise_for_status()
+            until = response.headers.get('X-Paging-Until')
+            if until is None:
+                print(' * WARNING: Query API does not support paging, not using scrape cache')
+                return None
+            digest.update('{} {} {}\n'.format(resource_type, response.headers.get('X-Paging-Limit'), until).encode())
+            for resource in response.json():
+                digest.update('{} {}\n'.format(resource['id'], resource['version']).encode())
+    except (requests.RequestException, ValueError, KeyError, TypeError) as error:
+        print(' * WARNING: Could not read registry version, not using scrape cache: ' + str(error))
+        return None
+    return digest.hexdigest()
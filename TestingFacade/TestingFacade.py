@@ -12,54 +12,68 @@
 # See the License for the specific language governing permissions and
 # limitations under the License.
 
-import requests
+import argparse
+import atexit
+import signal
 import socket
 import sys
+import traceback
+from contextlib import nullcontext
 from threading import Thread
-from flask import Flask, jsonify, request
+import requests
+from flask import Flask, Response, jsonify, request
 from selenium.common.exceptions import NoSuchElementException, WebDriverException
-from DataStore import dataStore
-from IS0404AutoTest import IS0404tests
-from IS0503AutoTest import IS0503tests
-from BCP0070302AutoTest import BCP0070302tests
+from ActivationTracker import ActivationError
+from AnswerDelivery import AnswerDelivery
+from AsgiFacade import AsgiFacade
+from BrowserPool import browser_pool
+from Deadline import Deadline, DeadlineExceeded
+from Question import InvalidQuestion, Question
+from QuestionScheduler import QuestionScheduler
+from QuestionTracker import QuestionTracker
+from FacadeSession import FacadeSessions, run_key
+from Metrics import metrics
+from NCuTServer import NCUT_PATH, StaticBundle, create_blueprint
+from ProcessSupervisor import supervisor
+from Profiling import QuestionProfile, should_profile
+from Recording import Tape, cassette_path, write_cassette
+from IS0404AutoTest import IS0404AutoTest
+from IS0503AutoTest import IS0503AutoTest
+from BCP0070302AutoTest import BCP0070302AutoTest
 import Config as CONFIG
 
-TEST_CLASSES = {'IS0404Test': IS0404tests,
-                'IS0503Test': IS0503tests,
-                'BCP0070302Test': BCP0070302tests}
+TEST_CLASSES = {'IS0404Test': IS0404AutoTest,
+                'IS0503Test': IS0503AutoTest,
+                'BCP0070302Test': BCP0070302AutoTest}
+
+# State for each NMOS Testing run using the facade, keyed by the host of its answer_uri
+sessions = FacadeSessions()
 
-TEST_CLASS = None
+# Production build of nmos-js served by the facade, if any
+ncut_bundle = None
 
 app = Flask(__name__)
 
 
-def reset_automation_state():
+def reset_facade_after_suite(client_host, answer_uri=None):
     """
-    Clear per-suite state held by the shared automation instances
+    Reset facade state for the run whose controller test suite has finished
     """
-    for tests in TEST_CLASSES.values():
-        tests.reset_for_new_suite()
+    for session in sessions.end_sessions_for(client_host, answer_uri):
+        print(' * Cleared session for ' + session.key)
 
 
-def reset_facade_after_suite():
+def create_test_class(test_class_name, mock_registry_url=None):
     """
-    Reset facade state when a controller test suite has finished
+    A fresh instance of the automated test class for a suite, using the suite's mock registry if given
     """
-    global TEST_CLASS
-
-    dataStore.clear()
-    TEST_CLASS = None
-    reset_automation_state()
-
-
-def select_test_class(test_class_name):
-    global TEST_CLASS
-
     if test_class_name not in TEST_CLASSES:
         raise ValueError('Unknown test class: ' + test_class_name)
 
-    TEST_CLASS = TEST_CLASSES[test_class_name]
-    print(' * Selected test class ' + test_class_name)
+    tests = TEST_CLASSES[test_class_name]()
+    if mock_registry_url:
+        tests.mock_registry_url = mock_registry_url
+    return tests
 
 
 @app.route('/x-nmos/testquestion/<version>', methods=['GET'], strict_slashes=False)
@@ -73,94 +87,288 @@ def controller_tests_get(version):
         'question_api_version': version,
         'port': CONFIG.TESTING_FACADE_PORT,
         'supported_test_classes': list(TEST_CLASSES.keys()),
-        'selected_test_class': TEST_CLASS,
+        'sessions': sessions.status(),
+        'questions': scheduler.status(),
+        'answers': answer_delivery.status(),
+        'browsers': browser_pool.status(),
     }), 200
 
 
+def ncut_reachable():
+    """
+    Check nmos-js can be loaded, from the served build or from NCUT_URL
+    """
+    if ncut_bundle is not None:
+        return ncut_bundle.is_built()
+    try:
+        return requests.get(CONFIG.NCUT_URL.split('#')[0], timeout=2).ok
+    except requests.RequestException:
+        return False
+
+
+@app.route('/ready', methods=['GET'])
+def ready_get():
+    """
+    Readiness probe: 200 once nmos-js can be loaded, the browser pool has been warmed with at
+    least one browser session and questions can be answered, otherwise 503
+    """
+    checks = {
+        'ncut': ncut_reachable(),
+        # Warming finishes even if no browser could be started, e.g. without a WebDriver installed
+        'browsers': browser_pool.warmed.is_set() and browser_pool.status()['sessions'] > 0,
+        'questions': bool(scheduler.threads),
+        'answers': bool(answer_delivery.threads)
+    }
+    ready = all(checks.values())
+    return jsonify({'ready': ready, 'checks': checks}), 200 if ready else 503
+
+
+@app.route('/metrics', methods=['GET'])
+def metrics_get():
+    """
+    Timing of the steps taken to answer questions, for Prometheus
+    """
+    return Response(metrics.prometheus(), mimetype='text/plain; version=0.0.4')
+
+
+def submit_question(question_json, client_host):
+    """
+    Accept a question, or clear request, from NMOS Testing and queue it to be answered
+    Returns response body and status code
+    """
+    if isinstance(question_json, dict) and question_json.get('clear'):
+        # End of current tests, reset the facade session for this run
+        reset_facade_after_suite(client_host, question_json.get('answer_uri'))
+        return '', 202
+
+    # Should be a new question
+    try:
+        Question.validate(question_json)
+    except InvalidQuestion as error:
+        return 'Invalid JSON received: {}'.format(error), 400
+    if scheduler.closed:
+        return 'Testing Facade is shutting down', 503
+    session = sessions.session_for(question_json['answer_uri'])
+    tests = session.tests
+    selected = None
+    if question_json['question_id'] == 'pre_tests_message':
+        # Beginning of test set; select automated test class from metadata so that
+        # the questions which follow are captured with it
+        metadata = question_json.get('metadata')
+        if metadata and metadata.get('test_class'):
+            try:
+                tests = create_test_class(metadata['test_class'], metadata.get('mock_registry_url'))
+                selected = metadata['test_class']
+            except ValueError as error:
+                print(' * ERROR: ' + str(error))
+    question = Question.from_json(question_json, tests)
+    tracker.update(question, 'queued')
+    # Questions for the same run share its test class instance, so run them in order
+    if not scheduler.submit(question, session.key):
+        tracker.update(question, 'refused')
+        return 'Question queue is full', 503
+    # Only a question which has been accepted changes the run's suite
+    if selected:
+        session.select_test_class(selected, tests)
+        print(' * Selected test class {} for {}'.format(selected, session.key))
+    elif question_json['question_id'] == 'post_tests_message':
+        session.finish()
+    return '', 202
+
+
 @app.route('/x-nmos/testquestion/<version>', methods=['POST'], strict_slashes=False)
 def controller_tests_post(version):
     # Should be json from Test Suite with questions
-    expected_entries = ['test_type', 'name', 'description', 'question', 'answers', 'answer_uri']
+    return submit_question(request.get_json(silent=True), request.remote_addr)
 
-    if request.json.get('clear'):
-        # End of current tests, clear data store
-        reset_facade_after_suite()
-    else:
-        # Should be a new question
-        for entry in expected_entries:
-            if entry not in request.json:
-                return 'Invalid JSON received', 400
-        # All required entries are present so update data
-        dataStore.setJson(request.json)
-        # Run test in new thread
-        executionThread = Thread(target=execute_test)
-        executionThread.start()
-    return '', 202
 
+def question_wait_arguments(args):
+    """
+    Run, known state and timeout of a question status request, from its query parameters
+    """
+    try:
+        timeout = min(float(args.get('timeout', 0)), CONFIG.LONG_POLL_TIMEOUT)
+    except ValueError:
+        timeout = 0
+    return args.get('run'), args.get('state'), max(timeout, 0)
 
-def execute_test():
+
+@app.route('/x-nmos/testquestion/<version>/questions/<question_id>', methods=['GET'])
+def question_status_get(version, question_id):
+    """
+    Progress of a question: queued, refused, running, answered, failed, delivered or delivery_failed
+    With timeout, waits up to that many seconds for the state to differ from the given state
+    Query parameters run (host and port of the answer_uri), state and timeout are optional
+    """
+    run, known_state, timeout = question_wait_arguments(request.args)
+    status = tracker.wait(question_id, run, known_state, timeout)
+    if status is None:
+        return jsonify({'error': 'Unknown question'}), 404
+    return jsonify(status), 200
+
+
+def execute_test(question):
     """
     After test data has been sent to x-nmos/testing-facade figure out which
     test was sent. Call relevant test method and retrieve answers.
-    Update json and send back to test suite
+    Send answer back to test suite
     """
-    # Get question details from data store
-    question_id = dataStore.getQuestionID()
-    answers = dataStore.getAnswers()
-    metadata = dataStore.getMetadata()
+    tests = question.test_class
+    run = run_key(question.answer_uri)
+    profile = QuestionProfile(question, run) if should_profile(question) else None
+    # The question's timeout runs from when it was received, including time spent queued
+    deadline = Deadline(question.timeout, question.received, CONFIG.DEADLINE_MARGIN)
+    try:
+        with metrics.tagged(run=run, question=question.question_id, suite=type(tests).__name__ if tests else ''):
+            with metrics.span('question'), profile or nullcontext():
+                tracker.update(question, 'running')
+                answer = answer_question(question, profile, deadline)
+    except (ActivationError, DeadlineExceeded) as error:
+        # Answering would tell NMOS Testing the connection was made, or that the test had been tried,
+        # so leave the question unanswered
+        print(' * ERROR: {} not answered: {}'.format(question.question_id, error))
+        tracker.update(question, 'failed', error=str(error))
+        return
+    except Exception as error:
+        # Any other error is a fault of the facade, e.g. an unknown question or missing metadata,
+        # so answer None for NMOS Testing to report rather than leaving it waiting for the timeout
+        traceback.print_exc()
+        print(' * ERROR: {} failed: {}'.format(question.question_id, error))
+        tracker.update(question, 'failed', error='{}: {}'.format(type(error).__name__, error))
+        answer_delivery.deliver(question, None)
+        return
+    overrun = deadline.overrun()
+    if overrun:
+        # NMOS Testing has stopped waiting, but the answer is still sent and shows in the question's status
+        print(' * WARNING: {} answered {:.1f}s after its timeout of {}s'.format(
+            question.question_id, overrun, question.timeout))
+        metrics.record('question_overrun', overrun, 'error', run=run, question=question.question_id,
+                       suite=type(tests).__name__ if tests else '')
+        tracker.update(question, 'answered', answer=answer, overrun=round(overrun, 3))
+    else:
+        tracker.update(question, 'answered', answer=answer)
+
+    # POST answer json back to test suite
+    answer_delivery.deliver(question, answer)
 
-    tests = TEST_CLASS
+
+def answer_question(question, profile=None, deadline=None):
+    """
+    Run the test method for a question, tracing the browser meanwhile if it is being profiled,
+    with its waits shortened to fit the deadline if given
+    Returns the answer
+    """
+    question_id = question.question_id
+    tests = question.test_class
+    answer = None
 
     if question_id.startswith("test_"):
         if tests is None:
             print(' * ERROR: No test class selected before ' + question_id)
-            dataStore.setAnswer(None)
         else:
             # Get method associated with question id, set up test browser,
-            # run method then tear down and save any answers returned to data store
+            # run method then tear down and keep any answer returned
             method = getattr(tests, question_id)
             if callable(method):
                 print(" * Running " + question_id)
-                test_result = None
+                browser_error = False
+                if CONFIG.RECORD_DIR:
+                    tests.tape = Tape()
+                tests.deadline = deadline or Deadline()
                 try:
                     tests.set_up_test()
-                    test_result = method(answers, metadata)
+                    with metrics.span('test_method'), \
+                            profile.browser_trace(tests.backend) if profile else nullcontext():
+                        answer = method(question)
                 except NoSuchElementException:
-                    test_result = None
+                    answer = None
                 except WebDriverException as error:
+                    # The browser may have crashed, so have the pool check it
+                    browser_error = True
                     if 'ERR_CONNECTION_REFUSED' in str(error):
                         print(' * ERROR: Cannot reach nmos-js at {}. '
                               'Start it with "yarn start" in the Development directory.'
                               .format(CONFIG.NCUT_URL))
                     else:
                         print(' * ERROR: ' + str(error))
-                    test_result = None
+                    answer = None
                 finally:
                     if getattr(tests, 'driver', None):
-                        tests.tear_down_test()
-                dataStore.setAnswer(test_result)
+                        tests.tear_down_test(browser_error)
+                    tape, tests.tape = tests.tape, None
+                if CONFIG.RECORD_DIR:
+                    record_question(question, tape, answer)
 
     elif question_id == 'pre_tests_message':
-        # Beginning of test set; reset and select automated test class from metadata
-        reset_automation_state()
-        if metadata and metadata.get('test_class'):
-            try:
-                select_test_class(metadata['test_class'])
-            except ValueError as error:
-                print(' * ERROR: ' + str(error))
-        dataStore.setAnswer(None)
+        # Beginning of test set; the test class was selected when the question was received
+        if tests is not None:
+            tests.reset_for_new_suite()
+            if CONFIG.RECORD_DIR:
+                record_question(question, None, answer)
 
-    elif question_id == 'post_tests_message':
-        # End of test set, return to confirm end
-        dataStore.setAnswer(None)
+    # post_tests_message ends the test set and other questions are not recognised
+    # parts of the test suite, so return an empty answer
+    return answer
 
-    else:
-        # Not a recognised part of test suite
-        dataStore.setAnswer(None)
 
-    # POST answer json back to test suite
-    requests.post(dataStore.getUrl(), json=dataStore.getAnswerJson())
-    return
+def record_question(question, tape, answer):
+    """
+    Record a question, the browser calls made to answer it and the answer, for replaying
+    """
+    tests = question.test_class
+    tests.recorded_questions += 1
+    path = cassette_path(CONFIG.RECORD_DIR, run_key(question.answer_uri), tests.recording_name,
+                         tests.recorded_questions, question.question_id)
+    try:
+        write_cassette(path, question, type(tests).__name__, tape, answer)
+    except OSError as error:
+        print(' * ERROR: Could not record {}: {}'.format(question.question_id, error))
+
+
+def answer_delivered(question, succeeded):
+    tracker.update(question, 'delivered' if succeeded else 'delivery_failed')
+
+
+tracker = QuestionTracker()
+
+scheduler = QuestionScheduler(execute_test, CONFIG.QUESTION_WORKERS, CONFIG.QUESTION_QUEUE_SIZE)
+
+answer_delivery = AnswerDelivery(CONFIG.ANSWER_POOL_SIZE, CONFIG.ANSWER_CONNECT_TIMEOUT, CONFIG.ANSWER_READ_TIMEOUT,
+                                 CONFIG.ANSWER_RETRIES, CONFIG.ANSWER_RETRY_DELAY, on_delivered=answer_delivered)
+
+
+def start_services():
+    """
+    Start the browser pool, in the background so the first question does not wait for it,
+    after killing any browsers left by an earlier facade, and the threads answering questions,
+    delivering answers and supervising browser processes
+    """
+    def start_browsers():
+        browser_pool.reap_orphans()
+        browser_pool.warm()
+
+    Thread(target=start_browsers, daemon=True).start()
+    supervisor.start()
+    answer_delivery.start()
+    scheduler.start()
+
+
+def drain(timeout=None):
+    """
+    Stop accepting questions, finish those queued and in flight, deliver their answers and
+    close the browsers
+    """
+    timeout = CONFIG.DRAIN_TIMEOUT if timeout is None else timeout
+    print(' * Draining: answering questions already received')
+    scheduler.close()
+    if not scheduler.join(timeout):
+        print(' * WARNING: Questions still running after {}s'.format(timeout))
+    answer_delivery.join()
+    browser_pool.shutdown()
+    print(' * Drained')
+
+
+asgi_app = AsgiFacade(app, submit_question, tracker, question_wait_arguments, start_services, drain)
 
 
 def ensure_port_available(port):
@@ -185,8 +393,61 @@ def ensure_port_available(port):
                 .format(port, error))
 
 
+def serve_ncut_build(build_dir):
+    """
+    Serve a production build of nmos-js from the facade, and test it rather than NCUT_URL
+    """
+    global ncut_bundle
+    ncut_bundle = StaticBundle(build_dir)
+    if not ncut_bundle.is_built():
+        sys.exit('No nmos-js build in {}. Run "yarn build" in the Development directory.'.format(build_dir))
+    app.register_blueprint(create_blueprint(ncut_bundle))
+    CONFIG.NCUT_URL = 'http://localhost:{}{}#/'.format(CONFIG.TESTING_FACADE_PORT, NCUT_PATH)
+    print(' * Serving nmos-js from {} at {}'.format(ncut_bundle.build_dir, CONFIG.NCUT_URL))
+
+
+def serve_wsgi():
+    """
+    Serve with the Flask server, draining on SIGTERM
+    """
+    def terminate(signum, frame):
+        drain()
+        sys.exit(0)
+
+    signal.signal(signal.SIGTERM, terminate)
+    atexit.register(browser_pool.shutdown)
+    start_services()
+    app.run(host='0.0.0.0', port=CONFIG.TESTING_FACADE_PORT)
+
+
+def serve_asgi():
+    """
+    Serve with uvicorn, which drains through the ASGI lifespan shutdown on SIGTERM
+    """
+    try:
+        import uvicorn
+    except ImportError:
+        uvicorn = None
+    if uvicorn is None or asgi_app.wsgi_app is None:
+        sys.exit('The ASGI server needs uvicorn and asgiref: pip install uvicorn asgiref')
+    uvicorn.run(asgi_app, host='0.0.0.0', port=CONFIG.TESTING_FACADE_PORT, lifespan='on',
+                timeout_graceful_shutdown=CONFIG.DRAIN_TIMEOUT)
+
+
 if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description='nmos-js Testing Facade')
+    parser.add_argument('--ncut-build', default=CONFIG.NCUT_BUILD_DIR,
+                        help='directory of a production build of nmos-js to serve and test')
+    parser.add_argument('--asgi', action='store_true', default=CONFIG.ASGI,
+                        help='serve with uvicorn rather than the Flask server')
+    arguments = parser.parse_args()
+
     ensure_port_available(CONFIG.TESTING_FACADE_PORT)
+    if arguments.ncut_build:
+        serve_ncut_build(arguments.ncut_build)
     print(' * Sanity check: GET http://127.0.0.1:{}/x-nmos/testquestion/v1.0'.format(
         CONFIG.TESTING_FACADE_PORT))
-    app.run(host='0.0.0.0', port=CONFIG.TESTING_FACADE_PORT)
+    if arguments.asgi:
+        serve_asgi()
+    else:
+        serve_wsgi()
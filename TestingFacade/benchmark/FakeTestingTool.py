@@ -0,0 +1,103 @@
+# Copyright (C) 2021 Advanced Media Workflow Association
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import threading
+import time
+import requests
+from flask import Flask, request
+from werkzeug.serving import make_server
+
+
+class FakeTestingTool:
+    """
+    Stand-in for NMOS Testing which posts questions to the Testing Facade and
+    receives the answers on its own answer_uri
+    """
+
+    def __init__(self, facade_url, host='127.0.0.1', port=5103):
+        self.facade_url = facade_url.rstrip('/') + '/x-nmos/testquestion/v1.0'
+        self.condition = threading.Condition()
+        self.answers = {}
+        self.app = Flask(__name__)
+        self.app.add_url_rule('/x-nmos/testingfacade/v1.0/answer', 'answer', self.answer_post, methods=['POST'])
+        self.server = make_server(host, port, self.app, threaded=True)
+        self.answer_uri = 'http://{}:{}/x-nmos/testingfacade/v1.0/answer'.format(host, self.server.server_port)
+        self.thread = threading.Thread(target=self.server.serve_forever, daemon=True)
+
+    def start(self):
+        self.thread.start()
+        return self
+
+    def stop(self):
+        self.server.shutdown()
+
+    def answer_post(self):
+        with self.condition:
+            self.answers[request.json['question_id']] = (request.json['answer_response'], time.monotonic())
+            self.condition.notify_all()
+        return '', 202
+
+    def question_json(self, question_id, test_class, answers=None, metadata=None, timeout=30,
+                      mock_registry_url=None):
+        """
+        Question in the form NMOS Testing sends, with answers given as resources
+        e.g. [{'id': ..., 'label': ..., 'description': ...}]
+        """
+        metadata = dict(metadata or {}, test_class=test_class)
+        if mock_registry_url:
+            metadata['mock_registry_url'] = mock_registry_url
+        return {
+            'test_type': 'multi_choice',
+            'question_id': question_id,
+            'name': question_id,
+            'description': 'Benchmark question ' + question_id,
+            'question': 'Benchmark question ' + question_id,
+            'answers': [{'answer_id': 'answer_{}'.format(index),
+                         'display_answer': resource['label'],
+                         'resource': resource} for index, resource in enumerate(answers or [])],
+            'timeout': timeout,
+            'answer_uri': self.answer_uri,
+            'metadata': metadata
+        }
+
+    def ask(self, question, wait=True):
+        """
+        Post a question to the Testing Facade and wait up to its timeout for the answer
+        Returns the answer and the time in seconds from posting to receiving it,
+        or None and None if no answer arrived
+        """
+        question_id = question['question_id']
+        with self.condition:
+            self.answers.pop(question_id, None)
+        start = time.monotonic()
+        response = requests.post(self.facade_url, json=question, timeout=10)
+        response.raise_for_status()
+        if not wait:
+            return None, None
+        deadline = start + question['timeout']
+        with self.condition:
+            while question_id not in self.answers:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    return None, None
+                self.condition.wait(remaining)
+            answer, received = self.answers[question_id]
+        return answer, received - start
+
+    def clear(self):
+        """
+        Tell the Testing Facade the suite has finished
+        """
+        requests.post(self.facade_url, json={'clear': 'True', 'answer_uri': self.answer_uri},
+                      timeout=10).raise_for_status()
@@ -0,0 +1,594 @@
+# Copyright (C) 2021 Advanced Media Workflow Association
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import copy
+import threading
+import time
+import uuid
+from urllib.parse import urlencode
+from flask import Flask, Response, jsonify, request
+from werkzeug.exceptions import NotFound
+from werkzeug.serving import make_server
+from benchmark.RQL import UnsupportedQuery, evaluate, lookup, parse, raw_query_parameter
+
+RESOURCE_TYPES = ['nodes', 'devices', 'sources', 'flows', 'senders', 'receivers']
+
+QUERY_API_VERSION = 'v1.3'
+
+CONNECTION_API_VERSION = 'v1.1'
+
+# Resource types referenced by the properties which RQL 'rel' follows
+REFERENCES = {'node_id': 'nodes', 'device_id': 'devices', 'source_id': 'sources', 'flow_id': 'flows',
+              'sender_id': 'senders', 'receiver_id': 'receivers'}
+
+
+def parse_version(version):
+    """
+    Convert an IS-04 '<seconds>:<nanoseconds>' version to a sortable tuple
+    """
+    seconds, nanoseconds = version.split(':')
+    return int(seconds), int(nanoseconds)
+
+
+class MockRegistry:
+    """
+    In-memory IS-04 registry, standing in for the NMOS Testing mock registry in benchmarks
+    """
+
+    def __init__(self, paging_limit=10, max_paging_limit=1000):
+        self.paging_limit = paging_limit
+        self.max_paging_limit = max_paging_limit
+        self.lock = threading.Lock()
+        self.resources = {resource_type: {} for resource_type in RESOURCE_TYPES}
+        self.connections = {}
+        self.last_version = (0, 0)
+        # Set by MockQueryAPI to its Connection API
+        self.connection_href = 'http://127.0.0.1/x-nmos/connection/{}/'.format(CONNECTION_API_VERSION)
+
+    def clear(self):
+        """
+        Remove all resources, e.g. between benchmark suites
+        """
+        with self.lock:
+            for resources in self.resources.values():
+                resources.clear()
+            self.connections.clear()
+            self.next_version()
+
+    def next_version(self):
+        """
+        Return a version timestamp later than any used so far
+        """
+        now = time.time_ns()
+        version = divmod(now, 1000000000)
+        if version <= self.last_version:
+            version = (self.last_version[0], self.last_version[1] + 1)
+        self.last_version = version
+        return '{}:{}'.format(*version)
+
+    def put(self, resource_type, resource):
+        """
+        Add or update a resource, giving it a new version
+        """
+        with self.lock:
+            resource = dict(resource, version=self.next_version())
+            self.resources[resource_type][resource['id']] = resource
+            return resource
+
+    def update(self, resource_type, resource_id, **changes):
+        """
+        Change some properties of a resource, giving it a new version
+        """
+        with self.lock:
+            resource = dict(self.resources[resource_type][resource_id], **changes)
+            resource['version'] = self.next_version()
+            self.resources[resource_type][resource_id] = resource
+            return resource
+
+    def delete(self, resource_type, resource_id):
+        """
+        Remove a resource, returning it so it can be put back later
+        """
+        with self.lock:
+            # Removing a resource is a change to the registry, shown in X-Paging-Until
+            self.next_version()
+            return self.resources[resource_type].pop(resource_id)
+
+    def get(self, resource_type, resource_id):
+        with self.lock:
+            resource = self.resources[resource_type].get(resource_id)
+            return copy.deepcopy(resource) if resource else None
+
+    def list(self, resource_type):
+        """
+        All resources of a type, oldest version first
+        """
+        with self.lock:
+            resources = list(self.resources[resource_type].values())
+        return sorted(resources, key=lambda resource: parse_version(resource['version']))
+
+    def set_receiver_subscription(self, receiver_id, sender_id):
+        """
+        Record a receiver as connected to a sender, or as inactive if sender_id is None
+        """
+        return self.update('receivers', receiver_id,
+                           subscription={'sender_id': sender_id, 'active': sender_id is not None})
+
+    def add_node(self, label):
+        node = {
+            'id': str(uuid.uuid4()), 'label': label, 'description': '', 'tags': {},
+            'href': 'http://127.0.0.1/', 'hostname': 'benchmark', 'api': {'versions': ['v1.3'], 'endpoints': []},
+            'caps': {}, 'services': [], 'clocks': [], 'interfaces': []
+        }
+        return self.put('nodes', node)
+
+    def add_device(self, node_id, label, connection_api=True):
+        """
+        Register a device, with an IS-05 Connection API served by the mock unless connection_api is False
+        """
+        return self.put('devices', {
+            'id': str(uuid.uuid4()), 'label': label, 'description': '', 'tags': {},
+            'type': 'urn:x-nmos:device:generic', 'node_id': node_id, 'senders': [], 'receivers': [],
+            'controls': [{'type': 'urn:x-nmos:control:sr-ctrl/v1.1',
+                          'href': self.connection_href}] if connection_api else []
+        })
+
+    def add_sender(self, device, label, transport, **flow_properties):
+        """
+        Register a video sender with its source and flow
+        flow_properties override those of a 1080p50 raw video flow, e.g. frame_width
+        """
+        source_id = str(uuid.uuid4())
+        flow_id = str(uuid.uuid4())
+        self.put('sources', {
+            'id': source_id, 'label': label + ' Source', 'description': '', 'tags': {},
+            'device_id': device['id'], 'parents': [], 'clock_name': None, 'caps': {},
+            'grain_rate': {'numerator': 50, 'denominator': 1}, 'format': 'urn:x-nmos:format:video'
+        })
+        self.put('flows', {
+            'id': flow_id, 'label': label + ' Flow', 'description': '', 'tags': {},
+            'source_id': source_id, 'device_id': device['id'], 'parents': [],
+            'format': 'urn:x-nmos:format:video', 'media_type': 'video/raw',
+            'grain_rate': {'numerator': 50, 'denominator': 1}, 'frame_width': 1920, 'frame_height': 1080,
+            'interlace_mode': 'progressive', 'colorspace': 'BT709', 'components': [],
+            **flow_properties
+        })
+        sender = self.put('senders', {
+            'id': str(uuid.uuid4()), 'label': label, 'description': '', 'tags': {}, 'flow_id': flow_id,
+            'transport': transport, 'device_id': device['id'], 'manifest_href': None,
+            'interface_bindings': [], 'subscription': {'receiver_id': None, 'active': False}
+        })
+        if device['controls']:
+            self.add_connection('senders', sender)
+        return sender
+
+    def add_receiver(self, device, label, transport, constraint_sets=None):
+        """
+        Register a video receiver, with BCP-004-01 constraint_sets in its caps if given
+        """
+        caps = {'media_types': ['video/raw']}
+        if constraint_sets is not None:
+            caps['constraint_sets'] = constraint_sets
+        receiver = self.put('receivers', {
+            'id': str(uuid.uuid4()), 'label': label, 'description': '', 'tags': {},
+            'device_id': device['id'], 'transport': transport, 'interface_bindings': [],
+            'format': 'urn:x-nmos:format:video', 'caps': caps,
+            'subscription': {'sender_id': None, 'active': False}
+        })
+        if device['controls']:
+            self.add_connection('receivers', receiver)
+        return receiver
+
+    def populate(self, senders=4, receivers=4, transport='urn:x-nmos:transport:rtp.mcast',
+                 label_prefix='Benchmark', connection_api=True):
+        """
+        Register a node and device with the given numbers of video senders and receivers
+        If connection_api is False the device has no IS-05 control, so its receivers cannot be connected
+        Returns the registered senders and receivers
+        """
+        node = self.add_node(label_prefix + ' Node')
+        device = self.add_device(node['id'], label_prefix + ' Device', connection_api)
+        registered_senders = [self.add_sender(device, '{} Sender {}'.format(label_prefix, index), transport)
+                              for index in range(senders)]
+        registered_receivers = [self.add_receiver(device, '{} Receiver {}'.format(label_prefix, index), transport)
+                                for index in range(receivers)]
+        return registered_senders, registered_receivers
+
+    def populate_scale(self, senders, receivers, per_device=16, devices_per_node=4, mxl_fraction=0.1,
+                       label_prefix='Scale'):
+        """
+        Register a production-sized population: nodes holding several devices, each with up to
+        per_device senders and receivers; mxl_fraction of the devices use MXL, the others RTP
+        Returns the registered senders and receivers
+        """
+        registered_senders = []
+        registered_receivers = []
+        devices = -(-max(senders, receivers) // per_device)
+        mxl_every = round(1 / mxl_fraction) if mxl_fraction else 0
+        node = None
+        for index in range(devices):
+            if index % devices_per_node == 0:
+                node = self.add_node('{} Node {}'.format(label_prefix, index // devices_per_node))
+            device = self.add_device(node['id'], '{} Device {}'.format(label_prefix, index))
+            mxl = mxl_every and index % mxl_every == mxl_every - 1
+            transport = 'urn:x-nmos:transport:mxl' if mxl else 'urn:x-nmos:transport:rtp.mcast'
+            kind = 'MXL' if mxl else 'RTP'
+            for _ in range(min(per_device, senders - len(registered_senders))):
+                registered_senders.append(self.add_sender(
+                    device, '{} {} Sender {}'.format(label_prefix, kind, len(registered_senders)), transport))
+            # MXL receivers state the flows they accept, which nmos-js turns into RQL on their connect tabs
+            constraint_sets = [video_constraint_set(1920, 1080, 50)] if mxl else None
+            for _ in range(min(per_device, receivers - len(registered_receivers))):
+                registered_receivers.append(self.add_receiver(
+                    device, '{} {} Receiver {}'.format(label_prefix, kind, len(registered_receivers)), transport,
+                    constraint_sets))
+        return registered_senders, registered_receivers
+
+    def add_connection(self, resource_type, resource):
+        """
+        Create the IS-05 staged and active parameters of a sender or receiver
+        """
+        transport_params = initial_transport_params(resource_type, resource)
+        if resource_type == 'senders':
+            params = {'receiver_id': None, 'master_enable': True}
+        else:
+            params = {'sender_id': None, 'master_enable': False,
+                      'transport_file': {'data': None, 'type': None}}
+        params['activation'] = {'mode': None, 'requested_time': None, 'activation_time': None}
+        params['transport_params'] = transport_params
+        with self.lock:
+            self.connections[(resource_type, resource['id'])] = {
+                'transport': resource['transport'],
+                'staged': copy.deepcopy(params),
+                'active': params
+            }
+
+    def connection(self, resource_type, resource_id):
+        """
+        IS-05 transport, staged and active parameters of a sender or receiver, or None
+        """
+        with self.lock:
+            return copy.deepcopy(self.connections.get((resource_type, resource_id)))
+
+    def connection_ids(self, resource_type):
+        with self.lock:
+            return [resource_id for connection_type, resource_id in self.connections
+                    if connection_type == resource_type]
+
+    def patch_staged(self, resource_type, resource_id, patch):
+        """
+        Apply a PATCH to the staged parameters; an immediate activation makes them active and
+        updates the IS-04 subscription, as a node re-registering would
+        Returns the staged parameters
+        """
+        with self.lock:
+            connection = self.connections[(resource_type, resource_id)]
+            staged = connection['staged']
+            for key, value in patch.items():
+                if key == 'transport_params':
+                    for leg, leg_patch in zip(staged['transport_params'], value):
+                        leg.update(leg_patch)
+                elif key == 'activation':
+                    continue
+                elif isinstance(value, dict) and isinstance(staged.get(key), dict):
+                    staged[key].update(value)
+                else:
+                    staged[key] = value
+            activation = patch.get('activation') or {}
+            activated = activation.get('mode') == 'activate_immediate'
+            if activated:
+                staged['activation'] = {'mode': 'activate_immediate', 'requested_time': None,
+                                        'activation_time': self.next_version()}
+                connection['active'] = copy.deepcopy(staged)
+            elif 'mode' in activation:
+                staged['activation'] = dict(activation, activation_time=None)
+            response = copy.deepcopy(staged)
+            if activated:
+                staged['activation'] = {'mode': None, 'requested_time': None, 'activation_time': None}
+
+        if activated:
+            active = response['master_enable']
+            if resource_type == 'receivers':
+                self.set_receiver_subscription(resource_id, response['sender_id'] if active else None)
+            else:
+                self.update('senders', resource_id, subscription={'receiver_id': response['receiver_id'],
+                                                                  'active': active})
+        return response
+
+
+def video_constraint_set(frame_width, frame_height, grain_rate):
+    """
+    BCP-004-01 constraint set of a receiver which accepts progressive raw video of one frame size and rate
+    """
+    return {
+        'urn:x-nmos:cap:format:media_type': {'enum': ['video/raw']},
+        'urn:x-nmos:cap:format:frame_width': {'enum': [frame_width]},
+        'urn:x-nmos:cap:format:frame_height': {'enum': [frame_height]},
+        'urn:x-nmos:cap:format:grain_rate': {'enum': [{'numerator': grain_rate, 'denominator': 1}]},
+        'urn:x-nmos:cap:format:interlace_mode': {'enum': ['progressive']}
+    }
+
+
+def initial_transport_params(resource_type, resource):
+    """
+    One leg of IS-05 transport parameters for a sender or receiver's transport
+    """
+    if resource['transport'].startswith('urn:x-nmos:transport:mxl'):
+        if resource_type == 'senders':
+            return [{'mxl_domain_id': 'benchmark', 'mxl_flow_id': resource['flow_id']}]
+        return [{'mxl_domain_id': 'auto', 'mxl_flow_id': None}]
+    if resource_type == 'senders':
+        # Destination addresses from the 233.252.0.0/24 range reserved for documentation
+        return [{'source_ip': '192.0.2.1', 'destination_ip': '233.252.0.{}'.format(int(resource['id'][:2], 16)),
+                 'source_port': 5004, 'destination_port': 5004, 'rtp_enabled': True}]
+    return [{'source_ip': None, 'multicast_ip': None, 'interface_ip': 'auto', 'destination_port': 5004,
+             'rtp_enabled': True}]
+
+
+def connection_transport_type(transport):
+    """
+    IS-05 transport type of an IS-04 transport, without any subclassification such as '.mcast'
+    """
+    return 'urn:x-nmos:transport:rtp' if transport.startswith('urn:x-nmos:transport:rtp') else transport
+
+
+def matches_basic_query(resource, params):
+    """
+    Check a resource against IS-04 basic query parameters
+    """
+    for key, value in params.items():
+        if key.startswith('paging.') or key.startswith('query.'):
+            continue
+        actual = lookup(resource, key)
+        if isinstance(actual, bool):
+            actual = 'true' if actual else 'false'
+        if actual is None or str(actual) != value:
+            return False
+    return True
+
+
+def filter_resources(resources, params, query=None, resolve=None):
+    """
+    Apply the basic query parameters of a list request, and the parsed RQL query if any
+    """
+    return [resource for resource in resources if matches_basic_query(resource, params)
+            and (query is None or evaluate(query, resource, resolve))]
+
+
+def page_resources(resources, since, until, limit, now):
+    """
+    Select a page of resources, which must be sorted oldest first
+    A page after 'since' holds the oldest matches, otherwise the newest up to 'until', which is
+    'now' if neither is given, as IS-04 specifies; following 'prev' from there visits every resource,
+    and a resource which is re-registered moves to the newest page
+    Returns the page, oldest first, and the since and until versions bounding it
+    """
+    if since is None and until is None:
+        until = now
+    in_range = [resource for resource in resources
+                if (since is None or parse_version(resource['version']) > since)
+                and (until is None or parse_version(resource['version']) <= until)]
+    if since is not None:
+        page = in_range[:limit]
+        page_since = since
+        if len(page) == limit:
+            page_until = parse_version(page[-1]['version'])
+        else:
+            page_until = until
+    else:
+        page = in_range[-limit:] if limit else []
+        before = [resource for resource in resources
+                  if parse_version(resource['version']) < parse_version(page[0]['version'])] if page else []
+        page_since = parse_version(before[-1]['version']) if before and len(page) == limit else (0, 0)
+        page_until = until
+    return page, page_since, page_until
+
+
+def format_version(version):
+    return '{}:{}'.format(*version)
+
+
+def create_app(registry):
+    """
+    Flask app serving the registry's resources through an IS-04 Query API, with the subset of RQL
+    which nmos-js uses, and their connections through an IS-05 Connection API
+    """
+    app = Flask(__name__)
+
+    @app.after_request
+    def allow_cross_origin(response):
+        # nmos-js is served from a different origin and reads the paging headers
+        response.headers['Access-Control-Allow-Origin'] = '*'
+        response.headers['Access-Control-Allow-Headers'] = 'Content-Type, Authorization, Request-Timeout'
+        response.headers['Access-Control-Allow-Methods'] = 'GET, PATCH, POST, PUT, DELETE, OPTIONS'
+        response.headers['Access-Control-Expose-Headers'] = 'Link, X-Paging-Limit, X-Paging-Since, X-Paging-Until'
+        return response
+
+    def error(code, message):
+        return jsonify({'code': code, 'error': message, 'debug': None}), code
+
+    def resolve(key, resource_id):
+        resource_type = REFERENCES.get(key)
+        return registry.get(resource_type, resource_id) if resource_type and resource_id else None
+
+    @app.route('/x-nmos/query/', methods=['GET'])
+    def query_root():
+        return jsonify([QUERY_API_VERSION + '/'])
+
+    @app.route('/x-nmos/query/<version>/', methods=['GET'])
+    def query_version(version):
+        return jsonify([resource_type + '/' for resource_type in RESOURCE_TYPES + ['subscriptions']])
+
+    @app.route('/x-nmos/query/<version>/<resource_type>', methods=['GET'], strict_slashes=False)
+    def query_list(version, resource_type):
+        if resource_type == 'subscriptions':
+            return jsonify([])
+        if resource_type not in RESOURCE_TYPES:
+            return error(404, 'Unknown resource type')
+        params = request.args.to_dict()
+        try:
+            limit = min(int(params.get('paging.limit', registry.paging_limit)), registry.max_paging_limit)
+            since = parse_version(params['paging.since']) if 'paging.since' in params else None
+            until = parse_version(params['paging.until']) if 'paging.until' in params else None
+        except ValueError:
+            return error(400, 'Invalid paging parameters')
+        # nmos-js asks for paging.order=update, which is the only order the mock has
+        rql = raw_query_parameter(request.query_string.decode('latin-1'), 'query.rql')
+        try:
+            query = parse(rql) if rql is not None else None
+            resources = filter_resources(registry.list(resource_type), params, query, resolve)
+        except UnsupportedQuery as unsupported:
+            return error(501, str(unsupported))
+        now = max(registry.last_version, divmod(time.time_ns(), 1000000000))
+        page, page_since, page_until = page_resources(resources, since, until, limit, now)
+        if page_until is None:
+            page_until = now
+
+        def link(rel, **paging):
+            query = {key: value for key, value in params.items()
+                     if key not in ('paging.since', 'paging.until', 'paging.limit')}
+            query.update(paging)
+            query['paging.limit'] = limit
+            return '<{}?{}>; rel="{}"'.format(request.base_url, urlencode(query), rel)
+
+        links = [link('first', **{'paging.since': '0:0'}),
+                 link('last', **{'paging.until': format_version(page_until)})]
+        newest = parse_version(resources[-1]['version']) if resources else (0, 0)
+        oldest = parse_version(resources[0]['version']) if resources else (0, 0)
+        if page_until < newest:
+            links.append(link('next', **{'paging.since': format_version(page_until)}))
+        if page_since >= oldest and page_since != (0, 0):
+            links.append(link('prev', **{'paging.until': format_version(page_since)}))
+
+        response = jsonify(page)
+        response.headers['Link'] = ', '.join(links)
+        response.headers['X-Paging-Limit'] = str(limit)
+        response.headers['X-Paging-Since'] = format_version(page_since)
+        response.headers['X-Paging-Until'] = format_version(page_until)
+        return response
+
+    @app.route('/x-nmos/query/<version>/<resource_type>/<resource_id>', methods=['GET'], strict_slashes=False)
+    def query_resource(version, resource_type, resource_id):
+        if resource_type not in RESOURCE_TYPES:
+            return error(404, 'Unknown resource type')
+        resource = registry.get(resource_type, resource_id)
+        if resource is None:
+            return error(404, 'Resource not found')
+        return jsonify(resource)
+
+    @app.route('/x-nmos/connection/', methods=['GET'])
+    def connection_root():
+        return jsonify([CONNECTION_API_VERSION + '/'])
+
+    @app.route('/x-nmos/connection/<version>/', methods=['GET'])
+    def connection_version(version):
+        return jsonify(['single/'])
+
+    @app.route('/x-nmos/connection/<version>/single/', methods=['GET'])
+    def connection_single(version):
+        return jsonify(['senders/', 'receivers/'])
+
+    @app.route('/x-nmos/connection/<version>/single/<resource_type>', methods=['GET'], strict_slashes=False)
+    def connection_list(version, resource_type):
+        if resource_type not in ('senders', 'receivers'):
+            return error(404, 'Unknown resource type')
+        return jsonify([resource_id + '/' for resource_id in registry.connection_ids(resource_type)])
+
+    def connection_or_404(resource_type, resource_id):
+        connection = registry.connection(resource_type, resource_id) \
+            if resource_type in ('senders', 'receivers') else None
+        if connection is None:
+            raise NotFound()
+        return connection
+
+    @app.errorhandler(NotFound)
+    def not_found(exception):
+        return error(404, 'Resource not found')
+
+    @app.route('/x-nmos/connection/<version>/single/<resource_type>/<resource_id>', methods=['GET'],
+               strict_slashes=False)
+    def connection_endpoints(version, resource_type, resource_id):
+        connection_or_404(resource_type, resource_id)
+        endpoints = ['constraints/', 'staged/', 'active/', 'transporttype/']
+        if resource_type == 'senders':
+            endpoints.append('transportfile/')
+        return jsonify(endpoints)
+
+    @app.route('/x-nmos/connection/<version>/single/<resource_type>/<resource_id>/constraints',
+               methods=['GET'], strict_slashes=False)
+    def connection_constraints(version, resource_type, resource_id):
+        connection = connection_or_404(resource_type, resource_id)
+        return jsonify([{param: {} for param in leg} for leg in connection['active']['transport_params']])
+
+    @app.route('/x-nmos/connection/<version>/single/<resource_type>/<resource_id>/staged',
+               methods=['GET', 'PATCH'], strict_slashes=False)
+    def connection_staged(version, resource_type, resource_id):
+        connection = connection_or_404(resource_type, resource_id)
+        if request.method == 'GET':
+            return jsonify(connection['staged'])
+        patch = request.get_json(silent=True)
+        if not isinstance(patch, dict):
+            return error(400, 'Invalid staged parameters')
+        if 'transport_params' in patch and len(patch['transport_params']) != len(
+                connection['staged']['transport_params']):
+            return error(400, 'Wrong number of transport_params legs')
+        return jsonify(registry.patch_staged(resource_type, resource_id, patch))
+
+    @app.route('/x-nmos/connection/<version>/single/<resource_type>/<resource_id>/active',
+               methods=['GET'], strict_slashes=False)
+    def connection_active(version, resource_type, resource_id):
+        return jsonify(connection_or_404(resource_type, resource_id)['active'])
+
+    @app.route('/x-nmos/connection/<version>/single/<resource_type>/<resource_id>/transporttype',
+               methods=['GET'], strict_slashes=False)
+    def connection_transport_type_get(version, resource_type, resource_id):
+        return jsonify(connection_transport_type(connection_or_404(resource_type, resource_id)['transport']))
+
+    @app.route('/x-nmos/connection/<version>/single/senders/<resource_id>/transportfile',
+               methods=['GET'], strict_slashes=False)
+    def connection_transport_file(version, resource_id):
+        connection = connection_or_404('senders', resource_id)
+        if connection_transport_type(connection['transport']) != 'urn:x-nmos:transport:rtp':
+            return error(404, 'Sender has no transport file')
+        leg = connection['active']['transport_params'][0]
+        sdp = '\r\n'.join([
+            'v=0', 'o=- 0 0 IN IP4 {}'.format(leg['source_ip']), 's=Benchmark', 't=0 0',
+            'm=video {} RTP/AVP 96'.format(leg['destination_port']),
+            'c=IN IP4 {}/32'.format(leg['destination_ip']),
+            'a=source-filter: incl IN IP4 {} {}'.format(leg['destination_ip'], leg['source_ip']),
+            'a=rtpmap:96 raw/90000', ''])
+        return Response(sdp, mimetype='application/sdp')
+
+    return app
+
+
+class MockQueryAPI:
+    """
+    Serve a registry's Query API, and the Connection API of its devices, from a background thread
+    """
+
+    def __init__(self, registry, host='127.0.0.1', port=5102):
+        self.registry = registry
+        self.app = create_app(registry)
+        self.server = make_server(host, port, self.app, threaded=True)
+        self.url = 'http://{}:{}/'.format(host, self.server.server_port)
+        registry.connection_href = '{}x-nmos/connection/{}/'.format(self.url, CONNECTION_API_VERSION)
+        self.thread = threading.Thread(target=self.server.serve_forever, daemon=True)
+
+    def start(self):
+        self.thread.start()
+        return self
+
+    def stop(self):
+        self.server.shutdown()
@@ -0,0 +1,222 @@
+# Copyright (C) 2021 Advanced Media Workflow Association
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""
+The subset of RQL which nmos-js issues to the IS-04 Query API, for the mock Query API
+"""
+
+import re
+from fractions import Fraction
+from urllib.parse import unquote
+
+
+class UnsupportedQuery(ValueError):
+    """
+    RQL which is malformed or uses operators the mock does not implement
+    """
+
+
+class Sampling(str):
+    """
+    An RQL 'sampling:' value, such as 'YCbCr-4:2:2', which the mock cannot compare with a flow's components
+    """
+
+
+def raw_query_parameter(query_string, name):
+    """
+    Value of a query parameter still percent-encoded, since RQL values are encoded separately
+    so that e.g. '%2C' in a value is not taken as a separator
+    """
+    for parameter in query_string.split('&'):
+        key, _, value = parameter.partition('=')
+        if unquote(key) == name:
+            return value
+    return None
+
+
+def tokenize(rql):
+    return [token for token in re.split(r'([(),])', rql) if token != '']
+
+
+def parse(rql):
+    """
+    Parse RQL into nested (operator, arguments) tuples, with values decoded by type and arrays,
+    such as the values of 'in', as lists
+    """
+    tokens = tokenize(rql)
+    position = 0
+
+    def parse_array():
+        nonlocal position
+        position += 1
+        values = []
+        while True:
+            if position >= len(tokens):
+                raise UnsupportedQuery('Unterminated array')
+            if tokens[position] == ')':
+                position += 1
+                return values
+            if tokens[position] == ',':
+                position += 1
+                continue
+            if tokens[position] == '(':
+                raise UnsupportedQuery('Unexpected ( in array')
+            values.append(decode_value(tokens[position]))
+            position += 1
+
+    def parse_call():
+        nonlocal position
+        operator = unquote(tokens[position])
+        if position + 1 >= len(tokens) or tokens[position + 1] != '(':
+            raise UnsupportedQuery('Expected ( after ' + operator)
+        position += 2
+        arguments = []
+        while True:
+            if position >= len(tokens):
+                raise UnsupportedQuery('Unterminated ' + operator)
+            if tokens[position] == ')':
+                position += 1
+                return operator, arguments
+            if tokens[position] == ',':
+                position += 1
+                continue
+            if tokens[position] == '(':
+                arguments.append(parse_array())
+            elif position + 1 < len(tokens) and tokens[position + 1] == '(':
+                arguments.append(parse_call())
+            else:
+                arguments.append(decode_value(tokens[position]))
+                position += 1
+
+    if not tokens:
+        raise UnsupportedQuery('Empty query')
+    query = parse_call()
+    if position != len(tokens):
+        raise UnsupportedQuery('Unexpected ' + tokens[position])
+    return query
+
+
+def decode_value(token):
+    """
+    Decode an RQL value, with an optional type prefix such as 'string:' or 'rational:'
+    """
+    kind, colon, value = token.partition(':')
+    if colon and kind in ('string', 'number', 'boolean', 'rational', 'sampling'):
+        value = unquote(value)
+        if kind == 'number':
+            return float(value)
+        if kind == 'boolean':
+            return value == 'true'
+        if kind == 'rational':
+            numerator, _, denominator = value.partition('/')
+            return Fraction(int(numerator), int(denominator or 1))
+        if kind == 'sampling':
+            return Sampling(value)
+        return value
+    value = unquote(token)
+    if value in ('true', 'false'):
+        return value == 'true'
+    if value == 'null':
+        return None
+    try:
+        return float(value) if '.' in value else int(value)
+    except ValueError:
+        return value
+
+
+def lookup(resource, path):
+    for key in path.split('.'):
+        if not isinstance(resource, dict) or key not in resource:
+            return None
+        resource = resource[key]
+    return resource
+
+
+def property_value(resource, key):
+    """
+    Value of the property named by key, a path such as 'grain_rate' or a call such as count(channels)
+    """
+    if isinstance(key, tuple):
+        operator, arguments = key
+        if operator == 'count' and len(arguments) == 1:
+            value = property_value(resource, arguments[0])
+            return len(value) if isinstance(value, list) else None
+        raise UnsupportedQuery('Unsupported RQL property operator ' + operator)
+    return lookup(resource, str(key))
+
+
+def comparable(actual, expected):
+    """
+    Convert a resource property for comparison with an RQL value, e.g. an IS-04 rational
+    """
+    if isinstance(expected, Sampling):
+        raise UnsupportedQuery('Comparing color sampling is not supported')
+    if isinstance(expected, Fraction) and isinstance(actual, dict):
+        return Fraction(actual.get('numerator', 0), actual.get('denominator', 1))
+    return actual
+
+
+COMPARISONS = {
+    'eq': lambda actual, expected: actual == expected,
+    'ne': lambda actual, expected: actual != expected,
+    'lt': lambda actual, expected: actual is not None and actual < expected,
+    'le': lambda actual, expected: actual is not None and actual <= expected,
+    'gt': lambda actual, expected: actual is not None and actual > expected,
+    'ge': lambda actual, expected: actual is not None and actual >= expected
+}
+
+
+def evaluate(query, resource, resolve):
+    """
+    Check a resource against parsed RQL
+    resolve(key, id) returns the resource referenced by a property such as flow_id, for 'rel'
+    """
+    operator, arguments = query
+    if operator == 'and':
+        return all(evaluate(argument, resource, resolve) for argument in arguments)
+    if operator == 'or':
+        return any(evaluate(argument, resource, resolve) for argument in arguments)
+    if operator == 'not':
+        return not evaluate(arguments[0], resource, resolve)
+    if operator == 'rel':
+        key, subquery = arguments
+        referenced = resolve(key, lookup(resource, key))
+        return referenced is not None and evaluate(subquery, referenced, resolve)
+    if operator == 'sub':
+        key, subquery = arguments
+        values = property_value(resource, key)
+        return isinstance(values, list) and any(evaluate(subquery, value, resolve) for value in values)
+    if operator == 'matches':
+        key, pattern = arguments[:2]
+        flags = re.IGNORECASE if len(arguments) > 2 and arguments[2] == 'i' else 0
+        actual = property_value(resource, key)
+        values = actual if isinstance(actual, list) else [actual]
+        try:
+            return any(isinstance(value, str) and re.search(str(pattern), value, flags) for value in values)
+        except re.error as error:
+            raise UnsupportedQuery('Invalid pattern {}: {}'.format(pattern, error))
+    if operator == 'in':
+        key, expected_values = arguments
+        if not isinstance(expected_values, list):
+            raise UnsupportedQuery('in needs an array of values')
+        actual = property_value(resource, key)
+        return any(comparable(actual, expected) == expected for expected in expected_values)
+    if operator in COMPARISONS:
+        key, expected = arguments
+        actual = comparable(property_value(resource, key), expected)
+        try:
+            return COMPARISONS[operator](actual, expected)
+        except TypeError:
+            return False
+    raise UnsupportedQuery('Unsupported RQL operator ' + operator)
@@ -0,0 +1,222 @@
+# Copyright (C) 2021 Advanced Media Workflow Association
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""
+Benchmark the Testing Facade against a stand-in NMOS Testing tool and mock Query API,
+all running on this machine
+
+Run from the TestingFacade directory with nmos-js running, e.g.
+    python3 -m benchmark.RunBenchmark --repeat 5 --json results.json
+"""
+
+import argparse
+import atexit
+import json
+import logging
+import math
+import sys
+import threading
+import time
+from werkzeug.serving import make_server
+from benchmark.FakeTestingTool import FakeTestingTool
+from benchmark.MockQueryAPI import MockQueryAPI, MockRegistry
+from benchmark.Suites import SUITES, UNCHECKED
+import Config as CONFIG
+
+
+def percentile(values, fraction):
+    """
+    Nearest-rank percentile of a list of values
+    """
+    ordered = sorted(values)
+    index = max(0, min(len(ordered) - 1, math.ceil(fraction * len(ordered)) - 1))
+    return ordered[index]
+
+
+def summarise(values):
+    if not values:
+        return None
+    return {
+        'count': len(values),
+        'p50': percentile(values, 0.5),
+        'p90': percentile(values, 0.9),
+        'p99': percentile(values, 0.99),
+        'max': max(values)
+    }
+
+
+def is_correct(expected, answer):
+    if expected is UNCHECKED:
+        return True
+    if isinstance(expected, list) and isinstance(answer, list):
+        return sorted(expected) == sorted(answer)
+    return expected == answer
+
+
+def start_facade(port):
+    """
+    Run the Testing Facade in this process, as TestingFacade.py does
+    """
+    import TestingFacade
+    atexit.register(TestingFacade.browser_pool.shutdown)
+    TestingFacade.start_services()
+    # Keep starting the browsers out of the first question's latency
+    TestingFacade.browser_pool.warmed.wait()
+    server = make_server('127.0.0.1', port, TestingFacade.app, threaded=True)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+
+
+def run_suite(tool, registry, mock_url, test_class, options, populate=None):
+    """
+    Ask the questions of one suite in order, as NMOS Testing does
+    populate is called to register other resources before those of the suite
+    Returns the total time taken and a result for each question
+    """
+    registry.clear()
+    registry.max_paging_limit = registry.paging_limit
+    if populate:
+        populate()
+    steps = SUITES[test_class](registry, options.senders, options.receivers)
+    results = []
+    start = time.monotonic()
+
+    tool.ask(tool.question_json('pre_tests_message', test_class, mock_registry_url=mock_url))
+    for step in steps:
+        if step.before:
+            step.before()
+        question = tool.question_json(step.question_id, test_class, step.answers, step.metadata,
+                                      timeout=options.timeout)
+        if step.during:
+            step.during()
+        answer, latency = tool.ask(question)
+        results.append({
+            'question_id': step.question_id,
+            'latency': latency,
+            'answered': latency is not None,
+            'correct': latency is not None and is_correct(step.expected, answer)
+        })
+    tool.ask(tool.question_json('post_tests_message', test_class))
+    tool.clear()
+
+    return time.monotonic() - start, results
+
+
+def report(test_class, totals, results):
+    """
+    Print latency percentiles of each question and of the whole suite
+    Returns the summary written to the JSON output
+    """
+    questions = {}
+    for result in results:
+        summary = questions.setdefault(result['question_id'], {'latencies': [], 'incorrect': 0, 'unanswered': 0})
+        if result['answered']:
+            summary['latencies'].append(result['latency'])
+        else:
+            summary['unanswered'] += 1
+        if result['answered'] and not result['correct']:
+            summary['incorrect'] += 1
+
+    print(test_class)
+    print('  {:<12} {:>6} {:>8} {:>8} {:>8} {:>8} {:>10} {:>10}'.format(
+        'question', 'runs', 'p50', 'p90', 'p99', 'max', 'incorrect', 'unanswered'))
+    for question_id, summary in questions.items():
+        latency = summarise(summary['latencies']) or dict.fromkeys(['count', 'p50', 'p90', 'p99', 'max'], 0)
+        print('  {:<12} {:>6} {:>8.3f} {:>8.3f} {:>8.3f} {:>8.3f} {:>10} {:>10}'.format(
+            question_id, latency['count'], latency['p50'], latency['p90'], latency['p99'], latency['max'],
+            summary['incorrect'], summary['unanswered']))
+        summary['latency'] = summarise(summary.pop('latencies'))
+    suite = summarise(totals)
+    print('  {:<12} {:>6} {:>8.3f} {:>8.3f} {:>8.3f} {:>8.3f}'.format(
+        'suite total', suite['count'], suite['p50'], suite['p90'], suite['p99'], suite['max']))
+    return {'total': suite, 'questions': questions}
+
+
+def regressions(summaries, baseline, tolerance):
+    """
+    Suites which answered incorrectly, or whose median total time is slower than the baseline
+    by more than the tolerance
+    """
+    failures = []
+    for test_class, summary in summaries.items():
+        if any(question['incorrect'] or question['unanswered'] for question in summary['questions'].values()):
+            failures.append('{} answered incorrectly'.format(test_class))
+        if baseline and test_class in baseline:
+            limit = baseline[test_class]['total']['p50'] * (1 + tolerance)
+            if summary['total']['p50'] > limit:
+                failures.append('{} took {:.3f}s, baseline {:.3f}s'.format(
+                    test_class, summary['total']['p50'], baseline[test_class]['total']['p50']))
+    return failures
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark the Testing Facade offline')
+    parser.add_argument('--suites', nargs='+', choices=list(SUITES), default=list(SUITES),
+                        help='test classes to benchmark')
+    parser.add_argument('--repeat', type=int, default=3, help='number of times to run each suite')
+    parser.add_argument('--senders', type=int, default=4, help='number of senders registered for each suite')
+    parser.add_argument('--receivers', type=int, default=4, help='number of receivers registered for each suite')
+    parser.add_argument('--paging-limit', type=int, default=10, help='maximum paging limit of the mock Query API')
+    parser.add_argument('--timeout', type=int, default=120, help='time in seconds to wait for each answer')
+    parser.add_argument('--facade-url', help='URL of a running Testing Facade; by default one is started '
+                                             'in this process on TESTING_FACADE_PORT')
+    parser.add_argument('--query-port', type=int, default=5102, help='port for the mock Query API')
+    parser.add_argument('--answer-port', type=int, default=5103, help='port to receive answers on')
+    parser.add_argument('--json', help='file to write the results to')
+    parser.add_argument('--baseline', help='results file of an earlier run to compare against')
+    parser.add_argument('--tolerance', type=float, default=0.2,
+                        help='fraction by which a suite may be slower than the baseline')
+    options = parser.parse_args()
+
+    # Keep the report readable by not logging every question and answer request
+    logging.getLogger('werkzeug').setLevel(logging.WARNING)
+
+    facade_url = options.facade_url
+    if not facade_url:
+        start_facade(CONFIG.TESTING_FACADE_PORT)
+        facade_url = 'http://127.0.0.1:{}'.format(CONFIG.TESTING_FACADE_PORT)
+
+    registry = MockRegistry(paging_limit=options.paging_limit, max_paging_limit=options.paging_limit)
+    mock = MockQueryAPI(registry, port=options.query_port).start()
+    tool = FakeTestingTool(facade_url, port=options.answer_port).start()
+
+    summaries = {}
+    try:
+        for test_class in options.suites:
+            totals = []
+            results = []
+            for run in range(options.repeat):
+                total, run_results = run_suite(tool, registry, mock.url, test_class, options)
+                totals.append(total)
+                results += run_results
+            summaries[test_class] = report(test_class, totals, results)
+    finally:
+        tool.stop()
+        mock.stop()
+
+    if options.json:
+        with open(options.json, 'w') as output:
+            json.dump(summaries, output, indent=2)
+
+    baseline = None
+    if options.baseline:
+        with open(options.baseline) as baseline_file:
+            baseline = json.load(baseline_file)
+    failures = regressions(summaries, baseline, options.tolerance)
+    for failure in failures:
+        print(' * FAILED: ' + failure)
+    return 1 if failures else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,143 @@
+# Copyright (C) 2021 Advanced Media Workflow Association
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""
+Measure how the Testing Facade's step times grow with the size of the registry, by running
+benchmark suites against mock registries holding increasing numbers of senders and receivers
+
+Run from the TestingFacade directory with nmos-js running, e.g.
+    python3 -m benchmark.RunScaling --sizes 0 100 1000 5000 --json scaling.json
+"""
+
+import argparse
+import json
+import logging
+import re
+import sys
+from collections import defaultdict
+import requests
+from benchmark.FakeTestingTool import FakeTestingTool
+from benchmark.MockQueryAPI import MockQueryAPI, MockRegistry
+from benchmark.RunBenchmark import run_suite, start_facade, summarise
+from benchmark.Suites import SUITES
+import Config as CONFIG
+
+METRIC_LINE = re.compile(r'^facade_span_seconds_(sum|count)\{span="([^"]*)",suite="([^"]*)",'
+                         r'question="([^"]*)",outcome="([^"]*)"\} (\S+)$')
+
+
+def span_totals(facade_url):
+    """
+    Total time and count of each facade step, by suite and span name, from the facade's metrics
+    """
+    totals = defaultdict(lambda: {'sum': 0.0, 'count': 0})
+    for line in requests.get(facade_url + '/metrics', timeout=CONFIG.WAIT_TIME).text.splitlines():
+        match = METRIC_LINE.match(line)
+        if match:
+            kind, span, suite, question, outcome, value = match.groups()
+            totals[(suite, span)][kind] += float(value)
+    return totals
+
+
+def span_means(before, after):
+    """
+    Mean duration of each step taken between two readings of span_totals
+    """
+    means = {}
+    for key, total in after.items():
+        count = total['count'] - before.get(key, {'count': 0})['count']
+        if count:
+            means[key] = (total['sum'] - before.get(key, {'sum': 0.0})['sum']) / count
+    return means
+
+
+def report(sizes, results):
+    """
+    Print the mean time of each step of each suite against registry size
+    """
+    header = '  {:<24}'.format('step') + ''.join('{:>10}'.format(size) for size in sizes)
+    for test_class in sorted({suite for size in sizes for suite, _ in results[size]['steps']}):
+        print('{} (mean seconds, by number of senders and receivers registered)'.format(test_class))
+        print(header)
+        spans = sorted({span for size in sizes for suite, span in results[size]['steps'] if suite == test_class})
+        for span in spans:
+            cells = [results[size]['steps'].get((test_class, span)) for size in sizes]
+            print('  {:<24}'.format(span) + ''.join('{:>10}'.format('-' if cell is None else '{:.3f}'.format(cell))
+                                                    for cell in cells))
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Measure Testing Facade step times against registry size')
+    parser.add_argument('--sizes', nargs='+', type=int, default=[0, 100, 1000],
+                        help='numbers of senders and receivers to register besides those of the suites')
+    parser.add_argument('--suites', nargs='+', choices=list(SUITES), default=['IS0503Test', 'BCP0070302Test'],
+                        help='test classes to run at each size')
+    parser.add_argument('--repeat', type=int, default=1, help='number of times to run each suite at each size')
+    parser.add_argument('--mxl-fraction', type=float, default=0.1, help='fraction of devices which use MXL')
+    parser.add_argument('--senders', type=int, default=4, help='number of senders registered by each suite')
+    parser.add_argument('--receivers', type=int, default=4, help='number of receivers registered by each suite')
+    parser.add_argument('--paging-limit', type=int, default=10, help='maximum paging limit of the mock Query API')
+    parser.add_argument('--timeout', type=int, default=600, help='time in seconds to wait for each answer')
+    parser.add_argument('--facade-url', help='URL of a running Testing Facade; by default one is started '
+                                             'in this process on TESTING_FACADE_PORT')
+    parser.add_argument('--query-port', type=int, default=5102, help='port for the mock Query API')
+    parser.add_argument('--answer-port', type=int, default=5103, help='port to receive answers on')
+    parser.add_argument('--json', help='file to write the results to')
+    options = parser.parse_args()
+
+    logging.getLogger('werkzeug').setLevel(logging.WARNING)
+
+    facade_url = options.facade_url
+    if not facade_url:
+        start_facade(CONFIG.TESTING_FACADE_PORT)
+        facade_url = 'http://127.0.0.1:{}'.format(CONFIG.TESTING_FACADE_PORT)
+
+    registry = MockRegistry(paging_limit=options.paging_limit, max_paging_limit=options.paging_limit)
+    mock = MockQueryAPI(registry, port=options.query_port).start()
+    tool = FakeTestingTool(facade_url, port=options.answer_port).start()
+
+    results = {}
+    try:
+        for size in options.sizes:
+            def populate():
+                registry.populate_scale(size, size, mxl_fraction=options.mxl_fraction)
+
+            before = span_totals(facade_url)
+            latencies = defaultdict(list)
+            for test_class in options.suites:
+                for run in range(options.repeat):
+                    _, run_results = run_suite(tool, registry, mock.url, test_class, options, populate)
+                    for result in run_results:
+                        if result['answered']:
+                            latencies[test_class + '.' + result['question_id']].append(result['latency'])
+            results[size] = {
+                'steps': span_means(before, span_totals(facade_url)),
+                'questions': {question: summarise(values) for question, values in latencies.items()}
+            }
+    finally:
+        tool.stop()
+        mock.stop()
+
+    report(options.sizes, results)
+
+    if options.json:
+        with open(options.json, 'w') as output:
+            json.dump({size: {'steps': {'{}.{}'.format(*key): mean for key, mean in result['steps'].items()},
+                              'questions': result['questions']}
+                       for size, result in results.items()}, output, indent=2)
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,164 @@
+# Copyright (C) 2021 Advanced Media Workflow Association
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import random
+import threading
+from collections import namedtuple
+from benchmark.MockQueryAPI import video_constraint_set
+
+# Answer whose value the benchmark does not check
+UNCHECKED = object()
+
+# Frame width, height and rate of the video sent and accepted by the MXL senders and receivers, in turn
+MXL_VIDEO_FORMATS = [(1920, 1080, 50), (1280, 720, 25)]
+
+# A question of a benchmark suite
+# answers are the resources offered as answers, expected is the correct answer (answer ids are
+# 'answer_<index>'), before is called before the question is posted and during is started
+# in a thread as it is posted, to change the registry while the facade is answering
+Step = namedtuple('Step', ['question_id', 'answers', 'metadata', 'expected', 'before', 'during'])
+Step.__new__.__defaults__ = ([], None, None, None, None)
+
+
+def answer_ids(resources, selected):
+    """
+    Answer ids of the selected resources, in the order they are offered as answers
+    """
+    selected_ids = {resource['id'] for resource in selected}
+    return ['answer_{}'.format(index) for index, resource in enumerate(resources) if resource['id'] in selected_ids]
+
+
+def answer_resource(resource):
+    return {'id': resource['id'], 'label': resource['label'], 'description': resource['description']}
+
+
+def later(delay, action):
+    """
+    Action for Step.during which changes the registry after a delay
+    """
+    def during():
+        threading.Timer(delay, action).start()
+    return during
+
+
+def set_paging_limit(registry, limit):
+    def before():
+        registry.max_paging_limit = limit
+    return before
+
+
+def is0404_suite(registry, senders=4, receivers=4, change_delay=2):
+    """
+    IS-04-04 questions: discovery through paged lists, and a sender going offline and back online
+    """
+    sender_resources, receiver_resources = registry.populate(senders, receivers, label_prefix='IS0404')
+    sender_answers = [answer_resource(sender) for sender in sender_resources]
+    receiver_answers = [answer_resource(receiver) for receiver in receiver_resources]
+    offline_sender = random.choice(sender_resources)
+    removed = {}
+
+    def take_offline():
+        removed['sender'] = registry.delete('senders', offline_sender['id'])
+
+    def bring_online():
+        registry.put('senders', removed['sender'])
+
+    return [
+        Step('test_01', expected=UNCHECKED),
+        Step('test_02'),
+        # NMOS Testing sets the registry paging limit to 2 for the discovery questions
+        Step('test_03', sender_answers, expected=answer_ids(sender_answers, sender_resources),
+             before=set_paging_limit(registry, 2)),
+        Step('test_04', receiver_answers, expected=answer_ids(receiver_answers, receiver_resources),
+             before=set_paging_limit(registry, 2)),
+        Step('test_05', before=set_paging_limit(registry, registry.paging_limit)),
+        Step('test_05_1', sender_answers, expected=answer_ids(sender_answers, [offline_sender])[0],
+             before=take_offline),
+        Step('test_05_2', expected='Next', during=later(change_delay, bring_online)),
+    ]
+
+
+def is0503_suite(registry, senders=4, receivers=4, change_delay=2):
+    """
+    IS-05-03 questions: which receivers have a Connection API, making and removing a connection
+    through the mock's Connection API, and following a connection being made and removed
+    """
+    sender_resources, controlled_receivers = registry.populate(senders, receivers, label_prefix='IS0503')
+    _, uncontrolled_receivers = registry.populate(0, receivers, label_prefix='IS0503 Uncontrolled',
+                                                  connection_api=False)
+    receiver_resources = controlled_receivers + uncontrolled_receivers
+    receiver_answers = [answer_resource(receiver) for receiver in receiver_resources]
+    sender_answers = [answer_resource(sender) for sender in sender_resources]
+    sender = random.choice(sender_resources)
+    receiver = random.choice(controlled_receivers)
+    metadata = {'sender': answer_resource(sender), 'receiver': answer_resource(receiver)}
+
+    def connect():
+        registry.set_receiver_subscription(receiver['id'], sender['id'])
+
+    def disconnect():
+        registry.set_receiver_subscription(receiver['id'], None)
+
+    return [
+        Step('test_01', receiver_answers, expected=answer_ids(receiver_answers, controlled_receivers)),
+        # Answered only once the Connection API shows the connection made, then removed
+        Step('test_02', metadata=metadata),
+        Step('test_03', metadata=metadata),
+        Step('test_04', receiver_answers, expected=answer_ids(receiver_answers, [receiver])[0], before=connect),
+        Step('test_04_1', sender_answers, metadata, expected=answer_ids(sender_answers, [sender])[0]),
+        Step('test_04_2', metadata=metadata, during=later(change_delay, disconnect)),
+    ]
+
+
+def bcp0070302_suite(registry, senders=4, receivers=4):
+    """
+    BCP-007-03-02 questions: which senders and receivers use MXL, connecting an MXL receiver to an
+    MXL sender, and which receivers accept an MXL sender's flow according to their BCP-004-01
+    constraint sets
+    """
+    transport = 'urn:x-nmos:transport:mxl'
+    node = registry.add_node('MXL Node')
+    device = registry.add_device(node['id'], 'MXL Device')
+    mxl_senders = []
+    for index in range(senders):
+        width, height, rate = MXL_VIDEO_FORMATS[index % len(MXL_VIDEO_FORMATS)]
+        mxl_senders.append(registry.add_sender(device, 'MXL Sender {}'.format(index), transport, frame_width=width,
+                                               frame_height=height, grain_rate={'numerator': rate, 'denominator': 1}))
+    mxl_receivers = []
+    for index in range(receivers):
+        video_format = MXL_VIDEO_FORMATS[index % len(MXL_VIDEO_FORMATS)]
+        mxl_receivers.append(registry.add_receiver(device, 'MXL Receiver {}'.format(index), transport,
+                                                   [video_constraint_set(*video_format)]))
+    other_senders, other_receivers = registry.populate(senders, receivers, label_prefix='RTP')
+    sender_answers = [answer_resource(sender) for sender in mxl_senders + other_senders]
+    receiver_answers = [answer_resource(receiver) for receiver in mxl_receivers + other_receivers]
+
+    # The first MXL sender and receiver, and every receiver of the same video format, are compatible
+    sender = mxl_senders[0]
+    receiver = mxl_receivers[0]
+    compatible = mxl_receivers[::len(MXL_VIDEO_FORMATS)]
+    metadata = {'sender': answer_resource(sender), 'receiver': answer_resource(receiver)}
+
+    return [
+        Step('test_01', sender_answers, expected=answer_ids(sender_answers, mxl_senders)),
+        Step('test_02', receiver_answers, expected=answer_ids(receiver_answers, mxl_receivers)),
+        Step('test_03', metadata=metadata),
+        Step('test_04', receiver_answers, {'sender': answer_resource(sender)},
+             expected=answer_ids(receiver_answers, compatible)),
+    ]
+
+
+SUITES = {'IS0404Test': is0404_suite,
+          'IS0503Test': is0503_suite,
+          'BCP0070302Test': bcp0070302_suite}
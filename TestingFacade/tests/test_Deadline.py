@@ -0,0 +1,44 @@
+# Copyright (C) 2021 Advanced Media Workflow Association
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import time
+import unittest
+from Deadline import Deadline
+
+
+class TestDeadline(unittest.TestCase):
+
+    def test_without_timeout(self):
+        deadline = Deadline()
+        self.assertIsNone(deadline.remaining())
+        self.assertFalse(deadline.expired())
+        self.assertEqual(deadline.clamp(5), 5)
+        self.assertEqual(deadline.overrun(), 0)
+
+    def test_remaining_keeps_margin(self):
+        deadline = Deadline(10, margin=2)
+        self.assertAlmostEqual(deadline.remaining(), 8, delta=0.5)
+        self.assertEqual(deadline.clamp(3), 3)
+        self.assertAlmostEqual(deadline.clamp(30), 8, delta=0.5)
+
+    def test_counts_from_start(self):
+        deadline = Deadline(5, start=time.monotonic() - 4, margin=2)
+        self.assertTrue(deadline.expired())
+        self.assertEqual(deadline.remaining(), 0)
+        self.assertEqual(deadline.clamp(3), 0)
+        self.assertEqual(deadline.overrun(), 0)
+
+    def test_overrun(self):
+        deadline = Deadline(1, start=time.monotonic() - 3)
+        self.assertAlmostEqual(deadline.overrun(), 2, delta=0.5)
@@ -0,0 +1,53 @@
+# Copyright (C) 2021 Advanced Media Workflow Association
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import unittest
+from unittest import mock
+from FacadeSession import FacadeSessions, run_key
+
+
+class TestFacadeSessions(unittest.TestCase):
+
+    def setUp(self):
+        self.sessions = FacadeSessions()
+        self.first = self.sessions.session_for('http://10.0.0.1:5000/x-nmos/testanswer/v1.0')
+        self.second = self.sessions.session_for('http://10.0.0.1:5001/x-nmos/testanswer/v1.0')
+
+    def runs(self):
+        return [session['run'] for session in self.sessions.status()]
+
+    def test_run_key(self):
+        self.assertEqual(run_key('http://[::1]:5000/x-nmos/testanswer/v1.0'), '[::1]:5000')
+        self.assertEqual(self.first.host, '10.0.0.1')
+
+    def test_clear_by_answer_uri(self):
+        ended = self.sessions.end_sessions_for('10.0.0.1', 'http://10.0.0.1:5001/x-nmos/testanswer/v1.0')
+        self.assertEqual(ended, [self.second])
+        self.assertEqual(self.runs(), ['10.0.0.1:5000'])
+
+    def test_clear_from_shared_host_ends_latest_finished(self):
+        self.second.finish()
+        self.first.finish()
+        self.assertEqual(self.sessions.end_sessions_for('10.0.0.1'), [self.first])
+        self.assertEqual(self.runs(), ['10.0.0.1:5001'])
+
+    def test_clear_from_shared_host_leaves_runs_going(self):
+        with mock.patch('builtins.print'):
+            self.assertEqual(self.sessions.end_sessions_for('10.0.0.1'), [])
+        self.assertEqual(len(self.runs()), 2)
+
+    def test_clear_from_only_host(self):
+        sessions = FacadeSessions()
+        session = sessions.session_for('http://10.0.0.2:5000/')
+        self.assertEqual(sessions.end_sessions_for('10.0.0.2'), [session])
@@ -0,0 +1,61 @@
+# Copyright (C) 2021 Advanced Media Workflow Association
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import re
+import unittest
+from benchmark.MockQueryAPI import MockRegistry, create_app
+
+
+class TestPaging(unittest.TestCase):
+
+    def setUp(self):
+        self.registry = MockRegistry()
+        self.senders, _ = self.registry.populate(5, 0, label_prefix='Test')
+        self.client = create_app(self.registry).test_client()
+
+    def get(self, url):
+        response = self.client.get(url)
+        links = {rel: link.replace('http://localhost', '')
+                 for link, rel in re.findall(r'<([^>]+)>; rel="(\w+)"', response.headers['Link'])}
+        return [sender['label'] for sender in response.get_json()], links, response.headers
+
+    def test_unbounded_page_is_newest(self):
+        labels, links, headers = self.get('/x-nmos/query/v1.3/senders?paging.limit=2')
+        self.assertEqual(labels, ['Test Sender 3', 'Test Sender 4'])
+        self.assertIn('prev', links)
+        self.assertNotIn('next', links)
+        self.assertGreaterEqual(tuple(map(int, headers['X-Paging-Until'].split(':'))), self.registry.last_version)
+
+    def test_prev_visits_every_resource(self):
+        url = '/x-nmos/query/v1.3/senders?paging.limit=2'
+        seen = []
+        while url:
+            labels, links, _ = self.get(url)
+            seen = labels + seen
+            url = links.get('prev')
+        self.assertEqual(seen, [sender['label'] for sender in self.senders])
+
+    def test_since_zero_is_oldest(self):
+        labels, links, _ = self.get('/x-nmos/query/v1.3/senders?paging.limit=2&paging.since=0:0')
+        self.assertEqual(labels, ['Test Sender 0', 'Test Sender 1'])
+        self.assertIn('next', links)
+
+    def test_reregistered_resource_moves_to_newest_page(self):
+        self.registry.put('senders', self.registry.get('senders', self.senders[0]['id']))
+        labels, _, _ = self.get('/x-nmos/query/v1.3/senders?paging.limit=2')
+        self.assertEqual(labels, ['Test Sender 4', 'Test Sender 0'])
+
+    def test_unsupported_rql(self):
+        response = self.client.get('/x-nmos/query/v1.3/senders?query.rql=unknown(label,a)')
+        self.assertEqual(response.status_code, 501)
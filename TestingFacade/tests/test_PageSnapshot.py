@@ -0,0 +1,67 @@
+# Copyright (C) 2021 Advanced Media Workflow Association
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import unittest
+from PageSnapshot import PageSnapshot, ResourceRow
+
+
+def snapshot(*rows, next_enabled=None, prev_enabled=None):
+    return PageSnapshot('senders', [ResourceRow(index, label, 'senders', resource_id, active)
+                                    for index, (label, resource_id, active) in enumerate(rows)],
+                        next_enabled=next_enabled, prev_enabled=prev_enabled)
+
+
+class TestChangedRows(unittest.TestCase):
+
+    def test_unchanged(self):
+        page = snapshot(('a', '1', None), ('b', '2', None))
+        self.assertEqual(page.changed_rows(page), [])
+
+    def test_added_switched_and_removed(self):
+        previous = snapshot(('a', '1', False), ('b', '2', False), ('c', '3', True))
+        current = snapshot(('a', '1', True), ('c', '3', True), ('d', '4', False))
+        self.assertEqual([(row.label, row.active) for row in current.changed_rows(previous)],
+                         [('a', True), ('d', False), ('b', False)])
+
+    def test_same_label_different_id(self):
+        previous = snapshot(('a', '1', None))
+        current = snapshot(('a', '2', None))
+        self.assertEqual([row.id for row in current.changed_rows(previous)], ['2', '1'])
+
+
+class TestPaging(unittest.TestCase):
+
+    def test_oldest_first(self):
+        page = snapshot(next_enabled=True, prev_enabled=False)
+        self.assertEqual(page.crawl_direction(), 'next')
+        self.assertTrue(page.has_more('next'))
+
+    def test_newest_first(self):
+        page = snapshot(next_enabled=False, prev_enabled=True)
+        self.assertEqual(page.crawl_direction(), 'prev')
+        self.assertTrue(page.has_more('prev'))
+
+    def test_single_page(self):
+        page = snapshot(next_enabled=False, prev_enabled=False)
+        self.assertFalse(page.has_more(page.crawl_direction()))
+
+    def test_json_round_trip(self):
+        page = snapshot(('a', '1', True), next_enabled=True, prev_enabled=False)
+        copy = PageSnapshot.from_json(page.to_json())
+        self.assertEqual((copy.rows, copy.next_enabled, copy.prev_enabled), (page.rows, True, False))
+
+    def test_json_without_prev(self):
+        json = snapshot(next_enabled=True).to_json()
+        del json['prev_enabled']
+        self.assertIsNone(PageSnapshot.from_json(json).prev_enabled)
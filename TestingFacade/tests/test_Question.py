@@ -0,0 +1,91 @@
+# Copyright (C) 2021 Advanced Media Workflow Association
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import unittest
+from Question import InvalidQuestion, Question
+
+
+def question_json(answers=(), **entries):
+    json = {'test_type': 'multi_choice', 'question_id': 'test_01', 'name': 'test_01', 'description': '',
+            'question': '', 'answers': list(answers), 'answer_uri': 'http://127.0.0.1:5000/x-nmos/testanswer/v1.0'}
+    json.update(entries)
+    return json
+
+
+def answer(index, label, resource_id=None):
+    return {'answer_id': 'answer_{}'.format(index),
+            'resource': {'id': resource_id or 'id-{}'.format(index), 'label': label, 'description': ''}}
+
+
+class TestValidate(unittest.TestCase):
+
+    def test_valid(self):
+        Question.validate(question_json([answer(0, 'a')], timeout=30, metadata={'sender': {'label': 's'}}))
+
+    def test_not_an_object(self):
+        with self.assertRaises(InvalidQuestion):
+            Question.validate([])
+
+    def test_missing_entries(self):
+        json = question_json()
+        del json['answer_uri']
+        with self.assertRaisesRegex(InvalidQuestion, 'answer_uri'):
+            Question.validate(json)
+
+    def test_answer_without_id(self):
+        with self.assertRaisesRegex(InvalidQuestion, r'answers\[0\]'):
+            Question.validate(question_json([{'resource': {'label': 'a'}}]))
+
+    def test_resource_without_label(self):
+        with self.assertRaisesRegex(InvalidQuestion, 'resource'):
+            Question.validate(question_json([{'answer_id': 'answer_0', 'resource': {'id': 'x'}}]))
+
+    def test_boolean_timeout(self):
+        with self.assertRaisesRegex(InvalidQuestion, 'timeout'):
+            Question.validate(question_json(timeout=True))
+
+    def test_metadata_resource(self):
+        with self.assertRaisesRegex(InvalidQuestion, 'metadata.receiver'):
+            Question.validate(question_json(metadata={'receiver': 'r'}))
+
+
+class TestIndexes(unittest.TestCase):
+
+    def setUp(self):
+        answers = [answer(0, 'a'), answer(1, 'b'), answer(2, 'a'), answer(3, 'c'),
+                   {'answer_id': 'answer_4', 'display_answer': 'Next', 'resource': None}]
+        self.question = Question.from_json(question_json(answers, metadata={'sender': {'id': 's', 'label': 'S'}}))
+
+    def test_answer_id_for_label(self):
+        self.assertEqual(self.question.answer_id_for_label('a'), 'answer_0')
+        self.assertIsNone(self.question.answer_id_for_label('z'))
+
+    def test_answer_ids_for_labels_in_label_order(self):
+        self.assertEqual(self.question.answer_ids_for_labels(['c', 'a', 'b', 'a', 'z']),
+                         ['answer_3', 'answer_0', 'answer_2', 'answer_1'])
+
+    def test_answer_for_resource_id(self):
+        self.assertEqual(self.question.answer_for_resource_id('id-1')['answer_id'], 'answer_1')
+        self.assertIsNone(self.question.answer_for_resource_id('missing'))
+
+    def test_resource_answers(self):
+        self.assertEqual(len(self.question.resource_answers), 4)
+
+    def test_metadata_resources(self):
+        self.assertEqual(self.question.sender.label, 'S')
+        self.assertIsNone(self.question.receiver)
+
+    def test_to_json(self):
+        json = question_json([answer(0, 'a')], timeout=10)
+        self.assertEqual(Question.from_json(json).to_json(), dict(json, metadata=None))
@@ -0,0 +1,82 @@
+# Copyright (C) 2021 Advanced Media Workflow Association
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import threading
+import time
+import unittest
+from unittest import mock
+from collections import namedtuple
+from QuestionScheduler import QuestionScheduler
+
+Job = namedtuple('Job', ['question_id', 'run', 'duration'])
+
+
+class TestQuestionScheduler(unittest.TestCase):
+
+    def setUp(self):
+        self.lock = threading.Lock()
+        self.running = {}
+        self.overlapped = []
+        self.order = []
+        self.done = threading.Semaphore(0)
+
+    def execute(self, job):
+        with self.lock:
+            if self.running.get(job.run):
+                self.overlapped.append(job.question_id)
+            self.running[job.run] = True
+            self.order.append(job.question_id)
+        time.sleep(job.duration)
+        with self.lock:
+            self.running[job.run] = False
+        self.done.release()
+
+    def run_jobs(self, scheduler, jobs):
+        scheduler.start()
+        for job in jobs:
+            self.assertTrue(scheduler.submit(job, job.run))
+        for _ in jobs:
+            self.assertTrue(self.done.acquire(timeout=5))
+
+    def test_questions_of_a_run_in_order(self):
+        jobs = [Job('{}_{}'.format(run, index), run, 0.01) for index in range(5) for run in ('a', 'b')]
+        self.run_jobs(QuestionScheduler(self.execute, 4, 100), jobs)
+        self.assertEqual(self.overlapped, [])
+        for run in ('a', 'b'):
+            self.assertEqual([question_id for question_id in self.order if question_id.startswith(run)],
+                             ['{}_{}'.format(run, index) for index in range(5)])
+
+    def test_runs_in_parallel(self):
+        jobs = [Job('a', 'a', 0.3), Job('b', 'b', 0.3)]
+        start = time.monotonic()
+        self.run_jobs(QuestionScheduler(self.execute, 2, 100), jobs)
+        self.assertLess(time.monotonic() - start, 0.55)
+
+    def test_full_queue_refuses(self):
+        scheduler = QuestionScheduler(self.execute, 1, 1)
+        self.assertTrue(scheduler.submit(Job('a', 'a', 0), 'a'))
+        self.assertFalse(scheduler.submit(Job('b', 'b', 0), 'b'))
+
+    def test_error_frees_run(self):
+        def execute(job):
+            if job.question_id == 'fails':
+                raise RuntimeError('test')
+            self.execute(job)
+        scheduler = QuestionScheduler(execute, 1, 10)
+        scheduler.start()
+        with mock.patch('builtins.print'), mock.patch('traceback.print_exc'):
+            scheduler.submit(Job('fails', 'a', 0), 'a')
+            scheduler.submit(Job('next', 'a', 0), 'a')
+            self.assertTrue(self.done.acquire(timeout=5))
+        self.assertEqual(self.order, ['next'])
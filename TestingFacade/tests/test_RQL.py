@@ -0,0 +1,86 @@
+# Copyright (C) 2021 Advanced Media Workflow Association
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import unittest
+from fractions import Fraction
+from benchmark.RQL import UnsupportedQuery, evaluate, parse, raw_query_parameter
+
+FLOW = {'id': 'f', 'format': 'urn:x-nmos:format:video', 'frame_width': 1920, 'frame_height': 1080,
+        'grain_rate': {'numerator': 50, 'denominator': 1},
+        'components': [{'name': 'Y', 'width': 1920}, {'name': 'Cb', 'width': 960}]}
+SENDER = {'id': 's', 'label': 'MXL Sender 0', 'flow_id': 'f', 'transport': 'urn:x-nmos:transport:mxl'}
+
+
+def resolve(key, resource_id):
+    return FLOW if key == 'flow_id' and resource_id == 'f' else None
+
+
+def matches(rql, resource=SENDER):
+    return evaluate(parse(rql), resource, resolve)
+
+
+class TestParse(unittest.TestCase):
+
+    def test_typed_values(self):
+        self.assertEqual(parse('eq(grain_rate,rational:50%2F1)'), ('eq', ['grain_rate', Fraction(50)]))
+        self.assertEqual(parse('and(eq(a,number:1.5),eq(b,true))'),
+                         ('and', [('eq', ['a', 1.5]), ('eq', ['b', True])]))
+
+    def test_array(self):
+        self.assertEqual(parse('in(format,(a,b))'), ('in', ['format', ['a', 'b']]))
+
+    def test_count(self):
+        self.assertEqual(parse('eq(count(components),2)'), ('eq', [('count', ['components']), 2]))
+
+    def test_malformed(self):
+        for rql in ['', 'eq(a,1', 'eq(a,1))', 'in(a,(b)', 'eq']:
+            with self.subTest(rql=rql), self.assertRaises(UnsupportedQuery):
+                parse(rql)
+
+    def test_raw_query_parameter(self):
+        self.assertEqual(raw_query_parameter('paging.limit=10&query.rql=eq(label,a%2Cb)', 'query.rql'),
+                         'eq(label,a%2Cb)')
+        self.assertIsNone(raw_query_parameter('paging.limit=10', 'query.rql'))
+
+
+class TestEvaluate(unittest.TestCase):
+
+    def test_comparisons(self):
+        self.assertTrue(matches('eq(label,MXL%20Sender%200)'))
+        self.assertTrue(matches('ne(label,other)'))
+        self.assertFalse(matches('gt(missing,1)'))
+
+    def test_matches(self):
+        self.assertTrue(matches('matches(label,mxl,i)'))
+        self.assertFalse(matches('matches(label,mxl)'))
+
+    def test_in(self):
+        self.assertTrue(matches('in(transport,(urn:x-nmos:transport:rtp,urn:x-nmos:transport:mxl))'))
+        self.assertFalse(matches('in(transport,(urn:x-nmos:transport:rtp))'))
+
+    def test_rel_with_rational_and_count(self):
+        self.assertTrue(matches('rel(flow_id,and(eq(grain_rate,rational:50),eq(count(components),2)))'))
+        self.assertFalse(matches('rel(flow_id,eq(grain_rate,rational:25))'))
+
+    def test_sub(self):
+        self.assertTrue(matches('sub(components,and(eq(name,Cb),eq(width,960)))', FLOW))
+        self.assertFalse(matches('sub(components,eq(width,1280))', FLOW))
+
+    def test_logic(self):
+        self.assertTrue(matches('or(eq(label,x),not(eq(label,y)))'))
+
+    def test_unsupported(self):
+        for rql in ['unknown(label,a)', 'eq(components,sampling:YCbCr-4:2:2)', 'in(label,a)']:
+            with self.subTest(rql=rql), self.assertRaises(UnsupportedQuery):
+                matches(rql, FLOW)
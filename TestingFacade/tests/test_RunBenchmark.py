@@ -0,0 +1,36 @@
+# Copyright (C) 2021 Advanced Media Workflow Association
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import unittest
+from benchmark.RunBenchmark import percentile, is_correct
+from benchmark.Suites import UNCHECKED
+
+
+class TestPercentile(unittest.TestCase):
+
+    def test_nearest_rank(self):
+        values = list(range(1, 11))
+        self.assertEqual(percentile([2, 1], 0.5), 1)
+        self.assertEqual(percentile(values, 0.5), 5)
+        self.assertEqual(percentile(values, 0.9), 9)
+        self.assertEqual(percentile(values, 0.99), 10)
+        self.assertEqual(percentile(values, 1), 10)
+        self.assertEqual(percentile(values, 0), 1)
+        self.assertEqual(percentile([7], 0.9), 7)
+
+    def test_is_correct(self):
+        self.assertTrue(is_correct(['answer_1', 'answer_0'], ['answer_0', 'answer_1']))
+        self.assertFalse(is_correct(['answer_0'], ['answer_0', 'answer_1']))
+        self.assertTrue(is_correct(UNCHECKED, None))
+        self.assertTrue(is_correct('Next', 'Next'))
@@ -0,0 +1,122 @@
+# Copyright (C) 2021 Advanced Media Workflow Association
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import unittest
+from unittest import mock
+import ScrapeCache
+from ScrapeCache import RESOURCE_TYPES, read_registry_version
+
+
+class Response:
+    def __init__(self, body, headers):
+        self.body = body
+        self.headers = headers
+
+    def raise_for_status(self):
+        pass
+
+    def json(self):
+        return self.body
+
+
+class Registry:
+    """
+    Stands in for a requests.Session reading a Query API
+    """
+
+    def __init__(self, until='1:0'):
+        self.resources = {resource_type: [] for resource_type in RESOURCE_TYPES}
+        self.until = until
+        self.limit = '10'
+        self.requests = 0
+
+    def get(self, url, params=None, timeout=None):
+        self.requests += 1
+        resource_type = url.rsplit('/', 1)[1]
+        headers = {'X-Paging-Limit': self.limit}
+        if self.until is not None:
+            headers['X-Paging-Until'] = self.until
+        return Response(self.resources[resource_type][-int(params['paging.limit']):], headers)
+
+
+class TestReadRegistryVersion(unittest.TestCase):
+
+    def version(self, registry):
+        return read_registry_version(registry, 'http://registry/x-nmos/query/v1.3/', 10, 1)
+
+    def test_one_request_per_type(self):
+        registry = Registry()
+        self.assertIsNotNone(self.version(registry))
+        self.assertEqual(registry.requests, len(RESOURCE_TYPES))
+
+    def test_unchanged(self):
+        registry = Registry()
+        self.assertEqual(self.version(registry), self.version(registry))
+
+    def test_changes(self):
+        registry = Registry()
+        versions = {self.version(registry)}
+        registry.resources['senders'].append({'id': 's', 'version': '1:0'})
+        versions.add(self.version(registry))
+        registry.resources['senders'][0]['version'] = '2:0'
+        versions.add(self.version(registry))
+        registry.until = '3:0'
+        versions.add(self.version(registry))
+        registry.limit = '2'
+        versions.add(self.version(registry))
+        self.assertEqual(len(versions), 5)
+
+    def test_without_paging(self):
+        with mock.patch('builtins.print'):
+            self.assertIsNone(self.version(Registry(until=None)))
+
+
+class TestScrapeCache(unittest.TestCase):
+
+    def setUp(self):
+        self.cache = ScrapeCache.ScrapeCache(2)
+
+    def test_hit_at_same_version(self):
+        self.cache.put('senders', 'v1', ['a'])
+        self.assertEqual(self.cache.get('senders', 'v1'), (True, ['a']))
+        self.assertEqual(self.cache.get('senders', 'v2'), (False, None))
+
+    def test_least_recently_used_evicted(self):
+        self.cache.put('a', 'v', 1)
+        self.cache.put('b', 'v', 2)
+        self.cache.get('a', 'v')
+        self.cache.put('c', 'v', 3)
+        self.assertEqual(self.cache.get('b', 'v'), (False, None))
+        self.assertEqual(self.cache.get('a', 'v'), (True, 1))
+
+    def test_version_read_once_per_question(self):
+        with mock.patch.object(ScrapeCache, 'read_registry_version', side_effect=['v1', 'v2']) as read:
+            self.assertEqual(self.cache.registry_version('http://registry', 10, 1), 'v1')
+            self.assertEqual(self.cache.registry_version('http://registry', 10, 1), 'v1')
+            self.cache.begin_question()
+            self.assertEqual(self.cache.registry_version('http://registry', 10, 1), 'v2')
+        self.assertEqual(read.call_count, 2)
+
+    def test_version_read_across_clear_not_kept(self):
+        def read(*args):
+            self.cache.clear()
+            return 'v1'
+        with mock.patch.object(ScrapeCache, 'read_registry_version', side_effect=read):
+            self.assertEqual(self.cache.registry_version('http://registry', 10, 1), 'v1')
+        self.assertIsNone(self.cache.version)
+
+    def test_clear(self):
+        self.cache.put('senders', 'v1', ['a'])
+        self.cache.clear()
+        self.assertEqual(self.cache.get('senders', 'v1'), (False, None))